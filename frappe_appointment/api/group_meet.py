@@ -1,32 +1,202 @@
+import datetime
+
 import frappe
 import frappe.utils
 from frappe import _
+from frappe.rate_limiter import rate_limit
 
-from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import _get_time_slots_for_day
-from frappe_appointment.helpers.overrides import add_response_code
+from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import (
+    _get_available_dates,
+    _get_time_slots_for_day,
+    _get_time_slots_for_range,
+    get_next_available_slots,
+    is_valid_time_slots,
+)
+from frappe_appointment.helpers.availability_snapshot import get_time_slot_cache_dict
+from frappe_appointment.helpers.overrides import add_etag, add_idempotency_key, add_response_code
+from frappe_appointment.helpers.slot_cache import get_availability_etag
+from frappe_appointment.helpers.slot_engine import COMPACT_FORMAT, get_compact_slots, seconds_to_minutes
+from frappe_appointment.helpers.slot_hold import (
+    SLOT_HOLD_RATE_LIMIT,
+    SLOT_HOLD_TTL,
+    get_held_slots,
+    get_slot_hold_reference,
+    hold_slot,
+    parse_slot,
+)
+from frappe_appointment.helpers.slot_policy import get_appointment_group_slot_policy
+from frappe_appointment.helpers.utils import parse_aware_datetime
 from frappe_appointment.overrides.event_override import APPOINTMENT_GROUP, _create_event_for_appointment_group
 
 
+def get_time_slots_etag(appointment_group_id: str = None, **args):
+    if not appointment_group_id or not frappe.db.exists(APPOINTMENT_GROUP, appointment_group_id):
+        return None
+
+    appointment_group = frappe.get_cached_doc(APPOINTMENT_GROUP, appointment_group_id)
+
+    return get_availability_etag(
+        f"group:{appointment_group.name}:{appointment_group.modified}",
+        [member.user for member in appointment_group.members if member.is_mandatory],
+        {"appointment_group_id": appointment_group_id, **args},
+        get_held_slots(get_slot_hold_reference(appointment_group)),
+    )
+
+
 @frappe.whitelist(allow_guest=True)
 @add_response_code
-def get_time_slots(appointment_group_id: str, date: str, user_timezone_offset: str, **args):
+@add_etag(get_time_slots_etag)
+def get_time_slots(
+    appointment_group_id: str,
+    date: str = None,
+    user_timezone_offset: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    format: str = None,
+    **args,
+):
     if not appointment_group_id:
         frappe.throw(_("Appointment Group ID is required"))
 
-    if not date:
+    if not date and not (start_date and end_date):
         frappe.throw(_("Date is required"))
 
-    appointment_group = frappe.get_doc(APPOINTMENT_GROUP, appointment_group_id)
+    if not user_timezone_offset:
+        frappe.throw(_("User timezone offset is required"))
+
+    if format and format != COMPACT_FORMAT:
+        frappe.throw(_("Invalid format, only {0} is supported").format(COMPACT_FORMAT))
+
+    compact = format == COMPACT_FORMAT
+
+    appointment_group = get_appointment_group_slot_policy(appointment_group_id)
+    held_slots = get_held_slots(get_slot_hold_reference(appointment_group))
+
+    time_slot_cache_dict, availability_refreshed_at = get_time_slot_cache_dict(
+        appointment_group, date or start_date, date or end_date
+    )
 
-    time_slots = _get_time_slots_for_day(appointment_group, date, user_timezone_offset)
+    if date:
+        time_slots = _get_time_slots_for_day(
+            appointment_group,
+            date,
+            user_timezone_offset,
+            time_slot_cache_dict=time_slot_cache_dict,
+            compact=compact,
+            held_slots=held_slots,
+        )
+    else:
+        time_slots = _get_time_slots_for_range(
+            appointment_group,
+            start_date,
+            end_date,
+            user_timezone_offset,
+            time_slot_cache_dict=time_slot_cache_dict,
+            compact=compact,
+            held_slots=held_slots,
+        )
     if time_slots and isinstance(time_slots, dict):
         time_slots["title"] = appointment_group.group_name
         time_slots["rescheduling_allowed"] = bool(appointment_group.allow_rescheduling)
+        time_slots["availability_refreshed_at"] = availability_refreshed_at
+        if compact:
+            time_slots["format"] = COMPACT_FORMAT
+            time_slots["all_available_slots_for_data"] = get_compact_slots(
+                time_slots["all_available_slots_for_data"], seconds_to_minutes(appointment_group.duration_for_event)
+            )
     return time_slots
 
 
 @frappe.whitelist(allow_guest=True)
 @add_response_code
+@add_etag(get_time_slots_etag)
+def get_available_dates(appointment_group_id: str, month: str = None, user_timezone_offset: str = None, **args):
+    if not appointment_group_id:
+        frappe.throw(_("Appointment Group ID is required"))
+
+    try:
+        datetime.datetime.strptime(month or "", "%Y-%m")
+    except ValueError:
+        frappe.throw(_("Month is required in the format YYYY-MM"))
+
+    if not user_timezone_offset:
+        frappe.throw(_("User timezone offset is required"))
+
+    appointment_group = get_appointment_group_slot_policy(appointment_group_id)
+
+    time_slot_cache_dict, availability_refreshed_at = get_time_slot_cache_dict(
+        appointment_group, f"{month}-01", frappe.utils.get_last_day(f"{month}-01")
+    )
+
+    available_dates = _get_available_dates(
+        appointment_group, month, user_timezone_offset, time_slot_cache_dict=time_slot_cache_dict
+    )
+    available_dates["title"] = appointment_group.group_name
+    available_dates["availability_refreshed_at"] = availability_refreshed_at
+    return available_dates
+
+
+@frappe.whitelist(allow_guest=True)
+@add_response_code
+def get_next_available_slot(appointment_group_id: str, after: str = None, limit: int = 1, **args):
+    if not appointment_group_id:
+        frappe.throw(_("Appointment Group ID is required"))
+
+    try:
+        after = parse_aware_datetime(after) if after else None
+    except ValueError:
+        frappe.throw(_("Invalid date format for after, use ISO 8601"))
+
+    appointment_group = get_appointment_group_slot_policy(appointment_group_id)
+
+    return {
+        "appointment_group_id": appointment_group.name,
+        "title": appointment_group.group_name,
+        "duration": appointment_group.duration_for_event,
+        "slots": get_next_available_slots(appointment_group, after, frappe.utils.cint(limit)),
+    }
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+@rate_limit(limit=SLOT_HOLD_RATE_LIMIT, seconds=SLOT_HOLD_TTL)
+@add_response_code
+def hold_time_slot(
+    appointment_group_id: str,
+    date: str,
+    start_time: str,
+    end_time: str,
+    user_timezone_offset: str,
+    hold_token: str = None,
+    **args,
+):
+    """Hold a slot while the guest fills the booking form, pass the hold_token to book_time_slot to book it.
+
+    Calling it again with the hold_token extends the hold. Only a slot that is offered can be held.
+    """
+    if not appointment_group_id:
+        frappe.throw(_("Appointment Group ID is required"))
+
+    appointment_group = get_appointment_group_slot_policy(appointment_group_id)
+
+    try:
+        start, end = parse_slot(start_time, end_time)
+    except ValueError:
+        frappe.throw(_("Invalid time slot"))
+
+    if not is_valid_time_slots(appointment_group, date, user_timezone_offset, start_time, end_time):
+        frappe.throw(_("This slot is not available, please book another slot."))
+
+    slot_hold = hold_slot(get_slot_hold_reference(appointment_group), start, end, hold_token)
+
+    if not slot_hold:
+        frappe.throw(_("This slot is not available, please book another slot."))
+
+    return {"hold_token": slot_hold.token, "expires_in": SLOT_HOLD_TTL}
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+@add_response_code
+@add_idempotency_key
 def book_time_slot(
     appointment_group_id: str,
     date: str,
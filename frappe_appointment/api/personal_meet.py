@@ -1,13 +1,33 @@
+import datetime
 import json
 import re
 
 import frappe
 import frappe.utils
 import pytz
-
-from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import _get_time_slots_for_day
-from frappe_appointment.helpers.overrides import add_response_code
-from frappe_appointment.helpers.utils import duration_to_string
+from frappe.rate_limiter import rate_limit
+
+from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import (
+    _get_available_dates,
+    _get_time_slots_for_day,
+    _get_time_slots_for_range,
+    get_next_available_slots,
+    is_valid_time_slots,
+)
+from frappe_appointment.helpers.availability_snapshot import get_time_slot_cache_dict
+from frappe_appointment.helpers.overrides import add_etag, add_idempotency_key, add_response_code
+from frappe_appointment.helpers.slot_cache import get_availability_etag
+from frappe_appointment.helpers.slot_engine import COMPACT_FORMAT, get_compact_slots, seconds_to_minutes
+from frappe_appointment.helpers.slot_hold import (
+    SLOT_HOLD_RATE_LIMIT,
+    SLOT_HOLD_TTL,
+    get_held_slots,
+    get_slot_hold_reference,
+    hold_slot,
+    parse_slot,
+)
+from frappe_appointment.helpers.slot_policy import get_slot_duration_slot_policy
+from frappe_appointment.helpers.utils import duration_to_string, parse_aware_datetime
 from frappe_appointment.overrides.event_override import _create_event_for_appointment_group
 
 
@@ -61,10 +81,32 @@ def get_meeting_windows(slug):
     }, 200
 
 
+def get_time_slots_etag(duration_id: str = None, **args):
+    duration = duration_id and frappe.db.get_value(
+        "Appointment Slot Duration", duration_id, ["parent", "modified"], as_dict=True
+    )
+
+    if not duration:
+        return None
+
+    return get_availability_etag(
+        f"duration:{duration_id}:{duration.modified}",
+        [duration.parent],
+        {"duration_id": duration_id, **args},
+        get_held_slots(f"duration:{duration_id}"),
+    )
+
+
 @frappe.whitelist(allow_guest=True)
 @add_response_code
+@add_etag(get_time_slots_etag)
 def get_time_slots(
-    duration_id: str, date: str = None, user_timezone_offset: str = None, start_date: str = None, end_date: str = None
+    duration_id: str,
+    date: str = None,
+    user_timezone_offset: str = None,
+    start_date: str = None,
+    end_date: str = None,
+    format: str = None,
 ):
     if not date and not (start_date and end_date):
         return {"error": "Date is required"}, 400
@@ -72,6 +114,11 @@ def get_time_slots(
     if not user_timezone_offset:
         return {"error": "User timezone offset is required"}, 400
 
+    if format and format != COMPACT_FORMAT:
+        return {"error": f"Invalid format, only {COMPACT_FORMAT} is supported"}, 400
+
+    compact = format == COMPACT_FORMAT
+
     duration = frappe.get_doc("Appointment Slot Duration", duration_id)
 
     user_availability = frappe.get_all(
@@ -83,50 +130,32 @@ def get_time_slots(
 
     user_availability = user_availability[0]
 
-    appointment_group_obj = create_dummy_appointment_group(duration, user_availability)
+    appointment_group = get_slot_duration_slot_policy(duration, user_availability)
+    held_slots = get_held_slots(get_slot_hold_reference(appointment_group))
 
-    appointment_group = frappe.get_doc(appointment_group_obj)
+    time_slot_cache_dict, availability_refreshed_at = get_time_slot_cache_dict(
+        appointment_group, date or start_date, date or end_date
+    )
 
     if date:
-        data = _get_time_slots_for_day(appointment_group, date, user_timezone_offset)
+        data = _get_time_slots_for_day(
+            appointment_group,
+            date,
+            user_timezone_offset,
+            time_slot_cache_dict=time_slot_cache_dict,
+            compact=compact,
+            held_slots=held_slots,
+        )
     else:
-        data = {
-            "all_available_slots_for_data": [],
-            "dates": [],
-            "duration": None,
-            "starttime": None,
-            "endtime": None,
-            "total_slots": 0,
-            "available_days": [],
-        }
-
-        date = start_date
-        cache_dict = {}
-        while True:
-            datetime = frappe.utils.get_datetime(date)
-            enddatetime = frappe.utils.get_datetime(end_date)
-            if datetime > enddatetime:
-                break
-            _data = _get_time_slots_for_day(
-                appointment_group, date, user_timezone_offset, time_slot_cache_dict=cache_dict
-            )
-            if _data["is_invalid_date"]:
-                date = _data["next_valid_date"]
-                if not isinstance(_data["next_valid_date"], str):
-                    date = _data["next_valid_date"].strftime("%Y-%m-%d")
-            else:
-                data["all_available_slots_for_data"].extend(_data["all_available_slots_for_data"])
-                data["dates"].append(_data["date"])
-                data["duration"] = _data["duration"]
-                data["starttime"] = (
-                    min(_data["starttime"], data["starttime"]) if data["starttime"] else _data["starttime"]
-                )
-                data["endtime"] = max(_data["endtime"], data["endtime"]) if data["endtime"] else _data["endtime"]
-                data["total_slots"] += _data["total_slots_for_day"]
-                for available_day in _data["available_days"]:
-                    if available_day not in data["available_days"]:
-                        data["available_days"].append(available_day)
-                date = frappe.utils.add_days(date, 1)
+        data = _get_time_slots_for_range(
+            appointment_group,
+            start_date,
+            end_date,
+            user_timezone_offset,
+            time_slot_cache_dict=time_slot_cache_dict,
+            compact=compact,
+            held_slots=held_slots,
+        )
 
     if not data:
         return None
@@ -136,12 +165,135 @@ def get_time_slots(
     data["user"] = user_availability.get("name")
     data["label"] = duration.title
     data["rescheduling_allowed"] = bool(duration.allow_rescheduling)
+    data["availability_refreshed_at"] = availability_refreshed_at
+
+    if compact:
+        data["format"] = COMPACT_FORMAT
+        data["all_available_slots_for_data"] = get_compact_slots(
+            data["all_available_slots_for_data"], seconds_to_minutes(duration.duration)
+        )
+
+    return data
+
+
+@frappe.whitelist(allow_guest=True)
+@add_response_code
+@add_etag(get_time_slots_etag)
+def get_available_dates(duration_id: str, month: str = None, user_timezone_offset: str = None):
+    try:
+        datetime.datetime.strptime(month or "", "%Y-%m")
+    except ValueError:
+        return {"error": "Month is required in the format YYYY-MM"}, 400
+
+    if not user_timezone_offset:
+        return {"error": "User timezone offset is required"}, 400
+
+    duration = frappe.get_doc("Appointment Slot Duration", duration_id)
+
+    user_availability = frappe.get_all(
+        "User Appointment Availability", filters={"name": duration.get("parent")}, fields=["*"]
+    )
+
+    if not user_availability:
+        return {"error": "No user found"}, 404
+
+    user_availability = user_availability[0]
+
+    appointment_group = get_slot_duration_slot_policy(duration, user_availability)
+
+    time_slot_cache_dict, availability_refreshed_at = get_time_slot_cache_dict(
+        appointment_group, f"{month}-01", frappe.utils.get_last_day(f"{month}-01")
+    )
+
+    data = _get_available_dates(
+        appointment_group, month, user_timezone_offset, time_slot_cache_dict=time_slot_cache_dict
+    )
+    data["user"] = user_availability.get("name")
+    data["label"] = duration.title
+    data["availability_refreshed_at"] = availability_refreshed_at
 
     return data
 
 
+@frappe.whitelist(allow_guest=True)
+@add_response_code
+def get_next_available_slot(duration_id: str, after: str = None, limit: int = 1):
+    try:
+        after = parse_aware_datetime(after) if after else None
+    except ValueError:
+        return {"error": "Invalid date format for after, use ISO 8601"}, 400
+
+    duration = frappe.get_doc("Appointment Slot Duration", duration_id)
+
+    user_availability = frappe.get_all(
+        "User Appointment Availability", filters={"name": duration.get("parent")}, fields=["*"]
+    )
+
+    if not user_availability:
+        return {"error": "No user found"}, 404
+
+    user_availability = user_availability[0]
+
+    appointment_group = get_slot_duration_slot_policy(duration, user_availability)
+
+    return {
+        "user": user_availability.get("name"),
+        "label": duration.title,
+        "duration": duration.duration,
+        "slots": get_next_available_slots(appointment_group, after, frappe.utils.cint(limit)),
+    }
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+@rate_limit(limit=SLOT_HOLD_RATE_LIMIT, seconds=SLOT_HOLD_TTL)
+@add_response_code
+def hold_time_slot(
+    duration_id: str,
+    date: str,
+    start_time: str,
+    end_time: str,
+    user_timezone_offset: str,
+    hold_token: str = None,
+):
+    """Hold a slot while the guest fills the booking form, pass the hold_token to book_time_slot to book it.
+
+    Calling it again with the hold_token extends the hold. Only a slot that is offered can be held.
+    """
+    if not frappe.db.exists("Appointment Slot Duration", duration_id):
+        return {"error": "Duration not found"}, 404
+
+    duration = frappe.get_doc("Appointment Slot Duration", duration_id)
+
+    user_availability = frappe.get_all(
+        "User Appointment Availability", filters={"name": duration.get("parent")}, fields=["*"]
+    )
+
+    if not user_availability:
+        return {"error": "No user found"}, 404
+
+    user_availability = user_availability[0]
+
+    appointment_group = get_slot_duration_slot_policy(duration, user_availability)
+
+    try:
+        start, end = parse_slot(start_time, end_time)
+    except ValueError:
+        return {"error": "Invalid time slot"}, 400
+
+    if not is_valid_time_slots(appointment_group, date, user_timezone_offset, start_time, end_time):
+        return {"error": "This slot is not available, please book another slot."}, 409
+
+    slot_hold = hold_slot(get_slot_hold_reference(appointment_group), start, end, hold_token)
+
+    if not slot_hold:
+        return {"error": "This slot is not available, please book another slot."}, 409
+
+    return {"hold_token": slot_hold.token, "expires_in": SLOT_HOLD_TTL}, 200
+
+
 @frappe.whitelist(allow_guest=True, methods=["POST"])
 @add_response_code
+@add_idempotency_key
 def book_time_slot(
     duration_id: str,
     date: str,
@@ -164,9 +316,7 @@ def book_time_slot(
 
     user_availability = user_availability[0]
 
-    appointment_group_obj = create_dummy_appointment_group(duration, user_availability)
-
-    appointment_group = frappe.get_doc(appointment_group_obj)
+    appointment_group = get_slot_duration_slot_policy(duration, user_availability)
 
     event_participants = [
         {
@@ -241,31 +391,6 @@ def book_time_slot(
     return response
 
 
-def create_dummy_appointment_group(duration, user_availability):
-    appointment_group_obj = {
-        "doctype": "Appointment Group",
-        "group_name": "Personal Meeting",
-        "event_creator": user_availability.get("google_calendar"),
-        "event_organizer": user_availability.get("user"),
-        "members": [{"user": user_availability.get("name"), "is_mandatory": 1}],
-        "duration_for_event": duration.duration,
-        "minimum_buffer_time": duration.minimum_buffer_time if duration.minimum_buffer_time else None,
-        "minimum_notice_before_event": duration.minimum_notice_before_event,
-        "event_availability_window": duration.availability_window,
-        "meet_provider": user_availability.get("meeting_provider"),
-        "meet_link": user_availability.get("meeting_link"),
-        "response_email_template": user_availability.get("response_email_template"),
-        "linked_doctype": user_availability.get("name"),
-        "limit_booking_frequency": duration.limit_booking_frequency,
-        "is_personal_meeting": 1,
-        "duration_id": duration.name,
-        "allow_rescheduling": duration.allow_rescheduling,
-        "minimum_notice_for_reschedule": duration.minimum_notice_for_reschedule,
-    }
-
-    return appointment_group_obj
-
-
 @frappe.whitelist(allow_guest=True)
 def get_all_timezones():
     return pytz.common_timezones
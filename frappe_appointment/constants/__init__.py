@@ -1,5 +1,7 @@
 # Doctypes
 APPOINTMENT_GROUP = "Appointment Group"
 APPOINTMENT_TIME_SLOT = "Appointment Time Slot"
+APPOINTMENT_SLOT_DURATION = "Appointment Slot Duration"
+APPOINTMENT_AVAILABILITY_SNAPSHOT = "Appointment Availability Snapshot"
 
 USER_APPOINTMENT_AVAILABILITY = "User Appointment Availability"
@@ -0,0 +1,160 @@
+# Copyright (c) 2026, rtCamp and contributors
+# For license information, please see license.txt
+
+import datetime
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, get_datetime, now_datetime
+
+from frappe_appointment.constants import (
+    APPOINTMENT_AVAILABILITY_SNAPSHOT,
+    APPOINTMENT_GROUP,
+    APPOINTMENT_SLOT_DURATION,
+    USER_APPOINTMENT_AVAILABILITY,
+)
+from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import (
+    _get_time_slots_for_given_date,
+    vaild_date,
+)
+from frappe_appointment.frappe_appointment.doctype.appointment_time_slot.appointment_time_slot import (
+    get_google_calendar_slots_for_range,
+)
+from frappe_appointment.helpers.availability_snapshot import (
+    get_snapshot_values_from_day_slots,
+    get_stale_snapshot_days,
+)
+from frappe_appointment.helpers.slot_cache import set_cached_day_slots
+from frappe_appointment.helpers.slot_policy import get_appointment_group_slot_policy, get_slot_duration_slot_policy
+
+# Days kept in the snapshot of an appointment group without an event availability window
+DEFAULT_SNAPSHOT_DAYS = 60
+
+
+class AppointmentAvailabilitySnapshot(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index(APPOINTMENT_AVAILABILITY_SNAPSHOT, ["reference_doctype", "reference_name", "date"])
+
+
+def refresh_availability_snapshot(
+    reference_doctype: str, reference_name: str, dates: list = None, stale_only: bool = False
+) -> None:
+    """Recompute the slots of an Appointment Group or Appointment Slot Duration and store them in the snapshot.
+
+    Args:
+    reference_doctype (str): Appointment Group or Appointment Slot Duration
+    reference_name (str): name of the document
+    dates (list, optional): days to refresh in the format "YYYY-MM-DD", the whole window if not given
+    stale_only (bool, optional): only refresh the days that are missing or about to be too old, see get_stale_snapshot_days
+    """
+    appointment_group = get_snapshot_appointment_group(reference_doctype, reference_name)
+    snapshot_filters = {"reference_doctype": reference_doctype, "reference_name": reference_name}
+
+    if not appointment_group:
+        frappe.db.delete(APPOINTMENT_AVAILABILITY_SNAPSHOT, snapshot_filters)
+        return
+
+    first_day, last_day = get_snapshot_window(appointment_group)
+    days = [add_days(first_day, days) for days in range((last_day - first_day).days + 1)]
+
+    if dates:
+        dates = {get_datetime(date) for date in dates}
+        days = [day for day in days if day in dates]
+
+    if stale_only:
+        days = get_stale_snapshot_days(reference_doctype, reference_name, days)
+
+    if dates or stale_only:
+        if not days:
+            return
+
+        snapshot_filters["date"] = ["in", [day.date() for day in days]]
+
+    members = [member.user for member in appointment_group.members if member.is_mandatory]
+
+    # Slots of a day are computed from the UTC days around it, so keep some margin on both sides
+    google_calendar_slots = get_google_calendar_slots_for_range(
+        members, add_days(days[0], -1), add_days(days[-1], 1), appointment_group
+    )
+
+    refreshed_at = now_datetime()
+    rows = []
+
+    for day in days:
+        data = _get_time_slots_for_given_date(appointment_group, day, google_calendar_slots)
+        set_cached_day_slots(appointment_group, day, data)
+        rows.append(get_snapshot_values_from_day_slots(data))
+
+    frappe.db.delete(APPOINTMENT_AVAILABILITY_SNAPSHOT, snapshot_filters)
+
+    fields = list(rows[0])
+    frappe.db.bulk_insert(
+        APPOINTMENT_AVAILABILITY_SNAPSHOT,
+        [
+            "name",
+            "creation",
+            "modified",
+            "owner",
+            "modified_by",
+            "reference_doctype",
+            "reference_name",
+            "refreshed_at",
+            *fields,
+        ],
+        [
+            [
+                frappe.generate_hash(),
+                refreshed_at,
+                refreshed_at,
+                "Administrator",
+                "Administrator",
+                reference_doctype,
+                reference_name,
+                refreshed_at,
+                *(row[field] for field in fields),
+            ]
+            for row in rows
+        ],
+    )
+
+
+def get_snapshot_window(appointment_group: object) -> tuple:
+    """Get the first and last day (system timezone) whose slots a booking page of the group can show
+
+    Args:
+    appointment_group (object): Appointment Group
+
+    Returns:
+    tuple: first day, last day
+    """
+    today = get_datetime(datetime.datetime.utcnow().date())
+    valid_end_date = vaild_date(today, appointment_group)["valid_end_date"]
+
+    if valid_end_date:
+        return add_days(today, -1), add_days(valid_end_date, 1)
+
+    return add_days(today, -1), add_days(today, DEFAULT_SNAPSHOT_DAYS)
+
+
+def get_snapshot_appointment_group(reference_doctype: str, reference_name: str) -> object:
+    """Get the slot policy of the Appointment Group or Appointment Slot Duration, None if it was deleted"""
+    if reference_doctype == APPOINTMENT_GROUP:
+        if not frappe.db.exists(APPOINTMENT_GROUP, reference_name):
+            return None
+        return get_appointment_group_slot_policy(reference_name)
+
+    if not frappe.db.exists(APPOINTMENT_SLOT_DURATION, reference_name):
+        return None
+
+    duration = frappe.get_doc(APPOINTMENT_SLOT_DURATION, reference_name)
+    user_availability = frappe.get_all(
+        USER_APPOINTMENT_AVAILABILITY, filters={"name": duration.get("parent")}, fields=["*"]
+    )
+
+    if not user_availability:
+        return None
+
+    return get_slot_duration_slot_policy(duration, user_availability[0])
@@ -0,0 +1,144 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+import datetime
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_to_date, get_datetime, getdate, now_datetime
+
+from frappe_appointment.constants import APPOINTMENT_AVAILABILITY_SNAPSHOT, APPOINTMENT_GROUP
+from frappe_appointment.frappe_appointment.doctype.appointment_availability_snapshot import (
+    appointment_availability_snapshot,
+)
+from frappe_appointment.frappe_appointment.doctype.appointment_availability_snapshot.appointment_availability_snapshot import (
+    DEFAULT_SNAPSHOT_DAYS,
+    get_snapshot_window,
+    refresh_availability_snapshot,
+)
+from frappe_appointment.helpers import availability_snapshot
+from frappe_appointment.helpers.slot_policy import SlotPolicy, SlotPolicyMember
+from frappe_appointment.tests.utils import start_patches
+
+TEST_GROUP = "_Test Snapshot Appointment Group"
+
+
+def get_day_slots(appointment_group, date, google_calendar_slots=None):
+    """Stand-in for _get_time_slots_for_given_date, one slot per day"""
+    return {
+        "all_available_slots_for_data": [(1, 2)],
+        "date": getdate(date),
+        "duration": appointment_group.duration_for_event,
+        "appointment_group_id": appointment_group.name,
+        "starttime": None,
+        "endtime": None,
+        "total_slots_for_day": 1,
+        "valid_start_date": "",
+        "valid_end_date": "",
+        "next_valid_date": "",
+        "prev_valid_date": "",
+        "available_days": [],
+        "is_invalid_date": False,
+    }
+
+
+class TestAppointmentAvailabilitySnapshot(FrappeTestCase):
+    def setUp(self):
+        self.today = get_datetime(datetime.datetime.utcnow().date())
+        self.appointment_group = SlotPolicy(
+            name=TEST_GROUP,
+            group_name=TEST_GROUP,
+            members=(SlotPolicyMember("a@example.com", 1),),
+            duration_for_event=1800,
+            minimum_notice_before_event=0,
+            event_availability_window=5,
+        )
+        self.computed_days = []
+
+        def compute_day_slots(appointment_group, date, google_calendar_slots=None):
+            self.computed_days.append(getdate(date))
+            return get_day_slots(appointment_group, date)
+
+        start_patches(
+            self,
+            patch.object(appointment_availability_snapshot, "_get_time_slots_for_given_date", compute_day_slots),
+            patch.object(
+                appointment_availability_snapshot,
+                "get_snapshot_appointment_group",
+                return_value=self.appointment_group,
+            ),
+            patch.object(appointment_availability_snapshot, "get_google_calendar_slots_for_range", return_value={}),
+            patch.object(appointment_availability_snapshot, "set_cached_day_slots"),
+            patch.object(availability_snapshot, "get_availability_snapshot_max_age", return_value=3600),
+        )
+
+    def tearDown(self):
+        frappe.db.delete(APPOINTMENT_AVAILABILITY_SNAPSHOT, {"reference_name": TEST_GROUP})
+
+    def get_snapshot_rows(self):
+        return frappe.get_all(
+            APPOINTMENT_AVAILABILITY_SNAPSHOT,
+            filters={"reference_doctype": APPOINTMENT_GROUP, "reference_name": TEST_GROUP},
+            fields=["date", "refreshed_at"],
+            order_by="date asc",
+        )
+
+    def test_snapshot_window(self):
+        self.assertEqual(
+            get_snapshot_window(self.appointment_group), (add_days(self.today, -1), add_days(self.today, 5))
+        )
+
+        self.appointment_group.minimum_notice_before_event = 2
+        self.assertEqual(
+            get_snapshot_window(self.appointment_group), (add_days(self.today, -1), add_days(self.today, 7))
+        )
+
+        # No availability window, the booking page keeps going
+        self.appointment_group.event_availability_window = 0
+        self.assertEqual(
+            get_snapshot_window(self.appointment_group),
+            (add_days(self.today, -1), add_days(self.today, DEFAULT_SNAPSHOT_DAYS)),
+        )
+
+    def test_refresh_replaces_the_whole_window(self):
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP)
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP)
+
+        window = [getdate(add_days(self.today, days)) for days in range(-1, 6)]
+        self.assertEqual([getdate(row.date) for row in self.get_snapshot_rows()], window)
+        self.assertEqual(self.computed_days, window * 2)
+
+    def test_refresh_of_some_dates(self):
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP)
+        self.computed_days.clear()
+
+        dates = [str(getdate(add_days(self.today, 1))), str(getdate(add_days(self.today, 30)))]
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP, dates)
+
+        # Dates outside the window are ignored, the other days are left as they are
+        self.assertEqual(self.computed_days, [getdate(add_days(self.today, 1))])
+        self.assertEqual(len(self.get_snapshot_rows()), 7)
+
+    def test_stale_only_refresh(self):
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP)
+        self.computed_days.clear()
+
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP, stale_only=True)
+        self.assertEqual(self.computed_days, [])
+
+        missing_day = getdate(add_days(self.today, 2))
+        old_day = getdate(add_days(self.today, 4))
+        frappe.db.delete(APPOINTMENT_AVAILABILITY_SNAPSHOT, {"reference_name": TEST_GROUP, "date": missing_day})
+        frappe.db.set_value(
+            APPOINTMENT_AVAILABILITY_SNAPSHOT,
+            {"reference_name": TEST_GROUP, "date": old_day},
+            "refreshed_at",
+            add_to_date(now_datetime(), seconds=-3500),
+        )
+
+        refresh_availability_snapshot(APPOINTMENT_GROUP, TEST_GROUP, stale_only=True)
+
+        # The old day would be past the max age before the next scheduled refresh
+        self.assertEqual(self.computed_days, [missing_day, old_day])
+        self.assertEqual(len(self.get_snapshot_rows()), 7)
@@ -1,35 +1,68 @@
 # Copyright (c) 2023, rtCamp and contributors
 # For license information, please see license.txt
 
+import calendar
 import datetime
 from urllib.parse import quote_plus
 
 import frappe
 import frappe.utils
+import pytz
 from frappe.model.document import Document
 from frappe.utils import (
     add_days,
-    add_to_date,
-    format_time,
+    date_diff,
     get_datetime,
     get_datetime_str,
-    get_time_str,
+    get_system_timezone,
+    getdate,
 )
 
-from frappe_appointment.constants import APPOINTMENT_GROUP, APPOINTMENT_TIME_SLOT
+from frappe_appointment.constants import APPOINTMENT_GROUP
 from frappe_appointment.frappe_appointment.doctype.appointment_time_slot.appointment_time_slot import (
     GoogleBadRequest,
     get_all_unavailable_google_calendar_slots_for_day,
+    get_google_calendar_slots_for_range,
+)
+from frappe_appointment.frappe_appointment.doctype.user_appointment_availability.user_appointment_availability import (
+    get_weekly_availability_template,
+)
+from frappe_appointment.helpers.availability_snapshot import enqueue_availability_snapshot_refresh
+from frappe_appointment.helpers.intervals import BusyInterval
+from frappe_appointment.helpers.leave_holiday_index import (
+    get_employee_leave_dates,
+    get_holiday_dates,
+    get_member_employee,
+    is_hrms_installed,
+)
+from frappe_appointment.helpers.slot_cache import get_cached_day_slots, get_day_slots_single_flight
+from frappe_appointment.helpers.slot_engine import (
+    MINUTES_PER_DAY,
+    datetime_to_epoch_minutes,
+    epoch_minutes_to_datetime,
+    get_bitmap_bounds,
+    get_bitmap_slots,
+    get_busy_bitmap,
+    get_window_bitmap,
+    seconds_to_minutes,
 )
 from frappe_appointment.helpers.utils import (
-    convert_timezone_to_utc,
+    convert_datetime_to_utc,
+    convert_utc_datetime_to_timezone,
     get_utc_datatime_with_time,
     get_weekday,
+    seconds_to_time_str,
     utc_to_given_time_zone,
 )
 
 ALL_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
+# Days of busy data fetched at once while searching for the next available slots
+NEXT_AVAILABLE_SLOT_BATCH_DAYS = 7
+# Days searched for the next available slots of an appointment group without an event availability window
+NEXT_AVAILABLE_SLOT_MAX_DAYS = 90
+NEXT_AVAILABLE_SLOT_MAX_LIMIT = 100
+
 
 class AppointmentGroup(Document):
     def autoname(self):
@@ -62,6 +95,12 @@ class AppointmentGroup(Document):
         self.validate_zoom()
         self.validate_members_list()
 
+    def on_update(self):
+        enqueue_availability_snapshot_refresh(APPOINTMENT_GROUP, self.name)
+
+    def on_trash(self):
+        enqueue_availability_snapshot_refresh(APPOINTMENT_GROUP, self.name)
+
     def validate_members_list(self):
         is_valid_list = [member for member in self.members if member.is_mandatory]
         if not is_valid_list or len(is_valid_list) == 0:
@@ -69,43 +108,43 @@ class AppointmentGroup(Document):
 
 
 def _get_time_slots_for_day(
-    appointment_group: object, date: str, user_timezone_offset: str, time_slot_cache_dict: dict = None
+    appointment_group: object,
+    date: str,
+    user_timezone_offset: str,
+    time_slot_cache_dict: dict = None,
+    google_calendar_slots: dict = None,
+    compact: bool = False,
+    held_slots: set = None,
 ) -> object:
     try:
         datetime_today = get_datetime(date)
-        datetime_tomorrow = add_days(datetime_today, 1)
-        datetime_yesterday = add_days(datetime_today, -1)
-
-        all_time_slots_global_object = {}
 
+        # Slots of a date for the user come from the day before or after it in the system timezone
         if int(user_timezone_offset) > 0:
-            all_time_slots_global_object = {
-                "yesterday": get_time_slots_for_given_date(appointment_group, datetime_yesterday, time_slot_cache_dict),
-                "today": get_time_slots_for_given_date(appointment_group, datetime_today, time_slot_cache_dict),
-            }
+            slot_days = [add_days(datetime_today, -1), datetime_today]
         else:
-            all_time_slots_global_object = {
-                "today": get_time_slots_for_given_date(appointment_group, datetime_today, time_slot_cache_dict),
-                "tomorrow": get_time_slots_for_given_date(appointment_group, datetime_tomorrow, time_slot_cache_dict),
-            }
+            slot_days = [datetime_today, add_days(datetime_today, 1)]
 
-        user_time_slots = get_user_time_slots(all_time_slots_global_object, date, user_timezone_offset)
-
-        time_slots_today_object = all_time_slots_global_object["today"]
-
-        current_time = utc_to_given_time_zone(datetime.datetime.now(), user_timezone_offset)
-
-        filtered_slots = []
-
-        for slot in user_time_slots:
-            start_time = utc_to_given_time_zone(slot["start_time"], user_timezone_offset)
-            end_time = utc_to_given_time_zone(slot["end_time"], user_timezone_offset)
-
-            if current_time.date() == end_time.date() and (start_time < current_time and end_time < current_time):
-                continue
+        day_slots = {
+            slot_day: get_utc_time_slots_for_given_date(
+                appointment_group, slot_day, time_slot_cache_dict, google_calendar_slots
+            )
+            for slot_day in slot_days
+        }
 
-            filtered_slots.append(slot)
+        # Compact responses encode the (start, end) epoch minutes themselves, see get_compact_slots
+        filtered_slots = (filter_time_slots if compact else project_time_slots)(
+            [
+                slot
+                for data in day_slots.values()
+                for slot in data["all_available_slots_for_data"]
+                if not held_slots or slot not in held_slots
+            ],
+            datetime_today,
+            user_timezone_offset,
+        )
 
+        time_slots_today_object = dict(day_slots[datetime_today])
         time_slots_today_object["all_available_slots_for_data"] = filtered_slots
         time_slots_today_object["total_slots_for_day"] = len(filtered_slots)
 
@@ -118,21 +157,292 @@ def _get_time_slots_for_day(
         return None
 
 
-def get_user_time_slots(all_time_slots_global_object: list, date: str, user_timezone_offset: str):
-    list_all_available_slots_for_data = []
+def _get_time_slots_for_range(
+    appointment_group: object,
+    start_date: str,
+    end_date: str,
+    user_timezone_offset: str,
+    time_slot_cache_dict: dict = None,
+    compact: bool = False,
+    held_slots: set = None,
+) -> object:
+    """
+    Get the available time slots for every date in [start_date, end_date].
+
+    Google Calendar events of the mandatory members are fetched once for the whole range and each
+    day's slots are cut from that shared set.
+
+    Args:
+    appointment_group (object): Appointment Group
+    start_date (str): First date of the range in the format "YYYY-MM-DD"
+    end_date (str): Last date of the range in the format "YYYY-MM-DD"
+    user_timezone_offset (str): User's timezone offset
+    time_slot_cache_dict (dict, optional): Slots already known, by date, e.g. from the availability snapshot
+    compact (bool, optional): Keep the slots as (start, end) epoch minutes instead of datetimes
+    held_slots (set, optional): (start, end) epoch minutes of the slots held for a booking, left out
+
+    Returns:
+    object: Slots of all the valid dates of the range
+    """
+    data = {
+        "all_available_slots_for_data": [],
+        "dates": [],
+        "duration": None,
+        "starttime": None,
+        "endtime": None,
+        "total_slots": 0,
+        "available_days": [],
+    }
+
+    current_datetime = get_datetime(start_date)
+    end_datetime = get_datetime(end_date)
+
+    date_validation_obj = vaild_date(current_datetime, appointment_group)
+
+    if current_datetime < date_validation_obj["valid_start_date"]:
+        current_datetime = date_validation_obj["valid_start_date"]
+
+    if date_validation_obj["valid_end_date"] and end_datetime > date_validation_obj["valid_end_date"]:
+        end_datetime = date_validation_obj["valid_end_date"]
+
+    if current_datetime > end_datetime:
+        return data
+
+    members = [member.user for member in appointment_group.members if member.is_mandatory]
+
+    if time_slot_cache_dict is None:
+        time_slot_cache_dict = {}
+
+    google_calendar_slots = None
+
+    if any(
+        add_days(current_datetime, days) not in time_slot_cache_dict
+        and get_cached_day_slots(appointment_group, add_days(current_datetime, days)) is None
+        for days in range(-1, date_diff(end_datetime, current_datetime) + 2)
+    ):
+        try:
+            # Slots of a date are computed from the UTC days around it, so keep some margin on both sides.
+            google_calendar_slots = get_google_calendar_slots_for_range(
+                members, add_days(current_datetime, -2), add_days(end_datetime, 2), appointment_group
+            )
+        except GoogleBadRequest as e:
+            frappe.log_error(e)
+            frappe.throw(frappe._("Something went wrong while fetching time slots. Please try again later."))
+
+    while current_datetime <= end_datetime:
+        _data = _get_time_slots_for_day(
+            appointment_group,
+            current_datetime,
+            user_timezone_offset,
+            time_slot_cache_dict=time_slot_cache_dict,
+            google_calendar_slots=google_calendar_slots,
+            compact=compact,
+            held_slots=held_slots,
+        )
+
+        next_datetime = add_days(current_datetime, 1)
+
+        if not _data:
+            current_datetime = next_datetime
+            continue
+
+        if _data["is_invalid_date"]:
+            # Jump to the next valid date, but never go back in the range
+            current_datetime = max(get_datetime(_data["next_valid_date"]), next_datetime)
+            continue
+
+        data["all_available_slots_for_data"].extend(_data["all_available_slots_for_data"])
+        data["dates"].append(_data["date"])
+        data["duration"] = _data["duration"]
+        if _data["starttime"]:
+            data["starttime"] = min(_data["starttime"], data["starttime"]) if data["starttime"] else _data["starttime"]
+            data["endtime"] = max(_data["endtime"], data["endtime"]) if data["endtime"] else _data["endtime"]
+        data["total_slots"] += _data["total_slots_for_day"]
+        for available_day in _data["available_days"]:
+            if available_day not in data["available_days"]:
+                data["available_days"].append(available_day)
+
+        current_datetime = next_datetime
+
+    return data
+
+
+def _get_available_dates(
+    appointment_group: object, month: str, user_timezone_offset: str, time_slot_cache_dict: dict = None
+) -> object:
+    """
+    Get the dates of a month that have available slots for the user and the number of slots on each.
+
+    Dates that are outside the date window or on a weekday some mandatory member is not available on are
+    skipped up front, and so are the days (system timezone) with a leave or holiday, without fetching
+    anything. Busy intervals are fetched once for the month and slots are only counted, never formatted.
+
+    Args:
+    appointment_group (object): Appointment Group
+    month (str): Month in the format "YYYY-MM"
+    user_timezone_offset (str): User's timezone offset
+    time_slot_cache_dict (dict, optional): Slots already known, by date, e.g. from the availability snapshot
+
+    Returns:
+    object: Available dates in the format "YYYY-MM-DD" and the slot count of each
+    """
+    first_date = get_datetime(f"{month}-01")
+    dates = [add_days(first_date, days) for days in range(calendar.monthrange(first_date.year, first_date.month)[1])]
+
+    if time_slot_cache_dict is None:
+        time_slot_cache_dict = {}
+
+    available_days = get_available_days(appointment_group)
+
+    def is_available_day(day):
+        return get_weekday(day) in available_days and vaild_date(day, appointment_group)["is_valid"]
+
+    # Slots of a date for the user come from the day before or after it in the system timezone
+    slot_day_shift = -1 if int(user_timezone_offset) > 0 else 1
+
+    valid_dates = [date for date in dates if is_available_day(date)]
+    slot_days = {
+        day
+        for date in valid_dates
+        for day in (date, add_days(date, slot_day_shift))
+        if is_available_day(day) and not is_member_on_leave_or_is_holiday(appointment_group, day)
+    }
+
+    google_calendar_slots = None
+
+    if any(
+        day not in time_slot_cache_dict and get_cached_day_slots(appointment_group, day) is None for day in slot_days
+    ):
+        members = [member.user for member in appointment_group.members if member.is_mandatory]
+        google_calendar_slots = get_google_calendar_slots_for_range(
+            members, add_days(min(slot_days), -1), add_days(max(slot_days), 1), appointment_group
+        )
+
+    slot_counts = {}
+
+    for date in valid_dates:
+        slots = [
+            slot
+            for day in (date, add_days(date, slot_day_shift))
+            if day in slot_days
+            for slot in get_utc_time_slots_for_given_date(
+                appointment_group, day, time_slot_cache_dict, google_calendar_slots
+            )["all_available_slots_for_data"]
+        ]
+        total_slots = len(filter_time_slots(slots, date, user_timezone_offset))
+
+        if total_slots:
+            slot_counts[date.strftime("%Y-%m-%d")] = total_slots
+
+    return {
+        "month": month,
+        "dates": list(slot_counts),
+        "slot_counts": slot_counts,
+        "duration": appointment_group.duration_for_event,
+    }
+
+
+def get_next_available_slots(appointment_group: object, after: datetime.datetime = None, limit: int = 1) -> list:
+    """
+    Search forward for the first `limit` available slots that start at or after `after`.
+
+    Days ruled out by the date window, the weekdays of the members, leaves or holidays are skipped without
+    fetching anything. Busy intervals are fetched for a batch of days at a time and the search stops as soon
+    as `limit` slots are found.
+
+    Args:
+    appointment_group (object): Appointment Group
+    after (datetime, optional): Timezone aware datetime, defaults to now
+    limit (int, optional): Number of slots to find, at most NEXT_AVAILABLE_SLOT_MAX_LIMIT
+
+    Returns:
+    list: List of slots
+    """
+    limit = min(max(int(limit or 1), 1), NEXT_AVAILABLE_SLOT_MAX_LIMIT)
+    now = datetime.datetime.now(pytz.utc)
+    after = max(after, now) if after else now
+    after_minute = datetime_to_epoch_minutes(after, round_up=True)
+
+    first_day = get_datetime(after.astimezone(pytz.timezone(get_system_timezone())).date())
+    valid_end_date = vaild_date(first_day, appointment_group)["valid_end_date"]
+    last_day = valid_end_date or add_days(first_day, NEXT_AVAILABLE_SLOT_MAX_DAYS - 1)
+
+    available_days = get_available_days(appointment_group)
+
+    candidate_days = [
+        day
+        for day in (add_days(first_day, days) for days in range(date_diff(last_day, first_day) + 1))
+        if get_weekday(day) in available_days
+        and vaild_date(day, appointment_group)["is_valid"]
+        and not is_member_on_leave_or_is_holiday(appointment_group, day)
+    ]
+
+    members = [member.user for member in appointment_group.members if member.is_mandatory]
+    time_slot_cache_dict = {}
+    slots = []
+
+    for index in range(0, len(candidate_days), NEXT_AVAILABLE_SLOT_BATCH_DAYS):
+        batch = candidate_days[index : index + NEXT_AVAILABLE_SLOT_BATCH_DAYS]
+        google_calendar_slots = None
+
+        if any(get_cached_day_slots(appointment_group, day) is None for day in batch):
+            google_calendar_slots = get_google_calendar_slots_for_range(
+                members, add_days(batch[0], -1), add_days(batch[-1], 1), appointment_group
+            )
+
+        for day in batch:
+            data = get_utc_time_slots_for_given_date(
+                appointment_group, day, time_slot_cache_dict, google_calendar_slots
+            )
+
+            for start, end in data["all_available_slots_for_data"]:
+                if start < after_minute:
+                    continue
+
+                slots.append(
+                    {"start_time": epoch_minutes_to_datetime(start), "end_time": epoch_minutes_to_datetime(end)}
+                )
+
+                if len(slots) >= limit:
+                    return slots
+
+    return slots
 
-    today = int(date.split("-")[2])
 
-    for day in all_time_slots_global_object:
-        day_slots_object = all_time_slots_global_object[day]
-        all_available_slots_for_data = day_slots_object["all_available_slots_for_data"]
+def project_time_slots(slots: list, date: datetime, user_timezone_offset: str) -> list:
+    """
+    Pick the slots that fall on the given date in the user's timezone and are not over yet.
 
-        for time_slot in all_available_slots_for_data:
-            user_timezone_start_time_slot = utc_to_given_time_zone(time_slot["start_time"], user_timezone_offset)
-            if user_timezone_start_time_slot.day == today:
-                list_all_available_slots_for_data.append(time_slot)
+    Args:
+    slots (list): (start, end) epoch minutes of the slots
+    date (datetime): Date for the user
+    user_timezone_offset (str): User's timezone offset in minutes
 
-    return list_all_available_slots_for_data
+    Returns:
+    list: List of available slots
+    """
+    return [
+        {"start_time": epoch_minutes_to_datetime(start), "end_time": epoch_minutes_to_datetime(end)}
+        for start, end in filter_time_slots(slots, date, user_timezone_offset)
+    ]
+
+
+def filter_time_slots(slots: list, date: datetime, user_timezone_offset: str) -> list:
+    """
+    Same as project_time_slots, but keeps the slots as (start, end) epoch minutes.
+    """
+    offset = int(user_timezone_offset)
+    day = datetime_to_epoch_minutes(pytz.utc.localize(date)) // MINUTES_PER_DAY
+
+    now = datetime.datetime.now().timestamp()
+    today = (int(now // 60) + offset) // MINUTES_PER_DAY
+
+    return [
+        (start, end)
+        for start, end in slots
+        if (start + offset) // MINUTES_PER_DAY == day
+        and not (today == (end + offset) // MINUTES_PER_DAY and start * 60 < now and end * 60 < now)
+    ]
 
 
 def is_valid_time_slots(
@@ -142,21 +452,127 @@ def is_valid_time_slots(
     start_time: str,
     end_time: str,
 ):
-    today_time_slots = _get_time_slots_for_day(appointment_group, date, user_timezone_offset)
+    """
+    Check if the given slot can still be booked for the date.
+
+    Only the day the slot starts on (system timezone) is looked at: the member windows of its weekday,
+    leaves and holidays, the booking frequency and the busy intervals within the buffer time of the slot.
+    The slot must fit in the windows and keep clear of busy time like the slots of _get_time_slots_for_day,
+    but it is not matched against their grid, which depends on all the busy time before it.
+
+    Args:
+    appointment_group (object): Appointment Group
+    date (str): Date of the slot for the user in the format "YYYY-MM-DD"
+    user_timezone_offset (str): User's timezone offset
+    start_time (str): Start time in the format "YYYY-MM-DD HH:MM:SS+ZZZZ"
+    end_time (str): End time in the format "YYYY-MM-DD HH:MM:SS+ZZZZ"
 
-    if not today_time_slots:
+    Returns:
+    bool: True if the slot is available
+    """
+    try:
+        return _is_valid_time_slot(appointment_group, date, user_timezone_offset, start_time, end_time)
+    except GoogleBadRequest as e:
+        frappe.log_error(e)
+        frappe.throw(frappe._("Something went wrong while fetching time slots. Please try again later."))
+    except Exception:
+        frappe.log_error()
         return False
 
-    all_available_slots_for_data = today_time_slots["all_available_slots_for_data"]
 
+def _is_valid_time_slot(
+    appointment_group: object,
+    date: str,
+    user_timezone_offset: str,
+    start_time: str,
+    end_time: str,
+) -> bool:
     start_time = datetime.datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S%z")
     end_time = datetime.datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S%z")
 
-    for time_slot in all_available_slots_for_data:
-        if time_slot["start_time"] == start_time and time_slot["end_time"] == end_time:
-            return True
+    # Slots of a date are taken from the slots of the day before or after it, see _get_time_slots_for_day
+    datetime_today = get_datetime(date)
 
-    return False
+    if int(user_timezone_offset) > 0:
+        slot_days = [add_days(datetime_today, -1), datetime_today]
+    else:
+        slot_days = [datetime_today, add_days(datetime_today, 1)]
+
+    slot_datetime = get_datetime(start_time.astimezone(pytz.timezone(get_system_timezone())).date())
+
+    if slot_datetime not in slot_days:
+        return False
+
+    if utc_to_given_time_zone(start_time, user_timezone_offset).day != int(date.split("-")[2]):
+        return False
+
+    current_time = utc_to_given_time_zone(datetime.datetime.now(), user_timezone_offset)
+
+    if current_time.date() == utc_to_given_time_zone(end_time, user_timezone_offset).date() and (
+        start_time < current_time and end_time < current_time
+    ):
+        return False
+
+    if not vaild_date(slot_datetime, appointment_group)["is_valid"]:
+        return False
+
+    member_time_slots = get_member_time_slots(appointment_group, get_weekday(slot_datetime))
+
+    if not all(member_time_slots.values()):
+        # The weekday is not in the availability of every mandatory member
+        return False
+
+    date = slot_datetime.date()
+
+    if is_member_on_leave_or_is_holiday(appointment_group, date):
+        return False
+
+    booking_frequency_reached_obj = get_booking_frequency_reached(slot_datetime, appointment_group)
+
+    if not booking_frequency_reached_obj["is_slots_available"]:
+        return False
+
+    if start_time.timestamp() % 60 or end_time.timestamp() % 60:
+        return False
+
+    origin, window_bitmap = get_group_window_bitmap(member_time_slots, date)
+
+    slot_start = datetime_to_epoch_minutes(start_time)
+    slot_end = datetime_to_epoch_minutes(end_time)
+    slot_bitmap = get_window_bitmap(origin, slot_start, slot_end)
+    buffer = seconds_to_minutes(appointment_group.minimum_buffer_time)
+
+    if (
+        slot_end - slot_start != seconds_to_minutes(appointment_group.duration_for_event)
+        or not slot_bitmap
+        or window_bitmap & slot_bitmap != slot_bitmap
+    ):
+        return False
+
+    # Only the busy time that can reach the slot through the buffer is looked up
+    starttime = epoch_minutes_to_datetime(slot_start - buffer)
+    endtime = epoch_minutes_to_datetime(slot_end + buffer)
+
+    google_calendar_slots = get_google_calendar_slots_for_range(
+        list(member_time_slots), starttime.date(), endtime.date(), appointment_group, interval=(starttime, endtime)
+    )
+    all_slots = get_all_unavailable_google_calendar_slots_for_day(
+        member_time_slots, starttime, endtime, date, appointment_group, google_calendar_slots
+    )
+
+    if not all_slots and all_slots != []:
+        return False
+
+    all_slots = update_cal_slots_with_events(
+        all_slots,
+        booking_frequency_reached_obj["events"]
+        + get_members_booked_events(list(member_time_slots), starttime, endtime, appointment_group),
+    )
+
+    # Busy time is widened by the buffer the same way as in get_avaiable_time_slot_for_day
+    busy_intervals = [(busy_interval.start_minute, busy_interval.end_minute) for busy_interval in all_slots]
+
+    return not get_busy_bitmap(origin, slot_end, busy_intervals, buffer) & slot_bitmap
 
 
 def hours_to_time_slot(start_time, user_timezone_offset, current_time=None) -> int:
@@ -177,17 +593,50 @@ def hours_to_time_slot(start_time, user_timezone_offset, current_time=None) -> i
     return int((start_time - current_time).total_seconds() / 3600)
 
 
-def get_time_slots_for_given_date(appointment_group: object, datetime: datetime, time_slot_cache_dict=None):
+def get_time_slots_for_given_date(
+    appointment_group: object, datetime: datetime, time_slot_cache_dict=None, google_calendar_slots=None
+):
+    data = dict(
+        get_utc_time_slots_for_given_date(appointment_group, datetime, time_slot_cache_dict, google_calendar_slots)
+    )
+    data["all_available_slots_for_data"] = [
+        {"start_time": epoch_minutes_to_datetime(start), "end_time": epoch_minutes_to_datetime(end)}
+        for start, end in data["all_available_slots_for_data"]
+    ]
+    return data
+
+
+def get_utc_time_slots_for_given_date(
+    appointment_group: object, datetime: datetime, time_slot_cache_dict=None, google_calendar_slots=None
+):
+    """
+    Get the slots of a day (system timezone) as (start, end) epoch minutes.
+
+    They do not depend on the user's timezone, so they are shared by all users through the day slot cache.
+
+    Args:
+    appointment_group (object): Appointment Group
+    datetime (datetime): Date
+    time_slot_cache_dict (dict, optional): Slots already computed in this request, by date
+    google_calendar_slots (dict, optional): Busy intervals already fetched for a date range
+
+    Returns:
+    object: Slots of the day, see get_response_body
+    """
     if time_slot_cache_dict is not None:
         if datetime in time_slot_cache_dict:
             return time_slot_cache_dict[datetime]
-    data = _get_time_slots_for_given_date(appointment_group, datetime)
+    data = get_day_slots_single_flight(
+        appointment_group,
+        datetime,
+        lambda: _get_time_slots_for_given_date(appointment_group, datetime, google_calendar_slots),
+    )
     if time_slot_cache_dict is not None:
         time_slot_cache_dict[datetime] = data
     return data
 
 
-def _get_time_slots_for_given_date(appointment_group: object, datetime: datetime):
+def _get_time_slots_for_given_date(appointment_group: object, datetime: datetime, google_calendar_slots: dict = None):
     date = datetime.date()
     weekday = get_weekday(datetime)
 
@@ -225,30 +674,22 @@ def _get_time_slots_for_given_date(appointment_group: object, datetime: datetime
             date_validation_obj=date_validation_obj,
         )
 
-    members = appointment_group.members
+    member_time_slots = get_member_time_slots(appointment_group, weekday)
+    origin, window_bitmap = get_group_window_bitmap(member_time_slots, date)
 
-    member_time_slots = {}
-    max_start_time, min_end_time = "00:00:00", "24:00:00"
-
-    for member in members:
-        if not member.is_mandatory:
-            continue
-
-        appointment_time_slots = frappe.db.get_all(
-            APPOINTMENT_TIME_SLOT,
-            filters={"parent": member.user, "day": weekday},
-            fields="*",
+    if not window_bitmap:
+        # The mandatory members have no time window in common on this day
+        return get_response_body(
+            avaiable_time_slot_for_day=[],
+            appointment_group=appointment_group,
+            date=date,
+            date_validation_obj=date_validation_obj,
         )
 
-        max_start_time, min_end_time = get_max_min_time_slot(appointment_time_slots, max_start_time, min_end_time)
-
-        member_time_slots[member.user] = appointment_time_slots
-
-    starttime = get_utc_datatime_with_time(date, max_start_time)
-    endtime = get_utc_datatime_with_time(date, min_end_time)
+    starttime, endtime = get_group_window_bounds(origin, window_bitmap)
 
     all_slots = get_all_unavailable_google_calendar_slots_for_day(
-        member_time_slots, starttime, endtime, date, appointment_group
+        member_time_slots, starttime, endtime, date, appointment_group, google_calendar_slots
     )
 
     if not all_slots and all_slots != []:
@@ -259,9 +700,13 @@ def _get_time_slots_for_given_date(appointment_group: object, datetime: datetime
             date_validation_obj=date_validation_obj,
         )
 
-    all_slots = update_cal_slots_with_events(all_slots, booking_frequency_reached_obj["events"])
+    all_slots = update_cal_slots_with_events(
+        all_slots,
+        booking_frequency_reached_obj["events"]
+        + get_members_booked_events(list(member_time_slots), starttime, endtime, appointment_group),
+    )
 
-    avaiable_time_slot_for_day = get_avaiable_time_slot_for_day(all_slots, starttime, endtime, appointment_group)
+    avaiable_time_slot_for_day = get_avaiable_time_slot_for_day(all_slots, origin, window_bitmap, appointment_group)
 
     return get_response_body(
         avaiable_time_slot_for_day=avaiable_time_slot_for_day,
@@ -273,6 +718,65 @@ def _get_time_slots_for_given_date(appointment_group: object, datetime: datetime
     )
 
 
+def get_member_time_slots(appointment_group: object, weekday: str) -> dict:
+    """Get the time windows of the mandatory members for the weekday.
+
+    Args:
+    appointment_group (object): Appointment Group
+    weekday (str): Weekday
+
+    Returns:
+    dict: member email -> list of (start, end) windows in seconds since midnight
+    """
+    member_time_slots = {}
+
+    for member in appointment_group.members:
+        if not member.is_mandatory:
+            continue
+
+        member_time_slots[member.user] = get_weekly_availability_template(member.user).get(weekday, [])
+
+    return member_time_slots
+
+
+def get_group_window_bitmap(member_time_slots: dict, date: datetime) -> tuple:
+    """Get the minute bitmap of the day (system timezone) where all the mandatory members are available.
+
+    The bitmap of each member is the union of their time windows, the group is available where all of them are
+    (bitwise AND). Slots are listed and validated from it, see get_avaiable_time_slot_for_day.
+
+    Args:
+    member_time_slots (dict): member email -> list of (start, end) windows in seconds since midnight
+    date (datetime): Date
+
+    Returns:
+    tuple: epoch minute of bit 0 (midnight of the date) and bitmap
+    """
+    origin = datetime_to_epoch_minutes(get_utc_datatime_with_time(date, "00:00:00"))
+    end = datetime_to_epoch_minutes(get_utc_datatime_with_time(add_days(date, 1), "00:00:00"))
+
+    bitmap = get_window_bitmap(origin, origin, end)
+
+    for time_slots in member_time_slots.values():
+        bitmap &= get_member_bitmap(origin, date, time_slots)
+
+    return origin, bitmap
+
+
+def get_group_window_bounds(origin: int, window_bitmap: int) -> tuple:
+    """Get the UTC datetimes around all the minutes of a non-empty group window bitmap, busy time is fetched for them.
+
+    Args:
+    origin (int): Epoch minute of bit 0
+    window_bitmap (int): Bitmap from get_group_window_bitmap
+
+    Returns:
+    tuple: start and end datetimes
+    """
+    start, end = get_bitmap_bounds(window_bitmap, origin)
+    return epoch_minutes_to_datetime(start), epoch_minutes_to_datetime(end)
+
+
 def check_availability(date_validation_obj: object, weekday: str, appointment_group: object) -> object:
     """
     Check if data is valid based on weekdays in user availability.
@@ -289,13 +793,7 @@ def check_availability(date_validation_obj: object, weekday: str, appointment_gr
         "date_validation_obj": date_validation_obj,
     }
 
-    mandatory_members = [member for member in appointment_group.members if member.is_mandatory]
-    available_days = set(ALL_DAYS)
-
-    for member in mandatory_members:
-        availability = frappe.get_doc("User Appointment Availability", member.user)
-        user_available_days = [day.day for day in availability.appointment_time_slot]
-        available_days = available_days.intersection(set(user_available_days))
+    available_days = get_available_days(appointment_group)
 
     res["available_days"] = available_days
 
@@ -326,6 +824,25 @@ def check_availability(date_validation_obj: object, weekday: str, appointment_gr
     return res
 
 
+def get_available_days(appointment_group: object) -> set:
+    """
+    Get the weekdays every mandatory member of the group has time slots on.
+
+    Args:
+    appointment_group (object): Appointment Group
+
+    Returns:
+    set: Weekdays
+    """
+    available_days = set(ALL_DAYS)
+
+    for member in appointment_group.members:
+        if member.is_mandatory:
+            available_days.intersection_update(get_weekly_availability_template(member.user))
+
+    return available_days
+
+
 def get_next_available_day(weekday: str, available_days: list) -> datetime:
     """
     Get the next available day from the given day.
@@ -524,161 +1041,107 @@ def vaild_date(date: datetime, appointment_group: object) -> object:
     }
 
 
-def update_cal_slots_with_events(all_slots: list, all_events: list) -> list:
+def get_members_booked_events(members: list, starttime: datetime, endtime: datetime, appointment_group: object) -> list:
     """
-        Function to take all Frappe events and all Google Calendar available time slots and create a new list where each slot has updated `starts_on` and `ends_on` fields.
+        Get the appointments (of any Appointment Group or personal booking) of the given members that are near [starttime, endtime].
 
         Args:
-    all_slots (list): List of all Google slots available
-    all_events (list): List of all Frappe Events
+    members (list): List of member emails
+    starttime (datetime): Start of the window (UTC)
+    endtime (datetime): End of the window (UTC)
+    appointment_group (object): Appointment Group, its buffer time widens the window
 
         Returns:
-        List: List of all slots with the updated `starts_on` and `ends_on` fields
+        List: List of events
     """
-    update_slots = []
-    for currernt_slot in all_slots:
-        updated_slot = {}
-        updated_slot["starts_on"] = convert_timezone_to_utc(
-            currernt_slot["start"]["dateTime"], currernt_slot["start"]["timeZone"]
-        )
-        updated_slot["ends_on"] = convert_timezone_to_utc(
-            currernt_slot["end"]["dateTime"], currernt_slot["end"]["timeZone"]
-        )
-
-        update_slots.append(updated_slot)
-
-    return update_slots
-
+    if not members:
+        return []
+
+    buffer_time = datetime.timedelta(seconds=int(appointment_group.minimum_buffer_time or 0))
+    system_timezone = get_system_timezone()
+
+    # Event datetimes are stored in the system timezone
+    start_datetime = get_datetime_str(convert_utc_datetime_to_timezone(starttime - buffer_time, system_timezone))
+    end_datetime = get_datetime_str(convert_utc_datetime_to_timezone(endtime + buffer_time, system_timezone))
+
+    return frappe.get_all(
+        "Event",
+        filters=[
+            ["Event Participants", "email", "in", members],
+            ["starts_on", "<", end_datetime],
+            ["ends_on", ">", start_datetime],
+            ["status", "!=", "Cancelled"],
+        ],
+        or_filters=[
+            ["custom_appointment_group", "is", "set"],
+            ["custom_appointment_slot_duration", "is", "set"],
+        ],
+        fields=["name", "starts_on", "ends_on"],
+        distinct=True,
+    )
 
-def get_avaiable_time_slot_for_day(
-    all_slots: list, starttime: datetime, endtime: datetime, appointment_group: object
-) -> list:
-    """Generate time available time slots for a given date based on Google slots within the range [starttime, endtime].
 
-    Args:
-    all_slots (list): All Google slots
-    starttime (datetime): Start time from which slots should be generated
-    endtime (datetime): End time until which slots should be generated
-    appointment_group (object): Appointment Group
-
-    Returns:
-    list: List of available slots
+def update_cal_slots_with_events(all_slots: list, all_events: list) -> list:
     """
-    available_slots = []
-
-    index = 0
-
-    minimum_buffer_time = appointment_group.minimum_buffer_time
-
-    # Start time of event
-    current_start_time = get_next_round_value(minimum_buffer_time, starttime, False)
-
-    minute, second = divmod(appointment_group.duration_for_event, 60)
-    hour, minute = divmod(minute, 60)
+        Function to take all Frappe events and all Google Calendar busy intervals and create the list of busy intervals for the day.
+        Bookings made in Frappe block their slot right away, without waiting for Google Calendar to list them.
 
-    current_end_time = add_to_date(current_start_time, hours=hour, minutes=minute, seconds=second)
-
-    # This will make sure that slots will be genrate even though we reach at end of all_slots
-    while current_end_time <= endtime:
-        if index >= len(all_slots) and current_end_time <= endtime:
-            available_slots.append({"start_time": current_start_time, "end_time": current_end_time})
-
-            current_start_time = get_next_round_value(minimum_buffer_time, current_end_time, False)
-            current_end_time = add_to_date(current_start_time, hours=hour, minutes=minute, seconds=second)
+        Args:
+    all_slots (list): List of all Google busy intervals (BusyInterval)
+    all_events (list): List of all Frappe Events
 
-            continue
+        Returns:
+        List: List of BusyInterval
+    """
+    busy_intervals = set(all_slots)
 
-        currernt_slot = all_slots[index]
-        currernt_slot_start_time = currernt_slot["starts_on"]
-        currernt_slot_end_time = currernt_slot["ends_on"]
-
-        if current_end_time <= currernt_slot_start_time and is_valid_buffer_time(
-            minimum_buffer_time,
-            current_end_time,
-            currernt_slot_start_time,
-            True,
-        ):
-            available_slots.append({"start_time": current_start_time, "end_time": current_end_time})
-            current_start_time = get_next_round_value(minimum_buffer_time, current_end_time, False)
-        else:
-            current_start_time = get_next_round_value(
-                minimum_buffer_time,
-                currernt_slot_end_time,
-                True,
+    for event in all_events:
+        busy_intervals.add(
+            BusyInterval.from_datetimes(
+                convert_datetime_to_utc(get_datetime(event["starts_on"])),
+                convert_datetime_to_utc(get_datetime(event["ends_on"])),
             )
-            index += 1
-
-        current_end_time = add_to_date(current_start_time, hours=hour, minutes=minute, seconds=second)
-
-    return available_slots
-
-
-def is_valid_buffer_time(
-    minimum_buffer_time: int,
-    end: datetime,
-    next_start: datetime,
-    is_add_buffer_in_event: bool = True,
-):
-    """Check if the time difference between the next time slot and the current time slot meets the minimum_buffer_time requirement.
-
-    Args:
-    minimum_buffer_time (datetime): Minimum buffer time to maintain
-    end (datetime): End time of the current time slot
-    next_start (datetime): Start time of the next time slot
-    is_add_buffer_in_event (bool, optional): Whether to add buffer time in the current slot. Defaults to True.
+        )
 
-    Returns:
-    bool: True if the buffer time is maintained, False otherwise
-    """
-    if not minimum_buffer_time or not is_add_buffer_in_event:
-        return True
+    return sorted(busy_intervals)
 
-    return minimum_buffer_time <= (next_start - end).seconds
 
+def get_avaiable_time_slot_for_day(all_slots: list, origin: int, window_bitmap: int, appointment_group: object) -> list:
+    """Generate the available time slots of a day from minute bitmaps of the day (system timezone).
 
-def get_next_round_value(
-    minimum_buffer_time: int,
-    current_end_time: datetime,
-    is_add_buffer_in_event: bool = True,
-):
-    """Generate the next possible start time for an event as per the buffer time value.
+    The group is free where the window bitmap is set and no busy interval, widened by the buffer time, is.
 
     Args:
-    minimum_buffer_time (datetime): Minimum buffer time to maintain
-    current_end_time (datetime): Start time of the current slot
-    is_add_buffer_in_event (bool, optional): Whether to add buffer time in the current slot. Defaults to True.
+    all_slots (list): All busy intervals (BusyInterval)
+    origin (int): Epoch minute of bit 0
+    window_bitmap (int): Bitmap of the group, see get_group_window_bitmap
+    appointment_group (object): Appointment Group
 
     Returns:
-    Datetime: Next slot possible start time
+    list: (start, end) epoch minutes of the available slots
     """
-    if not minimum_buffer_time or not is_add_buffer_in_event:
-        return current_end_time
-
-    minute, second = divmod(minimum_buffer_time, 60)
-    hour, minute = divmod(minute, 60)
-
-    min_start_time = add_to_date(current_end_time, hours=hour, minutes=minute, seconds=second)
+    end = origin + window_bitmap.bit_length()
 
-    return min_start_time
+    busy_intervals = [(busy_interval.start_minute, busy_interval.end_minute) for busy_interval in all_slots]
+    bitmap = window_bitmap & ~get_busy_bitmap(
+        origin, end, busy_intervals, seconds_to_minutes(appointment_group.minimum_buffer_time)
+    )
 
+    return get_bitmap_slots(bitmap, origin, seconds_to_minutes(appointment_group.duration_for_event))
 
-def get_max_min_time_slot(appointmen_time_slots: list, max_start_time: str, min_end_time: str) -> list:
-    """Select the maximum between the given start time and appointment_time_slots start time, and the minimum between the given end time and appointment_time_slots end time.
 
-    Args:
-    appointment_time_slots (list): Appointment time slots
-    max_start_time (str): Max start time
-    min_end_time (str): Min end time
+def get_member_bitmap(origin: int, date: datetime, time_slots: list) -> int:
+    """Get the minute bitmap of the time windows (seconds since midnight) of a member on the date, see get_window_bitmap"""
+    bitmap = 0
 
-    Returns:
-    list: Updated list of start time and min end time
-    """
-
-    for appointmen_time_slot in appointmen_time_slots:
-        max_start_time = max(max_start_time, format_time(get_time_str(appointmen_time_slot.start_time)))
-        min_end_time = min(min_end_time, format_time(get_time_str(appointmen_time_slot.end_time)))
+    for start_time, end_time in time_slots:
+        bitmap |= get_window_bitmap(
+            origin,
+            datetime_to_epoch_minutes(get_utc_datatime_with_time(date, seconds_to_time_str(start_time)), round_up=True),
+            datetime_to_epoch_minutes(get_utc_datatime_with_time(date, seconds_to_time_str(end_time))),
+        )
 
-    return [max_start_time, min_end_time]
+    return bitmap
 
 
 def is_member_on_leave_or_is_holiday(appointment_group, date):
@@ -694,40 +1157,22 @@ def is_member_on_leave_or_is_holiday(appointment_group, date):
     """
 
     # check if erpnext and hrms are installed or not
-    installed_apps = frappe.get_installed_apps()
-    if "erpnext" not in installed_apps:
-        return False
-    if "hrms" not in installed_apps:
+    if not is_hrms_installed():
         return False
 
-    date_str = date.strftime("%Y-%m-%d")
+    date = getdate(date)
 
     for member in appointment_group.members:
         if member.is_mandatory:  # Only check for mandatory members
-            employee = frappe.get_all(
-                "Employee", filters={"company_email": member.user}, fields=["name", "holiday_list"]
-            )
+            employee = get_member_employee(member.user)
             if not employee:
                 return False  # If we don't have the employee, we can't check for leaves or holidays
 
-            leaves = frappe.get_all(
-                "Leave Application",
-                filters={
-                    "employee": employee[0].name,
-                    "from_date": ["<=", date_str],
-                    "to_date": [">=", date_str],
-                    "status": "Approved",
-                },
-            )
-
-            if leaves:
+            if date in get_employee_leave_dates(employee["name"]):
                 return True
 
-            if employee and employee[0].holiday_list:
-                holidays = frappe.get_doc("Holiday List", employee[0].holiday_list)
-                for holiday in holidays.holidays:
-                    if holiday.holiday_date.strftime("%Y-%m-%d") == date_str:
-                        return True
+            if employee["holiday_list"] and date in get_holiday_dates(employee["holiday_list"]):
+                return True
 
     return False
 
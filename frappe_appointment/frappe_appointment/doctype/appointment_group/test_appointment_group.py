@@ -1,9 +1,270 @@
 # Copyright (c) 2023, rtCamp and Contributors
 # See license.txt
 
-# import frappe
+import datetime
+from unittest.mock import patch
+
+import frappe
+import pytz
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_datetime, get_datetime_str, get_system_timezone
+
+from frappe_appointment.frappe_appointment.doctype.appointment_group import appointment_group
+from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import (
+    ALL_DAYS,
+    _get_available_dates,
+    _get_time_slots_for_day,
+    _get_time_slots_for_given_date,
+    _is_valid_time_slot,
+    get_members_booked_events,
+    get_next_available_slots,
+    update_cal_slots_with_events,
+)
+from frappe_appointment.helpers.intervals import BusyInterval
+from frappe_appointment.helpers.slot_engine import (
+    datetime_to_epoch_minutes,
+    epoch_minutes_to_datetime,
+    get_compact_slots,
+)
+from frappe_appointment.helpers.utils import convert_utc_datetime_to_timezone, get_utc_datatime_with_time
+from frappe_appointment.tests.utils import start_patches
+
+HOUR = 60 * 60
 
 
 class TestAppointmentGroup(FrappeTestCase):
-    pass
+    def setUp(self):
+        self.date = add_days(get_datetime(datetime.datetime.utcnow().date()), 3)
+        self.appointment_group = frappe._dict(
+            name="_Test Appointment Group",
+            members=[frappe._dict(user="a@example.com", is_mandatory=1)],
+            duration_for_event=HOUR / 2,
+            minimum_buffer_time=0,
+            minimum_notice_before_event=0,
+            event_availability_window=0,
+        )
+
+        # Two windows in one day, with a booked event in the morning one
+        weekly_availability = {day: [(9 * HOUR, 12 * HOUR), (14 * HOUR, 17 * HOUR)] for day in ALL_DAYS}
+        booked_event = {
+            "starts_on": get_datetime_str(self.date.replace(hour=10)),
+            "ends_on": get_datetime_str(self.date.replace(hour=11)),
+        }
+
+        self.mocks = start_patches(
+            self,
+            patch.object(appointment_group, "get_weekly_availability_template", return_value=weekly_availability),
+            patch.object(appointment_group, "get_available_days", return_value=ALL_DAYS),
+            patch.object(appointment_group, "is_member_on_leave_or_is_holiday", return_value=False),
+            patch.object(
+                appointment_group,
+                "get_booking_frequency_reached",
+                return_value={"is_slots_available": True, "events": []},
+            ),
+            patch.object(appointment_group, "get_google_calendar_slots_for_range", return_value={}),
+            patch.object(appointment_group, "get_all_unavailable_google_calendar_slots_for_day", return_value=[]),
+            patch.object(appointment_group, "get_members_booked_events", return_value=[booked_event]),
+        )
+
+    def get_slot(self, time):
+        start = get_utc_datatime_with_time(self.date, time)
+        return start, start + datetime.timedelta(minutes=30)
+
+    def get_user_timezone_offset(self):
+        # The user is in the system timezone, so their date is the date of the slots
+        offset = pytz.timezone(get_system_timezone()).utcoffset(self.date).total_seconds() // 60
+        return str(int(offset))
+
+    def is_valid_time_slot(self, time):
+        start, end = self.get_slot(time)
+
+        return _is_valid_time_slot(
+            self.appointment_group,
+            self.date.strftime("%Y-%m-%d"),
+            self.get_user_timezone_offset(),
+            start.strftime("%Y-%m-%d %H:%M:%S%z"),
+            end.strftime("%Y-%m-%d %H:%M:%S%z"),
+        )
+
+    def test_slots_of_several_windows_in_a_day(self):
+        data = _get_time_slots_for_given_date(self.appointment_group, self.date)
+
+        times = ["09:00:00", "09:30:00", "11:00:00", "11:30:00"]
+        times += [f"{hour}:{minute}:00" for hour in range(14, 17) for minute in ("00", "30")]
+        self.assertEqual(
+            [
+                (epoch_minutes_to_datetime(start), epoch_minutes_to_datetime(end))
+                for start, end in data["all_available_slots_for_data"]
+            ],
+            [self.get_slot(time) for time in times],
+        )
+        # Busy time is fetched for all the windows of the day
+        self.assertEqual(
+            (data["starttime"], data["endtime"]), (self.get_slot("09:00:00")[0], self.get_slot("16:30:00")[1])
+        )
+
+        # Validation accepts the listed slots and what overlaps busy time or leaves the windows is rejected
+        for time in times:
+            self.assertTrue(self.is_valid_time_slot(time), time)
+
+        for time in ("10:00:00", "10:30:00", "12:00:00", "13:30:00", "17:00:00"):
+            self.assertFalse(self.is_valid_time_slot(time), time)
+
+    def test_validation_only_looks_around_the_slot(self):
+        self.appointment_group.minimum_buffer_time = 10 * 60
+        buffer = datetime.timedelta(minutes=10)
+
+        self.assertTrue(self.is_valid_time_slot("11:10:00"))
+
+        start, end = self.get_slot("11:10:00")
+        get_google_calendar_slots_for_range = self.mocks["get_google_calendar_slots_for_range"]
+        self.assertEqual(
+            get_google_calendar_slots_for_range.call_args.kwargs["interval"], (start - buffer, end + buffer)
+        )
+        self.assertEqual(self.mocks["get_members_booked_events"].call_args.args[1:3], (start - buffer, end + buffer))
+
+        # The buffer keeps slots off the booked event
+        for time in ("09:30:00", "11:00:00"):
+            self.assertFalse(self.is_valid_time_slot(time), time)
+
+        # Slots are not matched against the grid of the listing, it depends on all the busy time before them
+        self.assertTrue(self.is_valid_time_slot("09:15:00"))
+
+    def test_compact_slots_match_the_full_response(self):
+        held_slot = tuple(datetime_to_epoch_minutes(date_time) for date_time in self.get_slot("14:30:00"))
+        args = (self.appointment_group, self.date, self.get_user_timezone_offset())
+
+        full = _get_time_slots_for_day(*args, held_slots={held_slot})
+        compact = _get_time_slots_for_day(*args, compact=True, held_slots={held_slot})
+        encoded = get_compact_slots(compact["all_available_slots_for_data"], 30)
+
+        # The held slot is left out of both, next to the two taken by the booked event
+        self.assertEqual(full["total_slots_for_day"], 9)
+        self.assertEqual(compact["total_slots_for_day"], 9)
+        self.assertEqual(encoded["duration"], 30)
+        self.assertEqual(
+            [
+                (
+                    datetime.datetime.fromtimestamp(encoded["base"] + offset * 60, pytz.utc),
+                    datetime.datetime.fromtimestamp(encoded["base"] + (offset + encoded["duration"]) * 60, pytz.utc),
+                )
+                for offset in encoded["offsets"]
+            ],
+            [(slot["start_time"], slot["end_time"]) for slot in full["all_available_slots_for_data"]],
+        )
+
+    def test_next_available_slots_stop_at_the_limit(self):
+        after = get_utc_datatime_with_time(self.date, "00:00:00")
+
+        with patch.object(
+            appointment_group,
+            "get_utc_time_slots_for_given_date",
+            wraps=appointment_group.get_utc_time_slots_for_given_date,
+        ) as get_utc_time_slots_for_given_date:
+            slots = get_next_available_slots(self.appointment_group, after, limit=3)
+
+        self.assertEqual(
+            [(slot["start_time"], slot["end_time"]) for slot in slots],
+            [self.get_slot(time) for time in ("09:00:00", "09:30:00", "11:00:00")],
+        )
+        # The slots are found on the first day, the rest of the search window is never computed
+        get_utc_time_slots_for_given_date.assert_called_once()
+        self.mocks["get_google_calendar_slots_for_range"].assert_called_once_with(
+            ["a@example.com"], add_days(self.date, -1), add_days(self.date, 7), self.appointment_group
+        )
+
+        # Slots that start before `after` are skipped
+        slots = get_next_available_slots(self.appointment_group, get_utc_datatime_with_time(self.date, "11:10:00"))
+        self.assertEqual((slots[0]["start_time"], slots[0]["end_time"]), self.get_slot("11:30:00"))
+
+    def test_next_available_slots_skip_days_off_without_fetching(self):
+        self.mocks["is_member_on_leave_or_is_holiday"].side_effect = lambda group, day: day == self.date
+
+        slots = get_next_available_slots(self.appointment_group, get_utc_datatime_with_time(self.date, "00:00:00"))
+
+        next_date = add_days(self.date, 1)
+        start = get_utc_datatime_with_time(next_date, "09:00:00")
+        self.assertEqual(
+            (slots[0]["start_time"], slots[0]["end_time"]), (start, start + datetime.timedelta(minutes=30))
+        )
+        self.mocks["get_google_calendar_slots_for_range"].assert_called_once_with(
+            ["a@example.com"], self.date, add_days(next_date, 7), self.appointment_group
+        )
+
+    def test_available_dates_of_a_month(self):
+        date = self.date.strftime("%Y-%m-%d")
+        today = datetime.datetime.utcnow().strftime("%Y-%m-%d")
+
+        data = _get_available_dates(
+            self.appointment_group, self.date.strftime("%Y-%m"), self.get_user_timezone_offset()
+        )
+
+        self.assertIn(date, data["dates"])
+        self.assertTrue(all(available_date >= today for available_date in data["dates"]))
+        # Every day has both windows, only the booked event takes two slots off its day
+        for available_date, slot_count in data["slot_counts"].items():
+            if available_date != today:
+                self.assertEqual(slot_count, 10 if available_date == date else 12, available_date)
+
+        # Busy time is fetched once for the whole month
+        self.mocks["get_google_calendar_slots_for_range"].assert_called_once()
+
+    def test_days_off_are_not_available_dates(self):
+        weekday = self.date.strftime("%A")
+        self.mocks["get_available_days"].return_value = [day for day in ALL_DAYS if day != weekday]
+        self.mocks["is_member_on_leave_or_is_holiday"].side_effect = lambda group, day: day == add_days(self.date, 1)
+
+        data = _get_available_dates(
+            self.appointment_group, self.date.strftime("%Y-%m"), self.get_user_timezone_offset()
+        )
+
+        self.assertNotIn(self.date.strftime("%Y-%m-%d"), data["dates"])
+        self.assertNotIn(add_days(self.date, 1).strftime("%Y-%m-%d"), data["dates"])
+        self.assertTrue(all(get_datetime(available_date).strftime("%A") != weekday for available_date in data["dates"]))
+
+
+class TestBookedEvents(FrappeTestCase):
+    def get_event(self, start, end):
+        """Event as stored by Frappe, in the system timezone"""
+        system_timezone = get_system_timezone()
+        return {
+            "starts_on": get_datetime_str(convert_utc_datetime_to_timezone(start, system_timezone)),
+            "ends_on": get_datetime_str(convert_utc_datetime_to_timezone(end, system_timezone)),
+        }
+
+    def test_booked_events_are_merged_with_google_busy_time(self):
+        start = datetime.datetime(2026, 1, 5, 9, 0, tzinfo=pytz.utc)
+        end = start + datetime.timedelta(hours=1)
+        later_start = start + datetime.timedelta(hours=3)
+        later_end = later_start + datetime.timedelta(minutes=30)
+        google_calendar_slots = [BusyInterval.from_datetimes(later_start, later_end)]
+
+        # A fresh booking blocks its slot before Google Calendar lists it, once it does it is not counted twice
+        all_slots = update_cal_slots_with_events(
+            google_calendar_slots,
+            [self.get_event(later_start, later_end), self.get_event(start, end)],
+        )
+
+        self.assertEqual(
+            all_slots,
+            [BusyInterval.from_datetimes(start, end), BusyInterval.from_datetimes(later_start, later_end)],
+        )
+
+    def test_booked_events_are_looked_up_around_the_window(self):
+        starttime = datetime.datetime(2026, 1, 5, 9, 0, tzinfo=pytz.utc)
+        endtime = datetime.datetime(2026, 1, 5, 17, 0, tzinfo=pytz.utc)
+        appointment_group = frappe._dict(minimum_buffer_time=10 * 60)
+        buffer = datetime.timedelta(minutes=10)
+
+        with patch.object(frappe, "get_all", return_value=[]) as get_all:
+            self.assertEqual(get_members_booked_events([], starttime, endtime, appointment_group), [])
+            get_all.assert_not_called()
+
+            get_members_booked_events(["a@example.com"], starttime, endtime, appointment_group)
+
+        event = self.get_event(starttime - buffer, endtime + buffer)
+        filters = get_all.call_args.kwargs["filters"]
+
+        self.assertIn(["starts_on", "<", event["ends_on"]], filters)
+        self.assertIn(["ends_on", ">", event["starts_on"]], filters)
+        self.assertIn(["status", "!=", "Cancelled"], filters)
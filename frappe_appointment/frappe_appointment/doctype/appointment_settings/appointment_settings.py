@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from frappe_appointment.helpers.busy_interval_cache import get_busy_interval_cache_stats
+
 
 class AppointmentSettings(Document):
 	pass
@@ -17,3 +19,11 @@ def get_default_email_template():
         "group": appointment_settings.default_group_email_template,
         "availability": appointment_settings.default_availability_alerts_email_template,
     }
+
+
+@frappe.whitelist()
+def get_cache_stats():
+    frappe.only_for("System Manager")
+    return {
+        "busy_intervals": get_busy_interval_cache_stats(),
+    }
@@ -1,27 +1,44 @@
 # Copyright (c) 2023, rtCamp and contributors
 # For license information, please see license.txt
 
-from datetime import datetime
-from functools import cmp_to_key
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 import frappe
 from frappe import _
-from frappe.integrations.doctype.google_calendar.google_calendar import (
-    get_google_calendar_object,
-)
 from frappe.model.document import Document
+from frappe.utils import add_days, date_diff
 
-from frappe_appointment.helpers.utils import (
-    compare_end_time_slots,
-    convert_timezone_to_utc,
-    get_today_min_max_time,
+from frappe_appointment.helpers.busy_interval_cache import (
+    FETCH_MODE_EVENTS,
+    FETCH_MODE_FREEBUSY,
+    get_cached_busy_intervals,
+    set_cached_busy_intervals,
+)
+from frappe_appointment.helpers.google_calendar_mirror import get_mirrored_busy_intervals
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
+from frappe_appointment.helpers.intervals import (
+    BusyInterval,
+    is_event_on_date,
+    parse_google_event_for_member,
+    remove_duplicate_intervals,
 )
+from frappe_appointment.helpers.utils import get_today_min_max_time
 
 
 class AppointmentTimeSlot(Document):
     pass
 
 
+FREEBUSY_MAX_CALENDARS = 50  # Google allows at most 50 calendars in the items of a FreeBusy query
+GOOGLE_CALENDAR_EVENTS_PAGE_SIZE = 2500  # Google returns at most 2500 events per page of an events list
+# Only the parts of the events parse_google_event_for_member and is_event_on_date read
+GOOGLE_CALENDAR_EVENTS_FIELDS = (
+    "items(start,end,creator/email,attendees(self,responseStatus),transparency,status),nextPageToken"
+)
+
+
 class GoogleBadRequest(Exception):
     pass
 
@@ -32,6 +49,7 @@ def get_all_unavailable_google_calendar_slots_for_day(
     endtime: datetime,
     date: datetime,
     appointment_group: object,
+    google_calendar_slots: dict = None,
 ) -> list:
     """Get all google time slots of the given memebers
 
@@ -41,219 +59,400 @@ def get_all_unavailable_google_calendar_slots_for_day(
     endtime (datetime): end time for slot
     date (datetime): data for which need to fetch the data
     appointment_group (object): object
+    google_calendar_slots (dict, optional): Busy intervals already fetched for a date range, see get_google_calendar_slots_for_range
 
     Returns:
-    list: List of all google time slots of members
+    list: Sorted list of BusyInterval of all members
     """
+    google_calendar_slots = dict(google_calendar_slots or {})
+
+    members_to_fetch = [member for member in member_time_slots if member not in google_calendar_slots]
+
+    if members_to_fetch:
+        google_calendar_slots.update(
+            get_google_calendar_slots_for_range(members_to_fetch, date, date, appointment_group)
+        )
+
     cal_slots = []
 
     for member in member_time_slots:
-        google_calendar_slots = get_google_calendar_slots_member(member, starttime, endtime, date, appointment_group)
+        if member not in google_calendar_slots:
+            # Member without a Google Calendar, availability can not be verified
+            return False
+
+        busy_intervals, unreadable_events = google_calendar_slots[member]
+        google_calendar_slots_member = filter_busy_intervals_member(
+            busy_intervals, unreadable_events, starttime, endtime, date
+        )
 
-        if google_calendar_slots == False:  # noqa: E712
+        if google_calendar_slots_member == False:  # noqa: E712
             return False
 
-        cal_slots = cal_slots + google_calendar_slots
+        cal_slots = cal_slots + google_calendar_slots_member
 
-    cal_slots.sort(key=cmp_to_key(compare_end_time_slots))
+    return remove_duplicate_intervals(cal_slots)
 
-    return remove_duplicate_slots(cal_slots)
 
+def get_google_calendar_slots_for_range(
+    members: list,
+    start_date: datetime,
+    end_date: datetime,
+    appointment_group: object = None,
+    interval: tuple = None,
+) -> dict:
+    """Get the busy intervals of the given members for the whole [start_date, end_date] window.
 
-def get_google_calendar_slots_member(
-    member: str,
-    starttime: datetime,
-    endtime: datetime,
-    date: datetime,
-    appointment_group: object,
-) -> list:
-    """Fetch the google slots data for given memebr/user
+    Served from the synced Google Calendar mirror while it is fresh, then through the shared busy interval cache,
+    the members that miss both are fetched with one call per member.
 
     Args:
-    member (str): member email
-    starttime (datetime): Start time
-    endtime (datetime): end time
-    date (datetime): date
-    appointment_group (object): object
+    members (list): list of member emails
+    start_date (datetime): first date of the window
+    end_date (datetime): last date of the window
+    appointment_group (object, optional): Appointment Group, a single FreeBusy query is made if it has use_freebusy set
+    interval (tuple, optional): (start, end) UTC datetimes inside the window, the members that miss the mirror and
+    the cache are only fetched for it and the result is not cached
 
     Returns:
-    list: list of slots of user
+    dict: member email -> (busy intervals, unreadable events), members without a calendar are skipped
     """
+    dates = [add_days(start_date, days) for days in range(date_diff(end_date, start_date) + 1)]
 
-    if not member:
-        return None
+    fetch_mode = get_fetch_mode(appointment_group)
+    google_calendar_slots = {}
+    google_calendars = {}
+
+    for member in members:
+        google_calendar = get_member_google_calendar(member)
+
+        if not google_calendar or not google_calendar.google_calendar_id:
+            continue
 
-    google_calendar_id = frappe.get_value("User Appointment Availability", member, "google_calendar")
+        mirrored_slots = get_mirrored_busy_intervals(google_calendar.google_calendar_id, member, dates)
+
+        if mirrored_slots is not None:
+            google_calendar_slots[member] = mirrored_slots
+            continue
+
+        cached_slots = get_cached_busy_intervals(google_calendar.google_calendar_id, member, fetch_mode, dates)
+
+        if cached_slots is None:
+            google_calendars[member] = google_calendar
+        else:
+            google_calendar_slots[member] = cached_slots
+
+    if not google_calendars:
+        return google_calendar_slots
+
+    if interval:
+        google_calendar_slots.update(
+            fetch_google_calendar_slots(
+                google_calendars, start_date, end_date, appointment_group, time_range=get_rfc3339_range(*interval)
+            )
+        )
+        return google_calendar_slots
 
-    if not google_calendar_id:
+    for member, fetched_slots in fetch_google_calendar_slots(
+        google_calendars, start_date, end_date, appointment_group
+    ).items():
+        set_cached_busy_intervals(google_calendars[member].google_calendar_id, member, fetch_mode, dates, fetched_slots)
+        google_calendar_slots[member] = fetched_slots
+
+    return google_calendar_slots
+
+
+def fetch_google_calendar_slots(
+    google_calendars: dict,
+    start_date: datetime,
+    end_date: datetime,
+    appointment_group: object = None,
+    time_range: tuple = None,
+) -> dict:
+    """Fetch the google events of the given members for the whole [start_date, end_date] window, one call per member.
+
+    Args:
+    google_calendars (dict): member email -> Google Calendar, see get_member_google_calendar
+    start_date (datetime): first date of the window
+    end_date (datetime): last date of the window
+    appointment_group (object, optional): Appointment Group, a single FreeBusy query is made if it has use_freebusy set
+    time_range (tuple, optional): (time_min, time_max) RFC3339 strings to fetch instead of the whole window
+
+    Returns:
+    dict: member email -> (busy intervals, unreadable events)
+    """
+    time_min, time_max = time_range or (get_today_min_max_time(start_date)[1], get_today_min_max_time(end_date)[0])
+
+    if get_fetch_mode(appointment_group) == FETCH_MODE_FREEBUSY:
+        return get_google_calendar_slots_freebusy(google_calendars, time_min, time_max, appointment_group)
+
+    return get_google_calendar_slots_members(google_calendars, time_min, time_max)
+
+
+def get_rfc3339_range(start: datetime, end: datetime) -> tuple:
+    """Format an aware (start, end) pair as the RFC3339 UTC strings the Calendar API takes"""
+    return tuple(date_time.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") for date_time in (start, end))
+
+
+def get_fetch_mode(appointment_group: object = None) -> str:
+    """Get how busy intervals are fetched for the Appointment Group, one FreeBusy query if use_freebusy is set"""
+    if appointment_group and appointment_group.get("use_freebusy"):
+        return FETCH_MODE_FREEBUSY
+
+    return FETCH_MODE_EVENTS
+
+
+def get_member_google_calendar(member: str) -> dict:
+    """Get the name and the google calendar id of the Google Calendar linked to the member's availability"""
+    google_calendar = frappe.get_value("User Appointment Availability", member, "google_calendar")
+
+    if not google_calendar:
         return None
 
-    google_calendar = frappe.get_doc("Google Calendar", google_calendar_id)
+    return frappe.get_value("Google Calendar", google_calendar, ["name", "google_calendar_id"], as_dict=True)
+
+
+def get_google_calendar_slots_members(google_calendars: dict, time_min: str, time_max: str) -> dict:
+    """Fetch the google calendar events of the given members between time_min and time_max into busy intervals.
+
+    The requests are built here from the cached API objects. The events of each member are fetched page by page
+    and parsed as they come in a thread pool bounded by `max_concurrent_google_calendar_requests` of Appointment
+    Settings, so the wait is the one of the slowest member and only one page per member is held in memory.
+
+    Args:
+    google_calendars (dict): member email -> Google Calendar, see get_member_google_calendar
+    time_min (str): lower bound (RFC3339) of the event end time
+    time_max (str): upper bound (RFC3339) of the event start time
+
+    Returns:
+    dict: member email -> (busy intervals, unreadable events)
+    """
+    if not google_calendars:
+        return {}
+
+    google_calendar_requests = {
+        member: get_google_calendar_events_request(google_calendar.name, time_min, time_max)
+        for member, google_calendar in google_calendars.items()
+    }
+
+    max_workers = min(get_max_concurrent_google_calendar_requests(), len(google_calendar_requests))
 
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            member: executor.submit(parse_google_calendar_events_member, member, google_calendar, events)
+            for member, (google_calendar, events) in google_calendar_requests.items()
+        }
+
+    google_calendar_slots = {}
+
+    for member, future in futures.items():
+        try:
+            google_calendar_slots[member] = future.result()
+        except Exception as err:
+            frappe.throw(
+                _("Google Calendar - Could not fetch event from Google Calendar, error code {0}.").format(
+                    getattr(getattr(err, "resp", None), "status", None)
+                )
+            )
+
+    return google_calendar_slots
+
+
+def get_google_calendar_events_request(google_calendar: str, time_min: str, time_max: str) -> tuple:
+    """Build the events list of a google calendar, nothing is fetched until it is iterated
+
+    Args:
+    google_calendar (str): Google Calendar name
+    time_min (str): lower bound (RFC3339) of the event end time
+    time_max (str): upper bound (RFC3339) of the event start time
+
+    Returns:
+    tuple: Google Calendar doc and an iterator of its events
+    """
     try:
-        google_calendar_api_obj, account = get_google_calendar_object(google_calendar.name)
+        google_calendar_api_obj, google_calendar = get_google_calendar_service(google_calendar)
     except Exception:
         raise GoogleBadRequest(_("Google Calendar - Could not create Google Calendar API object."))
 
-    events = []
+    events_resource = google_calendar_api_obj.events()
+    request = events_resource.list(
+        calendarId=google_calendar.google_calendar_id,
+        maxResults=GOOGLE_CALENDAR_EVENTS_PAGE_SIZE,
+        singleEvents=True,
+        timeMax=time_max,
+        timeMin=time_min,
+        orderBy="startTime",
+        fields=GOOGLE_CALENDAR_EVENTS_FIELDS,
+    )
 
-    try:
-        time_max, time_min = get_today_min_max_time(date)
-
-        events = (
-            google_calendar_api_obj.events()
-            .list(
-                calendarId=google_calendar.google_calendar_id,
-                maxResults=2000,
-                singleEvents=True,
-                timeMax=time_max,
-                timeMin=time_min,
-                orderBy="startTime",
-            )
-            .execute()
-        )
+    return google_calendar, iter_google_calendar_events(events_resource, request)
 
-        # Fetch availability
-        # ref: https://github.com/rtCamp/frappe-appointment/issues/67
-        # availability = (
-        #     google_calendar_api_obj.freebusy()
-        #     .query(
-        #         body={
-        #             "timeMin": time_min,
-        #             "timeMax": time_max,
-        #             "items": [{"id": google_calendar.google_calendar_id}],
-        #         }
-        #     )
-        #     .execute()
-        # )
-    except Exception as err:
-        frappe.throw(
-            _("Google Calendar - Could not fetch event from Google Calendar, error code {0}.").format(err.resp.status)
-        )
 
-    events_items = events["items"]
-    range_events = []
+def iter_google_calendar_events(events_resource: object, request: object) -> Iterator[dict]:
+    """Execute an events list request and follow its pages, each page is fetched once the previous one is consumed.
+    Runs in worker threads, so it must not touch frappe.local.
 
-    for event in events_items:
-        try:
-            creator = event.get("creator", {}).get("email")
-            if creator != member:
-                attendees = event.get("attendees", [])
-                filtered_attendees = [attendee for attendee in attendees if attendee.get("self", False)]
-
-                if len(filtered_attendees) > 0:
-                    attendee = filtered_attendees[0]
-
-                    if attendee.get("responseStatus") == "declined":
-                        continue
-                else:
-                    continue
-
-            if check_if_datetime_in_range(
-                convert_timezone_to_utc(event["start"]["dateTime"], event["start"]["timeZone"]),
-                convert_timezone_to_utc(event["end"]["dateTime"], event["end"]["timeZone"]),
-                starttime,
-                endtime,
-            ):
-                range_events.append(event)
-        except Exception:
-            if "timeZone" not in event["start"] and google_calendar.custom_ignore_all_day_events:
-                pass
-            else:
-                return False
+    Args:
+    events_resource (object): events resource of the Google Calendar API object
+    request (object): Google API request of the first page
 
-    return range_events
+    Yields:
+    dict: Google Calendar event
+    """
+    while request is not None:
+        response = request.execute()
+        yield from response.get("items", [])
+        request = events_resource.list_next(request, response)
 
 
-def remove_duplicate_slots(cal_slots: list):
-    """Remove duplicate from google slots
+def get_google_calendar_slots_freebusy(
+    google_calendars: dict, time_min: str, time_max: str, appointment_group: object
+) -> dict:
+    """Fetch the busy intervals of all the given members with a single FreeBusy query of the Event Creator calendar.
+    ref: https://github.com/rtCamp/frappe-appointment/issues/67
 
     Args:
-    cal_slots (list): List of time slots
+    google_calendars (dict): member email -> Google Calendar, see get_member_google_calendar
+    time_min (str): start (RFC3339) of the window
+    time_max (str): end (RFC3339) of the window
+    appointment_group (object): Appointment Group
 
     Returns:
-    _type_: List of time slots
+    dict: member email -> (busy intervals, unreadable events)
     """
-    if len(cal_slots) <= 1:
-        return cal_slots
+    if not google_calendars:
+        return {}
 
-    current = 1
-    last = 0
-    remove_duplicate_time_slots = []
+    calendar_ids = {member: google_calendar.google_calendar_id for member, google_calendar in google_calendars.items()}
 
-    remove_duplicate_time_slots.append(cal_slots[last])
+    try:
+        google_calendar_api_obj = get_google_calendar_service(appointment_group.event_creator)[0]
+    except Exception:
+        raise GoogleBadRequest(_("Google Calendar - Could not create Google Calendar API object."))
 
-    while current < len(cal_slots):
-        last_start = convert_timezone_to_utc(cal_slots[last]["start"]["dateTime"], cal_slots[last]["start"]["timeZone"])
-        last_end = convert_timezone_to_utc(cal_slots[last]["end"]["dateTime"], cal_slots[last]["end"]["timeZone"])
-        current_start = convert_timezone_to_utc(
-            cal_slots[current]["start"]["dateTime"],
-            cal_slots[current]["start"]["timeZone"],
-        )
-        current_end = convert_timezone_to_utc(
-            cal_slots[current]["end"]["dateTime"], cal_slots[current]["end"]["timeZone"]
+    try:
+        return get_freebusy_busy_intervals(google_calendar_api_obj, calendar_ids, time_min, time_max)
+    except Exception as err:
+        frappe.throw(
+            _("Google Calendar - Could not fetch event from Google Calendar, error code {0}.").format(
+                getattr(getattr(err, "resp", None), "status", None)
+            )
         )
 
-        if current_start == last_start and current_end == last_end:
-            current += 1
-            continue
 
-        remove_duplicate_time_slots.append(cal_slots[current])
-        last = current
-        current += 1
+def get_freebusy_busy_intervals(
+    google_calendar_api_obj: object, calendar_ids: dict, time_min: str, time_max: str
+) -> dict:
+    """Run the FreeBusy query for the given calendars and turn the busy blocks into busy intervals
 
-    return remove_duplicate_time_slots
+    Args:
+    google_calendar_api_obj (object): Google Calendar API object (or a fake one exposing freebusy().query())
+    calendar_ids (dict): member email -> google calendar id
+    time_min (str): start (RFC3339) of the window
+    time_max (str): end (RFC3339) of the window
+
+    Returns:
+    dict: member email -> (busy intervals, unreadable events)
+    """
+    calendar_ids_list = list(dict.fromkeys(calendar_ids.values()))
+    calendars = {}
+
+    for index in range(0, len(calendar_ids_list), FREEBUSY_MAX_CALENDARS):
+        response = (
+            google_calendar_api_obj.freebusy()
+            .query(
+                body={
+                    "timeMin": time_min,
+                    "timeMax": time_max,
+                    "items": [
+                        {"id": calendar_id} for calendar_id in calendar_ids_list[index : index + FREEBUSY_MAX_CALENDARS]
+                    ],
+                }
+            )
+            .execute()
+        )
+        calendars.update(response.get("calendars", {}))
+
+    # A calendar that could not be read makes the whole window unavailable, like an unreadable event does
+    window_event = {"start": {"date": time_min[:10]}, "end": {"dateTime": time_max}}
 
+    google_calendar_slots = {}
 
-def is_busy_event(event: object, availability: object, user: str):
-    if (
-        not availability.get("calendars")
-        or not availability["calendars"].get(user)
-        or availability["calendars"][user].get("errors")
-    ):
-        # If error then assume the slot as busy only
-        return True
+    for member, calendar_id in calendar_ids.items():
+        calendar = calendars.get(calendar_id)
 
-    busy_array = availability["calendars"][user]["busy"]
+        if not calendar or calendar.get("errors"):
+            google_calendar_slots[member] = ([], [window_event])
+            continue
+
+        busy_intervals = sorted(BusyInterval.from_iso_strings(busy["start"], busy["end"]) for busy in calendar["busy"])
+        google_calendar_slots[member] = (busy_intervals, [])
 
-    start_utc = convert_timezone_to_utc(event["start"]["dateTime"], event["start"]["timeZone"])
-    end_utc = convert_timezone_to_utc(event["end"]["dateTime"], event["end"]["timeZone"])
+    return google_calendar_slots
 
-    for busy in busy_array:
-        if datetime.fromisoformat(busy["start"]) == start_utc and datetime.fromisoformat(busy["end"]) == end_utc:
-            return True
 
-    return False
+def get_max_concurrent_google_calendar_requests() -> int:
+    """Get the number of Google Calendar requests that can run at the same time while computing slots"""
+    max_concurrent_requests = frappe.db.get_single_value(
+        "Appointment Settings", "max_concurrent_google_calendar_requests"
+    )
+    return max(int(max_concurrent_requests or 1), 1)
 
 
-def check_if_datetime_in_range(
-    start_datetime: datetime,
-    end_datetime: datetime,
-    lower_datetime: datetime,
-    upper_datetime: datetime,
-):
-    """Check if [start_datetime, end_datetime] (s1) has an intersection with [lower_datetime, upper_datetime] (r1).
+def parse_google_calendar_events_member(member: str, google_calendar: object, events_items: Iterable) -> tuple:
+    """Parse the google events once into the busy intervals of the member
 
     Args:
-    start_datetime (datetime): Start Datetime
-    end_datetime (datetime): End Datetime
-    lower_datetime (datetime): Lower Datetime (Start time of range)
-    upper_datetime (datetime): Upper Datetime (End time of range)
+    member (str): member email
+    google_calendar (object): Google Calendar doc of the member
+    events_items (Iterable): Google Calendar events, consumed once
 
     Returns:
-    bool: True if s1 has overlap with r1, False otherwise.
+    tuple: sorted list of BusyInterval, list of events that could not be read
     """
+    busy_intervals = []
+    unreadable_events = []
+
+    for event in events_items:
+        try:
+            busy_interval = parse_google_event_for_member(member, event)
+        except Exception:
+            if "timeZone" not in event["start"] and google_calendar.custom_ignore_all_day_events:
+                pass
+            else:
+                unreadable_events.append(event)
+            continue
+
+        if busy_interval:
+            busy_intervals.append(busy_interval)
 
-    # if lower_datetime <= start_datetime and end_datetime <= upper_datetime:
-    # 	return True
+    busy_intervals.sort()
 
-    # if end_datetime > lower_datetime and lower_datetime > start_datetime:
-    # 	return True
+    return busy_intervals, unreadable_events
+
+
+def filter_busy_intervals_member(
+    busy_intervals: list,
+    unreadable_events: list,
+    starttime: datetime,
+    endtime: datetime,
+    date: datetime,
+) -> list:
+    """Keep the busy intervals which overlap [starttime, endtime]
 
-    # if start_datetime < upper_datetime and upper_datetime < end_datetime:
-    # 	return True
+    Args:
+    busy_intervals (list): BusyInterval of the member
+    unreadable_events (list): events of the member that could not be read
+    starttime (datetime): Start time
+    endtime (datetime): end time
+    date (datetime): date for which the slots are computed
 
-    if lower_datetime > end_datetime or upper_datetime < start_datetime:
+    Returns:
+    list: list of BusyInterval, False if an event of the given date could not be read
+    """
+    # Events fetched for a date range may belong to another day
+    if any(is_event_on_date(event, date) for event in unreadable_events):
         return False
 
-    return True
+    lower, upper = int(starttime.timestamp()), int(endtime.timestamp())
+
+    return [busy_interval for busy_interval in busy_intervals if busy_interval.overlaps(lower, upper)]
@@ -0,0 +1,222 @@
+# Copyright (c) 2023, rtCamp and Contributors
+# See license.txt
+
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import frappe
+import pytz
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.frappe_appointment.doctype.appointment_time_slot import appointment_time_slot
+from frappe_appointment.frappe_appointment.doctype.appointment_time_slot.appointment_time_slot import (
+    filter_busy_intervals_member,
+    get_freebusy_busy_intervals,
+    get_google_calendar_slots_members,
+    parse_google_calendar_events_member,
+)
+from frappe_appointment.helpers.intervals import BusyInterval
+from frappe_appointment.tests.utils import start_patches
+
+MEMBER = "a@example.com"
+
+
+def get_event(start, end, **kwargs):
+    return {
+        "start": {"dateTime": f"2025-03-03T{start}:00", "timeZone": "UTC"},
+        "end": {"dateTime": f"2025-03-03T{end}:00", "timeZone": "UTC"},
+        "creator": {"email": MEMBER},
+        **kwargs,
+    }
+
+
+def get_all_day_event(date, end_date):
+    return {"start": {"date": date}, "end": {"date": end_date}, "creator": {"email": MEMBER}}
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeGoogleCalendarService:
+    """Local stand-in for the Google Calendar API object, answers FreeBusy queries from a dict"""
+
+    def __init__(self, calendars):
+        self.calendars = calendars
+        self.queries = []
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        self.queries.append(body)
+        return FakeRequest(
+            {
+                "calendars": {
+                    item["id"]: self.calendars[item["id"]] for item in body["items"] if item["id"] in self.calendars
+                }
+            }
+        )
+
+
+class TestAppointmentTimeSlot(FrappeTestCase):
+    def test_freebusy_single_query_for_all_members(self):
+        service = FakeGoogleCalendarService(
+            {
+                "a@example.com": {
+                    "busy": [
+                        {"start": "2025-03-03T11:00:00Z", "end": "2025-03-03T11:30:00Z"},
+                        {"start": "2025-03-03T09:00:00Z", "end": "2025-03-03T10:00:00Z"},
+                    ]
+                },
+                "b@example.com": {"busy": []},
+            }
+        )
+
+        slots = get_freebusy_busy_intervals(
+            service,
+            {"a@example.com": "a@example.com", "b@example.com": "b@example.com"},
+            "2025-03-03T00:00:00Z",
+            "2025-03-03T23:59:59Z",
+        )
+
+        self.assertEqual(len(service.queries), 1)
+        self.assertEqual(len(service.queries[0]["items"]), 2)
+        self.assertEqual(
+            slots["a@example.com"],
+            (
+                [
+                    BusyInterval(1740992400, 1740996000),
+                    BusyInterval(1740999600, 1741001400),
+                ],
+                [],
+            ),
+        )
+        self.assertEqual(slots["b@example.com"], ([], []))
+
+    def test_freebusy_calendar_errors_block_the_window(self):
+        service = FakeGoogleCalendarService({"a@example.com": {"busy": [], "errors": [{"reason": "notFound"}]}})
+
+        slots = get_freebusy_busy_intervals(
+            service, {"a@example.com": "a@example.com"}, "2025-03-03T00:00:00Z", "2025-03-03T23:59:59Z"
+        )
+
+        busy_intervals, unreadable_events = slots["a@example.com"]
+        self.assertEqual(busy_intervals, [])
+        self.assertEqual(len(unreadable_events), 1)
+
+    def test_events_are_parsed_once_into_sorted_busy_intervals(self):
+        events = [
+            get_event("11:00", "11:30"),
+            get_all_day_event("2025-03-04", "2025-03-05"),
+            get_event("09:00", "10:00"),
+            get_event("12:00", "13:00", status="cancelled"),
+        ]
+
+        # A generator can only be read once, like the pages of a Google events list
+        busy_intervals, unreadable_events = parse_google_calendar_events_member(
+            MEMBER, frappe._dict(custom_ignore_all_day_events=0), (event for event in events)
+        )
+
+        self.assertEqual(busy_intervals, [BusyInterval(1740992400, 1740996000), BusyInterval(1740999600, 1741001400)])
+        self.assertEqual(unreadable_events, [get_all_day_event("2025-03-04", "2025-03-05")])
+
+        busy_intervals, unreadable_events = parse_google_calendar_events_member(
+            MEMBER, frappe._dict(custom_ignore_all_day_events=1), iter(events)
+        )
+
+        self.assertEqual(len(busy_intervals), 2)
+        self.assertEqual(unreadable_events, [])
+
+    def test_filter_busy_intervals_member(self):
+        busy_intervals = [BusyInterval(1740992400, 1740996000), BusyInterval(1740999600, 1741001400)]
+        starttime = datetime(2025, 3, 3, 10, 0, tzinfo=pytz.utc)
+        endtime = datetime(2025, 3, 3, 10, 30, tzinfo=pytz.utc)
+
+        # Intervals touching the bounds are kept
+        self.assertEqual(
+            filter_busy_intervals_member(busy_intervals, [], starttime, endtime, datetime(2025, 3, 3)),
+            busy_intervals[:1],
+        )
+
+        # An event that could not be read only blocks the dates it falls on
+        unreadable_events = [get_all_day_event("2025-03-04", "2025-03-05")]
+        self.assertEqual(
+            filter_busy_intervals_member(busy_intervals, unreadable_events, starttime, endtime, datetime(2025, 3, 3)),
+            busy_intervals[:1],
+        )
+        self.assertFalse(
+            filter_busy_intervals_member(busy_intervals, unreadable_events, starttime, endtime, datetime(2025, 3, 4))
+        )
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        self.resp = frappe._dict(status=status)
+
+
+class TestGoogleCalendarSlotsMembers(FrappeTestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        # Every member waits for another one, which only returns if two are fetched at the same time
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.errors = {}
+
+        start_patches(
+            self,
+            patch.object(
+                appointment_time_slot, "get_google_calendar_events_request", side_effect=self.get_events_request
+            ),
+            patch.object(appointment_time_slot, "get_max_concurrent_google_calendar_requests", return_value=2),
+        )
+
+    def get_events_request(self, google_calendar, time_min, time_max):
+        return frappe._dict(custom_ignore_all_day_events=0), self.iter_events(google_calendar)
+
+    def iter_events(self, google_calendar):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        try:
+            self.barrier.wait()
+
+            if google_calendar in self.errors:
+                raise self.errors[google_calendar]
+
+            yield {**get_event("09:00", "10:00"), "creator": {"email": google_calendar}}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+    def get_google_calendars(self, count):
+        return {
+            f"{index}@example.com": frappe._dict(name=f"{index}@example.com", google_calendar_id=f"{index}@example.com")
+            for index in range(count)
+        }
+
+    def test_members_are_fetched_concurrently_within_the_limit(self):
+        slots = get_google_calendar_slots_members(
+            self.get_google_calendars(4), "2025-03-03T00:00:00Z", "2025-03-03T23:59:59Z"
+        )
+
+        self.assertEqual(self.max_running, 2)
+        self.assertEqual(list(slots), [f"{index}@example.com" for index in range(4)])
+        self.assertEqual(slots["3@example.com"], ([BusyInterval(1740992400, 1740996000)], []))
+
+    def test_failed_member_fails_the_fetch(self):
+        self.errors["1@example.com"] = FakeHttpError(403)
+
+        with self.assertRaises(frappe.ValidationError) as context:
+            get_google_calendar_slots_members(
+                self.get_google_calendars(2), "2025-03-03T00:00:00Z", "2025-03-03T23:59:59Z"
+            )
+
+        self.assertIn("403", str(context.exception))
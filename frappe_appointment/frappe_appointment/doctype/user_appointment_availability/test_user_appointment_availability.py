@@ -1,9 +1,65 @@
 # Copyright (c) 2023, rtCamp and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from frappe_appointment.frappe_appointment.doctype.user_appointment_availability import (
+    user_appointment_availability,
+)
+from frappe_appointment.frappe_appointment.doctype.user_appointment_availability.user_appointment_availability import (
+    UserAppointmentAvailability,
+    clear_weekly_availability_template,
+    get_weekly_availability_template,
+)
+from frappe_appointment.tests.utils import start_patches
+
+USER = "_test_availability@example.com"
+HOUR = 60 * 60
+
 
 class TestUserAppointmentAvailability(FrappeTestCase):
-    pass
+    def setUp(self):
+        self.time_slots = [
+            frappe._dict(day="Monday", start_time="09:00:00", end_time="12:00:00"),
+            frappe._dict(day="Monday", start_time="14:00:00", end_time="17:00:00"),
+            frappe._dict(day="Friday", start_time="10:00:00", end_time="11:00:00"),
+        ]
+
+        self.mocks = start_patches(
+            self,
+            patch.object(frappe.db, "get_all", side_effect=lambda *args, **kwargs: self.time_slots),
+            patch.object(user_appointment_availability, "bump_availability_generation"),
+            patch.object(user_appointment_availability, "enqueue_availability_snapshot_refresh_for_members"),
+        )
+
+        clear_weekly_availability_template(USER)
+        self.addCleanup(clear_weekly_availability_template, USER)
+
+    def test_weekly_availability_template_is_cached_until_saved(self):
+        template = {"Monday": [(9 * HOUR, 12 * HOUR), (14 * HOUR, 17 * HOUR)], "Friday": [(10 * HOUR, 11 * HOUR)]}
+
+        self.assertEqual(get_weekly_availability_template(USER), template)
+        self.assertEqual(get_weekly_availability_template(USER), template)
+
+        get_all = self.mocks["get_all"]
+        get_all.assert_called_once()
+        self.assertEqual(get_all.call_args.kwargs["filters"], {"parent": USER})
+
+        # Saving the availability compiles the template again from its new time slots
+        self.time_slots = self.time_slots[:1]
+        UserAppointmentAvailability.on_update(frappe._dict(name=USER))
+
+        self.assertEqual(get_weekly_availability_template(USER), {"Monday": [(9 * HOUR, 12 * HOUR)]})
+        self.assertEqual(get_all.call_count, 2)
+        self.mocks["bump_availability_generation"].assert_called_once_with([USER])
+
+    def test_deleted_availability_clears_its_template(self):
+        get_weekly_availability_template(USER)
+
+        self.time_slots = []
+        UserAppointmentAvailability.on_trash(frappe._dict(name=USER))
+
+        self.assertEqual(get_weekly_availability_template(USER), {})
@@ -7,10 +7,12 @@ from datetime import datetime
 import frappe
 import frappe.utils
 from frappe.model.document import Document
-from frappe.utils.data import add_to_date
+from frappe.utils.data import add_to_date, to_timedelta
 
 from frappe_appointment.constants import APPOINTMENT_TIME_SLOT
+from frappe_appointment.helpers.availability_snapshot import enqueue_availability_snapshot_refresh_for_members
 from frappe_appointment.helpers.intervals import find_intersection_interval
+from frappe_appointment.helpers.slot_cache import bump_availability_generation
 from frappe_appointment.helpers.utils import (
     convert_datetime_to_utc,
     convert_utc_datetime_to_timezone,
@@ -19,6 +21,7 @@ from frappe_appointment.helpers.utils import (
 )
 
 SLUG_REGEX = re.compile(r"^[a-z0-9_]+(?:-[a-z0-9_]+)*$")
+WEEKLY_AVAILABILITY_TEMPLATE_CACHE_KEY = "frappe_appointment:weekly_availability_template"
 
 
 class UserAppointmentAvailability(Document):
@@ -71,6 +74,49 @@ class UserAppointmentAvailability(Document):
                 )
                 return frappe.throw(frappe._(f"Please set Zoom User Email in {google_calendar_link}."))
 
+    def on_update(self):
+        clear_weekly_availability_template(self.name)
+        bump_availability_generation([self.name])
+        enqueue_availability_snapshot_refresh_for_members([self.name])
+
+    def on_trash(self):
+        clear_weekly_availability_template(self.name)
+        bump_availability_generation([self.name])
+        enqueue_availability_snapshot_refresh_for_members([self.name])
+
+
+def get_weekly_availability_template(user: str) -> dict:
+    """Get the weekly availability of the user, compiled once from its time slots and cached until the availability is saved.
+
+    Args:
+    user (str): User Appointment Availability name
+
+    Returns:
+    dict: weekday -> list of (start, end) windows in seconds since midnight
+    """
+    return frappe.cache.hget(
+        WEEKLY_AVAILABILITY_TEMPLATE_CACHE_KEY, user, generator=lambda: build_weekly_availability_template(user)
+    )
+
+
+def build_weekly_availability_template(user: str) -> dict:
+    template = {}
+
+    for slot in frappe.db.get_all(
+        APPOINTMENT_TIME_SLOT,
+        filters={"parent": user},
+        fields=["day", "start_time", "end_time"],
+    ):
+        template.setdefault(slot.day, []).append(
+            (int(to_timedelta(slot.start_time).total_seconds()), int(to_timedelta(slot.end_time).total_seconds()))
+        )
+
+    return template
+
+
+def clear_weekly_availability_template(user: str) -> None:
+    frappe.cache.hdel(WEEKLY_AVAILABILITY_TEMPLATE_CACHE_KEY, user)
+
 
 def suggest_slug(og_slug: str):
     for i in range(1, 100):
@@ -0,0 +1,263 @@
+import datetime
+import json
+
+import frappe
+import pytz
+from frappe.utils import add_days, add_to_date, get_datetime, getdate, now_datetime
+
+from frappe_appointment.constants import (
+    APPOINTMENT_AVAILABILITY_SNAPSHOT,
+    APPOINTMENT_GROUP,
+    APPOINTMENT_SLOT_DURATION,
+    USER_APPOINTMENT_AVAILABILITY,
+)
+from frappe_appointment.helpers.utils import convert_datetime_to_utc
+
+REFRESH_AVAILABILITY_SNAPSHOT_METHOD = (
+    "frappe_appointment.frappe_appointment.doctype.appointment_availability_snapshot."
+    "appointment_availability_snapshot.refresh_availability_snapshot"
+)
+
+# How often (seconds) the scheduler refreshes the stale days of the snapshots, see hooks.py
+AVAILABILITY_SNAPSHOT_REFRESH_INTERVAL = 10 * 60
+
+
+def get_availability_snapshot_max_age() -> int:
+    """Get the age (seconds) past which a snapshot is not served, 0 if the snapshot is disabled"""
+    if not frappe.db.get_single_value("Appointment Settings", "enable_availability_snapshot"):
+        return 0
+    return int(frappe.db.get_single_value("Appointment Settings", "availability_snapshot_max_age") or 0)
+
+
+def get_snapshot_reference(appointment_group: object) -> tuple:
+    """Get the (reference_doctype, reference_name) the snapshot of an appointment group is stored under"""
+    if appointment_group.get("is_personal_meeting"):
+        return APPOINTMENT_SLOT_DURATION, appointment_group.duration_id
+    return APPOINTMENT_GROUP, appointment_group.name
+
+
+def get_availability_snapshot(appointment_group: object, start_date: datetime, end_date: datetime) -> tuple:
+    """Read the precomputed slots of the days [start_date, end_date] (system timezone) with one indexed query.
+
+    Args:
+    appointment_group (object): Appointment Group
+    start_date (datetime): first day
+    end_date (datetime): last day
+
+    Returns:
+    tuple: (date -> day slots like get_utc_time_slots_for_given_date, time of the oldest refresh),
+    None if the snapshot is disabled, too old or misses any of the days
+    """
+    max_age = get_availability_snapshot_max_age()
+
+    if not max_age:
+        return None
+
+    reference_doctype, reference_name = get_snapshot_reference(appointment_group)
+
+    if not reference_name:
+        return None
+
+    rows = frappe.get_all(
+        APPOINTMENT_AVAILABILITY_SNAPSHOT,
+        filters={
+            "reference_doctype": reference_doctype,
+            "reference_name": reference_name,
+            "date": ["between", [getdate(start_date), getdate(end_date)]],
+        },
+        fields=["*"],
+    )
+
+    if len(rows) != (getdate(end_date) - getdate(start_date)).days + 1:
+        return None
+
+    refreshed_at = min(get_datetime(row.refreshed_at) for row in rows)
+
+    if (now_datetime() - refreshed_at).total_seconds() > max_age:
+        return None
+
+    # Valid dates move with the current UTC date (see vaild_date), a snapshot of yesterday is never served
+    if convert_datetime_to_utc(refreshed_at).date() != datetime.datetime.utcnow().date():
+        return None
+
+    return {get_datetime(row.date): get_day_slots_from_snapshot(appointment_group, row) for row in rows}, refreshed_at
+
+
+def get_time_slot_cache_dict(appointment_group: object, start_date: str, end_date: str) -> tuple:
+    """Get the slots of the days a request for [start_date, end_date] (user dates) reads, from the snapshot if it is fresh.
+
+    Args:
+    appointment_group (object): Appointment Group
+    start_date (str): first date for the user
+    end_date (str): last date for the user
+
+    Returns:
+    tuple: (date -> day slots to seed time_slot_cache_dict with, time the slots were computed)
+    """
+    # Slots of a date for the user come from the day before or after it in the system timezone
+    snapshot = get_availability_snapshot(appointment_group, add_days(start_date, -1), add_days(end_date, 1))
+
+    if not snapshot:
+        return {}, now_datetime()
+
+    return snapshot
+
+
+def get_day_slots_from_snapshot(appointment_group: object, row: object) -> dict:
+    """Rebuild the day slots, see get_response_body, from a snapshot row"""
+
+    def to_datetime(value):
+        return get_datetime(value) if value else ""
+
+    return {
+        "all_available_slots_for_data": [tuple(slot) for slot in json.loads(row.slots or "[]")],
+        "date": getdate(row.date),
+        "duration": appointment_group.duration_for_event,
+        "appointment_group_id": appointment_group.name,
+        "starttime": pytz.utc.localize(get_datetime(row.starttime)) if row.starttime else None,
+        "endtime": pytz.utc.localize(get_datetime(row.endtime)) if row.endtime else None,
+        "total_slots_for_day": row.total_slots,
+        "valid_start_date": to_datetime(row.valid_start_date),
+        "valid_end_date": to_datetime(row.valid_end_date),
+        "next_valid_date": to_datetime(row.next_valid_date),
+        "prev_valid_date": to_datetime(row.prev_valid_date),
+        "available_days": json.loads(row.available_days or "[]"),
+        "is_invalid_date": bool(row.is_invalid_date),
+    }
+
+
+def get_snapshot_values_from_day_slots(data: dict) -> dict:
+    """Flatten the day slots, see get_response_body, into the fields of a snapshot row"""
+
+    def to_date(value):
+        return getdate(value) if value else None
+
+    def to_utc(value):
+        return value.astimezone(pytz.utc).replace(tzinfo=None) if value else None
+
+    return {
+        "date": getdate(data["date"]),
+        "slots": json.dumps([list(slot) for slot in data["all_available_slots_for_data"]]),
+        "total_slots": data["total_slots_for_day"],
+        "is_invalid_date": int(bool(data["is_invalid_date"])),
+        "starttime": to_utc(data["starttime"]),
+        "endtime": to_utc(data["endtime"]),
+        "valid_start_date": to_date(data["valid_start_date"]),
+        "valid_end_date": to_date(data["valid_end_date"]),
+        "next_valid_date": to_date(data["next_valid_date"]),
+        "prev_valid_date": to_date(data["prev_valid_date"]),
+        "available_days": json.dumps(sorted(data["available_days"])),
+    }
+
+
+def enqueue_availability_snapshot_refresh(
+    reference_doctype: str, reference_name: str, dates: list = None, stale_only: bool = False
+) -> None:
+    """Refresh the snapshot of an Appointment Group or Appointment Slot Duration in the background.
+
+    A refresh of the whole window is deduplicated, one of a few dates is not as it is cheap and must not be dropped.
+
+    Args:
+    reference_doctype (str): Appointment Group or Appointment Slot Duration
+    reference_name (str): name of the document
+    dates (list, optional): days to refresh, the whole window if not given
+    stale_only (bool, optional): only refresh the days that are missing or about to be too old to be served
+    """
+    if not get_availability_snapshot_max_age():
+        return
+
+    job_id = None
+
+    if not dates:
+        job_id = f"refresh_availability_snapshot:{reference_doctype}:{reference_name}{':stale' if stale_only else ''}"
+
+    frappe.enqueue(
+        REFRESH_AVAILABILITY_SNAPSHOT_METHOD,
+        job_id=job_id,
+        deduplicate=not dates,
+        enqueue_after_commit=True,
+        reference_doctype=reference_doctype,
+        reference_name=reference_name,
+        dates=[str(getdate(date)) for date in dates] if dates else None,
+        stale_only=stale_only,
+    )
+
+
+def enqueue_availability_snapshot_refresh_for_members(members: list = None, dates: list = None) -> None:
+    """Refresh the snapshots that depend on the availability of the given members, or all of them.
+
+    Args:
+    members (list, optional): member emails (User Appointment Availability names)
+    dates (list, optional): days to refresh, the whole window if not given
+    """
+    if not get_availability_snapshot_max_age():
+        return
+
+    for reference_doctype, reference_name in get_snapshot_references(members):
+        enqueue_availability_snapshot_refresh(reference_doctype, reference_name, dates)
+
+
+def get_stale_snapshot_days(reference_doctype: str, reference_name: str, days: list) -> list:
+    """Get the days whose snapshot is missing, from a previous UTC day, or past its max age by the next scheduled
+    refresh, see get_availability_snapshot
+
+    Args:
+    reference_doctype (str): Appointment Group or Appointment Slot Duration
+    reference_name (str): name of the document
+    days (list): days of the snapshot window
+
+    Returns:
+    list: the stale days
+    """
+    if not days:
+        return []
+
+    refreshed_after = add_to_date(
+        now_datetime(), seconds=-max(get_availability_snapshot_max_age() - AVAILABILITY_SNAPSHOT_REFRESH_INTERVAL, 0)
+    )
+    today = datetime.datetime.utcnow().date()
+
+    rows = frappe.get_all(
+        APPOINTMENT_AVAILABILITY_SNAPSHOT,
+        filters={
+            "reference_doctype": reference_doctype,
+            "reference_name": reference_name,
+            "date": ["between", [getdate(days[0]), getdate(days[-1])]],
+        },
+        fields=["date", "refreshed_at"],
+    )
+
+    fresh_days = {
+        getdate(row.date)
+        for row in rows
+        if get_datetime(row.refreshed_at) > refreshed_after
+        and convert_datetime_to_utc(get_datetime(row.refreshed_at)).date() == today
+    }
+
+    return [day for day in days if getdate(day) not in fresh_days]
+
+
+def get_snapshot_references(members: list = None) -> list:
+    """Get the (reference_doctype, reference_name) of the snapshots the given members, or anyone, are part of"""
+    if members is not None and not members:
+        return []
+
+    member_filters = {"parenttype": APPOINTMENT_GROUP, "is_mandatory": 1}
+    duration_filters = {"parenttype": USER_APPOINTMENT_AVAILABILITY}
+
+    if members:
+        member_filters["user"] = ["in", members]
+        duration_filters["parent"] = ["in", members]
+
+    appointment_groups = frappe.get_all("Members", filters=member_filters, pluck="parent", distinct=True)
+    durations = frappe.get_all(APPOINTMENT_SLOT_DURATION, filters=duration_filters, pluck="name")
+
+    return [(APPOINTMENT_GROUP, name) for name in appointment_groups] + [
+        (APPOINTMENT_SLOT_DURATION, name) for name in durations
+    ]
+
+
+def get_dates_around(start: datetime, end: datetime) -> list:
+    """Get the days from the day before start to the day after end, the days whose slots may change with [start, end]"""
+    start, end = getdate(start), getdate(end)
+    return [add_days(start, days) for days in range(-1, (end - start).days + 2)]
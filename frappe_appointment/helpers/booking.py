@@ -0,0 +1,68 @@
+import frappe
+
+BOOKING_PENDING = "Pending Confirmation"
+BOOKING_CONFIRMED = "Confirmed"
+BOOKING_FAILED = "Failed"
+
+# Realtime event published to the task room of the booking token once a booking is confirmed or failed
+BOOKING_REALTIME_EVENT = "appointment_booking_update"
+
+BOOKING_KEY_PREFIX = "frappe_appointment:booking"
+
+BOOKING_STATUS_TTL = 24 * 60 * 60
+
+FINALIZE_BOOKING_METHOD = "frappe_appointment.overrides.event_override.finalize_booking"
+
+
+def is_async_booking_enabled() -> bool:
+    return bool(frappe.db.get_single_value("Appointment Settings", "enable_async_booking"))
+
+
+def get_booking_key(booking_token: str) -> str:
+    return f"{BOOKING_KEY_PREFIX}:{booking_token}"
+
+
+def get_cached_booking_status(booking_token: str) -> dict:
+    """Get the last status of a booking, see set_booking_status, None if the token is unknown or expired"""
+    return frappe.cache.get_value(get_booking_key(booking_token), expires=True)
+
+
+def set_booking_status(booking_token: str, booking_status: dict, publish: bool = False) -> None:
+    """Store the status of a booking for polling, and publish it to the clients waiting on the token
+
+    Args:
+    booking_token (str): token returned with the pending booking
+    booking_status (dict): response of the booking, with its booking_status
+    publish (bool, optional): publish the status as a realtime event
+    """
+    frappe.cache.set_value(get_booking_key(booking_token), booking_status, expires_in_sec=BOOKING_STATUS_TTL)
+
+    if publish:
+        frappe.publish_realtime(BOOKING_REALTIME_EVENT, booking_status, task_id=booking_token)
+
+
+def enqueue_finalize_booking(event_name: str, metadata: dict) -> str:
+    """Finalize a pending booking in the background, after the current transaction is committed
+
+    Args:
+    event_name (str): the pending Event
+    metadata (dict): booking arguments, passed to the webhook and the emails
+
+    Returns:
+    str: booking token to poll the status with, or to subscribe to its realtime updates
+    """
+    booking_token = frappe.generate_hash(length=32)
+
+    set_booking_status(booking_token, {"booking_status": BOOKING_PENDING, "event_id": event_name})
+
+    frappe.enqueue(
+        FINALIZE_BOOKING_METHOD,
+        queue="short",
+        enqueue_after_commit=True,
+        job_name=f"Finalize appointment booking: {event_name}",
+        event_name=event_name,
+        booking_token=booking_token,
+        metadata=metadata,
+    )
+
+    return booking_token
@@ -0,0 +1,184 @@
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import frappe
+
+from frappe_appointment.helpers.intervals import BusyInterval, is_event_on_date
+
+CACHE_KEY_PREFIX = "frappe_appointment:busy_intervals"
+CACHE_HITS_KEY = "frappe_appointment:busy_interval_cache:hits"
+CACHE_MISSES_KEY = "frappe_appointment:busy_interval_cache:misses"
+CACHE_SIZE_KEY_PREFIX = "frappe_appointment:busy_interval_cache:size"
+
+# How the busy intervals were fetched. The events list keeps only the events the member takes part in,
+# FreeBusy reports the whole calendar, so the two do not share cache entries
+FETCH_MODE_EVENTS = "events"
+FETCH_MODE_FREEBUSY = "freebusy"
+
+# First byte of a cached day, the rest is the packed (start, end) epoch pairs
+READABLE_DAY = b"\x00"
+UNREADABLE_DAY = b"\x01"
+
+
+def get_busy_interval_cache_settings() -> tuple:
+    """Get the TTL (seconds, 0 disables the cache) and the max size (bytes, 0 is no limit) of the cache"""
+    ttl = frappe.db.get_single_value("Appointment Settings", "busy_interval_cache_ttl")
+    max_memory = frappe.db.get_single_value("Appointment Settings", "busy_interval_cache_max_memory")
+    return int(ttl or 0), int(max_memory or 0) * 1024 * 1024
+
+
+def get_cache_key(google_calendar_id: str, member: str, fetch_mode: str, date: datetime) -> str:
+    return frappe.cache.make_key(
+        f"{CACHE_KEY_PREFIX}:{google_calendar_id}:{member}:{fetch_mode}:{date.strftime('%Y-%m-%d')}"
+    )
+
+
+def get_cache_size_key(bucket: int) -> str:
+    return frappe.cache.make_key(f"{CACHE_SIZE_KEY_PREFIX}:{bucket}")
+
+
+def get_busy_interval_cache_size(ttl: int) -> int:
+    """Get the bytes written to the cache over the current and the previous TTL long bucket.
+
+    An entry expires within a TTL of its write, so this bounds the size of the cache from above
+    without scanning its keys. Other data in the same Redis does not count.
+    """
+    bucket = int(time.time() // ttl)
+    sizes = frappe.cache.mget([get_cache_size_key(bucket - 1), get_cache_size_key(bucket)])
+    return sum(int(size or 0) for size in sizes)
+
+
+def encode_busy_intervals(busy_intervals: list, is_unreadable: bool) -> bytes:
+    packed = array("q")
+    for busy_interval in busy_intervals:
+        packed.extend(busy_interval)
+    return (UNREADABLE_DAY if is_unreadable else READABLE_DAY) + packed.tobytes()
+
+
+def decode_busy_intervals(value: bytes) -> tuple:
+    packed = array("q")
+    packed.frombytes(value[1:])
+    busy_intervals = [BusyInterval(packed[index], packed[index + 1]) for index in range(0, len(packed), 2)]
+    return busy_intervals, value[:1] == UNREADABLE_DAY
+
+
+def get_utc_day_bounds(date: datetime) -> tuple:
+    day_start = datetime(date.year, date.month, date.day, tzinfo=timezone.utc)
+    return int(day_start.timestamp()), int((day_start + timedelta(days=1)).timestamp())
+
+
+def get_unreadable_day_event(date: datetime) -> dict:
+    """Stand-in for the unreadable events of a cached day, see is_event_on_date"""
+    return {
+        "start": {"date": date.strftime("%Y-%m-%d")},
+        "end": {"date": (date + timedelta(days=1)).strftime("%Y-%m-%d")},
+    }
+
+
+def get_cached_busy_intervals(google_calendar_id: str, member: str, fetch_mode: str, dates: list) -> tuple:
+    """Read the busy intervals of a member's calendar for the given UTC dates from the cache.
+
+    Args:
+    google_calendar_id (str): Google calendar id
+    member (str): member email
+    fetch_mode (str): FETCH_MODE_EVENTS or FETCH_MODE_FREEBUSY
+    dates (list): list of dates
+
+    Returns:
+    tuple: (busy intervals, unreadable events) like a fresh fetch, None if any of the dates is not cached
+    """
+    ttl = get_busy_interval_cache_settings()[0]
+
+    if not ttl:
+        return None
+
+    values = frappe.cache.mget([get_cache_key(google_calendar_id, member, fetch_mode, date) for date in dates])
+    misses = sum(1 for value in values if value is None)
+
+    pipeline = frappe.cache.pipeline()
+    pipeline.incrby(frappe.cache.make_key(CACHE_HITS_KEY), len(values) - misses)
+    pipeline.incrby(frappe.cache.make_key(CACHE_MISSES_KEY), misses)
+    pipeline.execute()
+
+    if misses:
+        return None
+
+    busy_intervals = set()
+    unreadable_events = []
+
+    for date, value in zip(dates, values, strict=True):
+        day_busy_intervals, is_unreadable = decode_busy_intervals(value)
+        busy_intervals.update(day_busy_intervals)
+        if is_unreadable:
+            unreadable_events.append(get_unreadable_day_event(date))
+
+    return sorted(busy_intervals), unreadable_events
+
+
+def set_cached_busy_intervals(
+    google_calendar_id: str, member: str, fetch_mode: str, dates: list, google_calendar_slots: tuple
+) -> None:
+    """Split a fresh fetch of the whole window into UTC days and cache each day.
+
+    Args:
+    google_calendar_id (str): Google calendar id
+    member (str): member email
+    fetch_mode (str): FETCH_MODE_EVENTS or FETCH_MODE_FREEBUSY
+    dates (list): UTC dates covered by the fetch
+    google_calendar_slots (tuple): (busy intervals, unreadable events) of the calendar
+    """
+    ttl, max_memory = get_busy_interval_cache_settings()
+
+    if not ttl:
+        return
+
+    busy_intervals, unreadable_events = google_calendar_slots
+    values = {}
+
+    for date in dates:
+        lower, upper = get_utc_day_bounds(date)
+        day_busy_intervals = [
+            busy_interval for busy_interval in busy_intervals if busy_interval.overlaps(lower, upper - 1)
+        ]
+        is_unreadable = any(is_event_on_date(event, date) for event in unreadable_events)
+        values[get_cache_key(google_calendar_id, member, fetch_mode, date)] = encode_busy_intervals(
+            day_busy_intervals, is_unreadable
+        )
+
+    size = sum(len(key) + len(value) for key, value in values.items())
+
+    if max_memory and get_busy_interval_cache_size(ttl) + size > max_memory:
+        return
+
+    size_key = get_cache_size_key(int(time.time() // ttl))
+
+    pipeline = frappe.cache.pipeline()
+
+    for key, value in values.items():
+        pipeline.set(key, value, ex=ttl)
+
+    pipeline.incrby(size_key, size)
+    pipeline.expire(size_key, 2 * ttl)
+    pipeline.execute()
+
+
+def clear_busy_interval_cache(google_calendar_id: str = None) -> None:
+    """Drop the cached busy intervals of a calendar, or of all calendars"""
+    if google_calendar_id:
+        frappe.cache.delete_keys(f"{CACHE_KEY_PREFIX}:{google_calendar_id}:")
+    else:
+        frappe.cache.delete_keys(f"{CACHE_KEY_PREFIX}:")
+        frappe.cache.delete_keys(f"{CACHE_SIZE_KEY_PREFIX}:")
+
+
+def get_busy_interval_cache_stats() -> dict:
+    hits = int(frappe.cache.get(frappe.cache.make_key(CACHE_HITS_KEY)) or 0)
+    misses = int(frappe.cache.get(frappe.cache.make_key(CACHE_MISSES_KEY)) or 0)
+    ttl = get_busy_interval_cache_settings()[0]
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "size": get_busy_interval_cache_size(ttl) if ttl else 0,
+    }
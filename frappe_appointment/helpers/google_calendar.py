@@ -6,13 +6,13 @@ from frappe.integrations.doctype.google_calendar.google_calendar import (
     format_date_according_to_google_calendar,
     get_attendees,
     get_conference_data,
-    get_google_calendar_object,
     repeat_on_to_google_calendar_recurrence_rule,
 )
 from frappe.utils.data import get_datetime
 from googleapiclient.errors import HttpError
 
 from frappe_appointment.helpers import api_urls
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
 
 
 def insert_event_in_google_calendar_override(
@@ -33,7 +33,7 @@ def insert_event_in_google_calendar_override(
     if not success_msg:
         success_msg = _("Event Synced with Google Calendar.")
 
-    google_calendar, account = get_google_calendar_object(doc.google_calendar)
+    google_calendar, account = get_google_calendar_service(doc.google_calendar)
 
     if not account.push_to_google_calendar:
         if update_doc:
@@ -153,3 +153,19 @@ def insert_event_in_google_calendar_override(
                 account.name, err.resp.status
             )
         )
+
+
+def delete_event_in_google_calendar_override(doc):
+    """
+    Delete the Google Calendar event of an Event, for an Event whose saved version does not have it yet.
+    """
+    if not doc.google_calendar_event_id:
+        return
+
+    google_calendar = get_google_calendar_service(doc.google_calendar)[0]
+
+    google_calendar.events().delete(
+        calendarId=doc.google_calendar_id,
+        eventId=doc.google_calendar_event_id,
+        sendUpdates="all",
+    ).execute()
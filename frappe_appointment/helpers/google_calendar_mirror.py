@@ -0,0 +1,280 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import frappe
+from frappe.utils import cint
+from googleapiclient.errors import HttpError
+
+from frappe_appointment.constants import APPOINTMENT_GROUP, APPOINTMENT_SLOT_DURATION
+from frappe_appointment.helpers.availability_snapshot import enqueue_availability_snapshot_refresh_for_members
+from frappe_appointment.helpers.busy_interval_cache import (
+    decode_busy_intervals,
+    encode_busy_intervals,
+    get_utc_day_bounds,
+)
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
+from frappe_appointment.helpers.intervals import (
+    BusyInterval,
+    get_google_event_timestamp,
+    is_event_on_date,
+    parse_google_event_for_member,
+)
+from frappe_appointment.helpers.slot_cache import bump_availability_generation
+
+MIRROR_KEY_PREFIX = "frappe_appointment:google_calendar_mirror"
+
+# Events that ended more than this long ago are dropped from the mirror. Slots of a date are cut from the UTC
+# days around it, so callers fetch up to two days before the first bookable date, which can be today.
+MIRROR_PAST_DAYS = 2
+# Days mirrored ahead for an appointment group or slot duration without an availability window
+MIRROR_DEFAULT_WINDOW_DAYS = 60
+
+
+def get_google_calendar_mirror_max_age() -> int:
+    """Get the age (seconds) past which a mirror is not served, 0 if the mirror is disabled"""
+    if not frappe.db.get_single_value("Appointment Settings", "enable_google_calendar_mirror"):
+        return 0
+    return int(frappe.db.get_single_value("Appointment Settings", "google_calendar_mirror_max_age") or 0)
+
+
+# Events are parsed for a member (whether they created or attend them), so a calendar shared by several
+# members has a mirror per member
+def get_mirror_state_key(google_calendar_id: str, member: str) -> str:
+    return f"{MIRROR_KEY_PREFIX}:{google_calendar_id}:{member}:state"
+
+
+def get_mirror_view_key(google_calendar_id: str, member: str) -> str:
+    return f"{MIRROR_KEY_PREFIX}:{google_calendar_id}:{member}:view"
+
+
+def get_mirrored_busy_intervals(google_calendar_id: str, member: str, dates: list) -> tuple:
+    """Read the busy intervals of a member's calendar for the given UTC dates from the synced mirror.
+
+    Args:
+    google_calendar_id (str): Google calendar id
+    member (str): member email
+    dates (list): list of dates
+
+    Returns:
+    tuple: (busy intervals, unreadable events) like a fresh fetch, None if the mirror is disabled,
+    older than the configured max age or does not cover the dates
+    """
+    max_age = get_google_calendar_mirror_max_age()
+
+    if not max_age:
+        return None
+
+    view = frappe.cache.get_value(get_mirror_view_key(google_calendar_id, member))
+
+    if not view or time.time() - view["synced_at"] > max_age:
+        return None
+
+    lower = get_utc_day_bounds(min(dates))[0]
+    upper = get_utc_day_bounds(max(dates))[1]
+
+    if lower < view["time_min"] or upper > view["time_max"]:
+        return None
+
+    busy_intervals, _is_unreadable = decode_busy_intervals(view["busy_intervals"])
+
+    return (
+        [busy_interval for busy_interval in busy_intervals if busy_interval.overlaps(lower, upper - 1)],
+        [event for event in view["unreadable_events"] if any(is_event_on_date(event, date) for date in dates)],
+    )
+
+
+def sync_google_calendar_mirror(google_calendar: str, member: str) -> None:
+    """Bring the mirror of a Google Calendar up to date.
+
+    The first sync lists the events from MIRROR_PAST_DAYS ago to the last day the member can be booked, the
+    following ones only list the changes since the last sync with the syncToken of the Calendar API. An expired
+    token (410 Gone) starts over with a full sync, and so does a new day, as the window moves with it.
+    ref: https://developers.google.com/calendar/api/guides/sync
+
+    Args:
+    google_calendar (str): name of the Google Calendar doc
+    member (str): email of the member whose availability the calendar holds
+    """
+    google_calendar_api_obj, account = get_google_calendar_service(google_calendar)
+    google_calendar_id = account.google_calendar_id
+    time_max = get_mirror_time_max(member)
+
+    state = frappe.cache.get_value(get_mirror_state_key(google_calendar_id, member)) or {}
+
+    # Events past the previous window were dropped, they are only listed again by a full sync
+    if not state.get("sync_token") or state.get("time_max", 0) < time_max:
+        state = get_full_sync_state(time_max)
+
+    try:
+        state["sync_token"] = apply_google_calendar_changes(google_calendar_api_obj, account, member, state)
+    except HttpError as err:
+        if err.resp.status != 410:
+            raise
+
+        state = get_full_sync_state(time_max)
+        state["sync_token"] = apply_google_calendar_changes(google_calendar_api_obj, account, member, state)
+
+    prune_mirror_state(state)
+
+    previous_view = frappe.cache.get_value(get_mirror_view_key(google_calendar_id, member))
+    view = get_mirror_view(state)
+
+    frappe.cache.set_value(get_mirror_state_key(google_calendar_id, member), state)
+    frappe.cache.set_value(get_mirror_view_key(google_calendar_id, member), view)
+
+    if (
+        not previous_view
+        or previous_view["busy_intervals"] != view["busy_intervals"]
+        or previous_view["unreadable_events"] != view["unreadable_events"]
+    ):
+        bump_availability_generation([member])
+        enqueue_availability_snapshot_refresh_for_members([member])
+
+
+def get_mirror_time_max(member: str) -> int:
+    """Get the end (epoch seconds) of the mirror window of a member: the day after the last day an appointment
+    group or slot duration of the member can be booked, see vaild_date. Moves once a day.
+
+    Args:
+    member (str): member email
+
+    Returns:
+    int: end of the mirror window
+    """
+    appointment_groups = frappe.get_all(
+        APPOINTMENT_GROUP,
+        filters=[["Members", "user", "=", member], ["Members", "is_mandatory", "=", 1]],
+        fields=["minimum_notice_before_event", "event_availability_window"],
+        distinct=True,
+    )
+    durations = frappe.get_all(
+        APPOINTMENT_SLOT_DURATION,
+        filters={"parent": member},
+        fields=["minimum_notice_before_event", "availability_window as event_availability_window"],
+    )
+
+    window_days = []
+
+    for window in appointment_groups + durations:
+        availability_window = cint(window.event_availability_window)
+
+        if availability_window <= 0:
+            # No availability window, the booking page keeps going
+            availability_window = MIRROR_DEFAULT_WINDOW_DAYS
+
+        window_days.append(cint(window.minimum_notice_before_event) + availability_window)
+
+    days = max(window_days, default=MIRROR_DEFAULT_WINDOW_DAYS)
+
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    # One more day for the slots of the last day in timezones ahead of UTC
+    return int((day_start + timedelta(days=days + 2)).timestamp())
+
+
+def get_full_sync_state(time_max: int) -> dict:
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "sync_token": None,
+        "time_min": int((day_start - timedelta(days=MIRROR_PAST_DAYS)).timestamp()),
+        "time_max": time_max,
+        "events": {},
+    }
+
+
+def apply_google_calendar_changes(google_calendar_api_obj: object, account: object, member: str, state: dict) -> str:
+    """List the events (full sync) or the changed events (incremental sync) page by page into the mirror state
+
+    Args:
+    google_calendar_api_obj (object): Google Calendar API object
+    account (object): Google Calendar doc
+    member (str): member email
+    state (dict): mirror state, the events are updated in place
+
+    Returns:
+    str: sync token for the next incremental sync
+    """
+    events = state["events"]
+    params = {"calendarId": account.google_calendar_id, "maxResults": 2000, "singleEvents": True}
+
+    if state["sync_token"]:
+        # Google does not take a time range with a sync token, prune_mirror_state drops what falls outside
+        params["syncToken"] = state["sync_token"]
+    else:
+        # Recurring events without an end are expanded up to timeMax only
+        params["timeMin"] = datetime.fromtimestamp(state["time_min"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        params["timeMax"] = datetime.fromtimestamp(state["time_max"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    while True:
+        response = google_calendar_api_obj.events().list(**params).execute()
+
+        for event in response.get("items", []):
+            mirror_event = get_mirror_event(member, account, event)
+
+            if mirror_event is None:
+                events.pop(event["id"], None)
+            else:
+                events[event["id"]] = mirror_event
+
+        if not response.get("nextPageToken"):
+            return response.get("nextSyncToken")
+
+        params["pageToken"] = response["nextPageToken"]
+
+
+def get_mirror_event(member: str, account: object, event: object) -> object:
+    """Get what the mirror keeps of an event: a BusyInterval, the start/end of an unreadable event,
+    or None if the event does not block the member
+    """
+    try:
+        return parse_google_event_for_member(member, event)
+    except Exception:
+        if "timeZone" not in event.get("start", {}) and account.custom_ignore_all_day_events:
+            return None
+
+        return {"start": event.get("start", {}), "end": event.get("end", {})}
+
+
+def prune_mirror_state(state: dict) -> None:
+    """Drop the busy intervals and unreadable events that are outside the mirror window"""
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    state["time_min"] = max(state["time_min"], int((day_start - timedelta(days=MIRROR_PAST_DAYS)).timestamp()))
+
+    for event_id, mirror_event in list(state["events"].items()):
+        start, end = get_mirror_event_bounds(mirror_event)
+
+        if (end is not None and end < state["time_min"]) or (start is not None and start >= state["time_max"]):
+            del state["events"][event_id]
+
+
+def get_mirror_event_bounds(mirror_event: object) -> tuple:
+    """Get the (start, end) epoch seconds of a mirror event, None for the bounds of an unreadable event that
+    can not be read either
+    """
+    if isinstance(mirror_event, BusyInterval):
+        return mirror_event.start, mirror_event.end
+
+    bounds = []
+
+    for event_time in (mirror_event["start"], mirror_event["end"]):
+        try:
+            bounds.append(get_google_event_timestamp(event_time))
+        except Exception:
+            bounds.append(None)
+
+    return tuple(bounds)
+
+
+def get_mirror_view(state: dict) -> dict:
+    """Compact read side of the mirror state, what the slot lookups load"""
+    busy_intervals = sorted(
+        {mirror_event for mirror_event in state["events"].values() if isinstance(mirror_event, BusyInterval)}
+    )
+    return {
+        "synced_at": time.time(),
+        "time_min": state["time_min"],
+        "time_max": state["time_max"],
+        "busy_intervals": encode_busy_intervals(busy_intervals, False),
+        "unreadable_events": [
+            mirror_event for mirror_event in state["events"].values() if not isinstance(mirror_event, BusyInterval)
+        ],
+    }
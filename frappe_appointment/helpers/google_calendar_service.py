@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import frappe
+import httplib2
+from frappe import _
+from frappe.integrations.doctype.google_calendar.google_calendar import get_google_calendar_object
+from frappe.integrations.google_oauth import GoogleOAuth
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+# Calendar services kept per process, the least recently used one is dropped past this many
+GOOGLE_CALENDAR_SERVICE_CACHE_SIZE = 64
+
+# Refresh the access token a bit before Google expires it
+ACCESS_TOKEN_EXPIRY_MARGIN = 60
+
+# Services are shared by the threads of a worker, see get_google_calendar_slots_members
+_google_calendar_service_cache = OrderedDict()
+_google_calendar_service_cache_lock = threading.Lock()
+
+
+def get_google_calendar_account(google_calendar: str) -> dict:
+    """Get the user and calendar id of a Google Calendar, without building an API client or refreshing its token
+
+    Args:
+    google_calendar (str): name of the Google Calendar doc
+
+    Returns:
+    dict: name, user and google_calendar_id of the Google Calendar
+    """
+    account = frappe.get_cached_value("Google Calendar", google_calendar, ["user", "google_calendar_id"], as_dict=True)
+
+    if not account:
+        frappe.throw(_("{0} {1} not found").format(_("Google Calendar"), google_calendar), frappe.DoesNotExistError)
+
+    return frappe._dict(account, name=google_calendar)
+
+
+def get_google_calendar_service(google_calendar: str) -> tuple:
+    """Drop-in for get_google_calendar_object, with the API client cached per process.
+
+    A client is built once per version (modified) of the Google Calendar, from the discovery document shipped
+    with googleapiclient, and keeps its access token until it expires instead of refreshing it on every call.
+
+    Args:
+    google_calendar (str): name of the Google Calendar doc
+
+    Returns:
+    tuple: Google Calendar API object and Google Calendar doc
+    """
+    account = frappe.get_cached_doc("Google Calendar", google_calendar)
+
+    if not account.google_calendar_id:
+        # The first use of a Google Calendar creates its calendar in Google and saves the doc, Frappe does that
+        return get_google_calendar_object(google_calendar)
+
+    key = (frappe.local.site, account.name, str(account.modified))
+
+    with _google_calendar_service_cache_lock:
+        service = _google_calendar_service_cache.get(key)
+
+        if service is not None:
+            _google_calendar_service_cache.move_to_end(key)
+            return service, account
+
+    service = build_google_calendar_service(account)
+
+    with _google_calendar_service_cache_lock:
+        # Older versions of the Google Calendar may hold a revoked refresh token
+        for stale_key in [cached_key for cached_key in _google_calendar_service_cache if cached_key[:2] == key[:2]]:
+            del _google_calendar_service_cache[stale_key]
+
+        _google_calendar_service_cache[key] = service
+
+        while len(_google_calendar_service_cache) > GOOGLE_CALENDAR_SERVICE_CACHE_SIZE:
+            _google_calendar_service_cache.popitem(last=False)
+
+    return service, account
+
+
+def build_google_calendar_service(account: object) -> object:
+    """Build a Google Calendar API object whose requests can be executed from any thread
+
+    Args:
+    account (object): Google Calendar doc
+
+    Returns:
+    object: Google Calendar API object
+    """
+    if not frappe.db.get_single_value("Google Settings", "enable"):
+        frappe.throw(_("Google Calendar Integration is disabled."))
+
+    if not account.refresh_token:
+        button_label = frappe.bold(_("Allow Google Calendar Access"))
+        raise frappe.ValidationError(_("Click on {0} to generate Refresh Token.").format(button_label))
+
+    oauth_obj = GoogleOAuth("calendar")
+    refresh_token = account.get_password(fieldname="refresh_token", raise_exception=False)
+    token = oauth_obj.refresh_access_token(refresh_token)
+
+    credentials = Credentials(
+        token=token.get("access_token"),
+        refresh_token=refresh_token,
+        token_uri=oauth_obj.OAUTH_URL,
+        client_id=oauth_obj.google_settings.client_id,
+        client_secret=oauth_obj.google_settings.get_password(fieldname="client_secret", raise_exception=False),
+        scopes=oauth_obj.scopes,
+        # google-auth compares the expiry with a naive UTC datetime and refreshes the token once it is past
+        expiry=datetime.utcnow() + timedelta(seconds=int(token.get("expires_in") or 0) - ACCESS_TOKEN_EXPIRY_MARGIN),
+    )
+
+    def build_request(http: object, *args, **kwargs) -> HttpRequest:
+        # httplib2 is not thread safe, every request gets its own connection
+        return HttpRequest(AuthorizedHttp(credentials, http=httplib2.Http()), *args, **kwargs)
+
+    return build(
+        serviceName="calendar",
+        version="v3",
+        credentials=credentials,
+        requestBuilder=build_request,
+        static_discovery=True,
+        cache_discovery=False,
+    )
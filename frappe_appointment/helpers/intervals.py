@@ -1,3 +1,11 @@
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from dateutil import parser
+
+from frappe_appointment.helpers.utils import convert_timezone_to_utc
+
+
 def find_intersection_interval(interval1: object, interval2: object):
     """
     Find the intersection of two intervals.
@@ -9,3 +17,120 @@ def find_intersection_interval(interval1: object, interval2: object):
         return None
 
     return (max(start1, start2), min(end1, end2))
+
+
+class BusyInterval(NamedTuple):
+    """
+    Busy time of a calendar as UTC epoch seconds, [start, end).
+    Tuples compare by (start, end), so a list of intervals sorts with a plain key sort.
+    """
+
+    start: int
+    end: int
+
+    @classmethod
+    def from_datetimes(cls, start: datetime, end: datetime) -> "BusyInterval":
+        return cls(int(start.timestamp()), int(end.timestamp()))
+
+    @classmethod
+    def from_google_event(cls, event: object) -> "BusyInterval":
+        """Parse a timed Google Calendar event, raises KeyError for all-day events or events without a time zone."""
+        return cls.from_datetimes(
+            convert_timezone_to_utc(event["start"]["dateTime"], event["start"]["timeZone"]),
+            convert_timezone_to_utc(event["end"]["dateTime"], event["end"]["timeZone"]),
+        )
+
+    @classmethod
+    def from_iso_strings(cls, start: str, end: str) -> "BusyInterval":
+        """Parse RFC3339 bounds, e.g. the busy blocks of a FreeBusy response."""
+        return cls.from_datetimes(parser.isoparse(start), parser.isoparse(end))
+
+    @property
+    def start_minute(self) -> int:
+        return self.start // 60
+
+    @property
+    def end_minute(self) -> int:
+        return -(-self.end // 60)
+
+    def overlaps(self, lower: int, upper: int) -> bool:
+        """Check if the interval has an intersection with [lower, upper], touching bounds included."""
+        return self.start <= upper and self.end >= lower
+
+
+def parse_google_event_for_member(member: str, event: object) -> BusyInterval:
+    """Parse a google event into a busy interval of the member
+
+    Args:
+    member (str): member email
+    event (object): Google Calendar event
+
+    Returns:
+    BusyInterval: busy interval, None if the event is cancelled, is shown as free (transparent), or was created by
+    someone else and the member is not attending. Raises for events that can not be read, e.g. all-day events.
+    """
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return None
+
+    creator = event.get("creator", {}).get("email")
+    if creator != member:
+        attendees = event.get("attendees", [])
+        filtered_attendees = [attendee for attendee in attendees if attendee.get("self", False)]
+
+        if len(filtered_attendees) > 0:
+            attendee = filtered_attendees[0]
+
+            if attendee.get("responseStatus") == "declined":
+                return None
+        else:
+            return None
+
+    return BusyInterval.from_google_event(event)
+
+
+def remove_duplicate_intervals(busy_intervals: list) -> list:
+    """
+    Sort the busy intervals and drop the exact duplicates.
+    """
+    return sorted(set(busy_intervals))
+
+
+def is_event_on_date(event: object, date: datetime) -> bool:
+    """Check if the google event (timed or all-day) falls on the given date
+
+    Args:
+    event (object): Google Calendar event
+    date (datetime): date
+
+    Returns:
+    bool: True if the event falls on the date or its dates could not be read
+    """
+    try:
+        date_str = date.strftime("%Y-%m-%d")
+        start = event["start"].get("date") or event["start"]["dateTime"][:10]
+
+        if "date" in event["end"]:
+            # End date of all-day events is exclusive
+            return start <= date_str < event["end"]["date"]
+
+        return start <= date_str <= event["end"]["dateTime"][:10]
+    except Exception:
+        return True
+
+
+def get_google_event_timestamp(event_time: dict) -> int:
+    """Get the epoch seconds of the start or end of a google event, raises for times that can not be read
+
+    Args:
+    event_time (dict): start or end of a Google Calendar event, with a date (all-day events) or a dateTime
+
+    Returns:
+    int: epoch seconds, midnight UTC for dates
+    """
+    if "date" in event_time:
+        return int(datetime.strptime(event_time["date"], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+    if event_time.get("timeZone"):
+        return int(convert_timezone_to_utc(event_time["dateTime"], event_time["timeZone"]).timestamp())
+
+    return int(parser.isoparse(event_time["dateTime"]).timestamp())
@@ -0,0 +1,110 @@
+import datetime
+
+import frappe
+from frappe.utils import add_days, getdate
+from frappe.utils.caching import request_cache
+
+from frappe_appointment.helpers.slot_cache import bump_availability_generation
+
+MEMBER_EMPLOYEE_CACHE_KEY = "frappe_appointment:member_employee"
+EMPLOYEE_LEAVE_DATES_CACHE_KEY = "frappe_appointment:employee_leave_dates"
+HOLIDAY_DATES_CACHE_KEY = "frappe_appointment:holiday_list_dates"
+
+
+@request_cache
+def is_hrms_installed() -> bool:
+    """Check if erpnext and hrms are installed, leaves and holidays come from them. Checked once per request."""
+    installed_apps = frappe.get_installed_apps()
+    return "erpnext" in installed_apps and "hrms" in installed_apps
+
+
+def get_member_employee(member: str) -> dict:
+    """Get the Employee of a member, matched on the company email
+
+    Args:
+    member (str): member email
+
+    Returns:
+    dict: Employee name and holiday_list, empty if the member is not an Employee
+    """
+    return frappe.cache.hget(MEMBER_EMPLOYEE_CACHE_KEY, member, generator=lambda: build_member_employee(member))
+
+
+def build_member_employee(member: str) -> dict:
+    employee = frappe.get_all("Employee", filters={"company_email": member}, fields=["name", "holiday_list"])
+
+    if not employee:
+        return {}
+
+    return {"name": employee[0].name, "holiday_list": employee[0].holiday_list}
+
+
+def get_employee_leave_dates(employee: str) -> set:
+    """Get the dates from yesterday on that are covered by an approved leave of the employee
+
+    Args:
+    employee (str): Employee name
+
+    Returns:
+    set: set of dates
+    """
+    return frappe.cache.hget(
+        EMPLOYEE_LEAVE_DATES_CACHE_KEY, employee, generator=lambda: build_employee_leave_dates(employee)
+    )
+
+
+def build_employee_leave_dates(employee: str) -> set:
+    leave_dates = set()
+    lower = add_days(getdate(), -1)
+
+    for leave in frappe.get_all(
+        "Leave Application",
+        filters={"employee": employee, "to_date": [">=", lower], "status": "Approved"},
+        fields=["from_date", "to_date"],
+    ):
+        date = max(getdate(leave.from_date), lower)
+        while date <= getdate(leave.to_date):
+            leave_dates.add(date)
+            date += datetime.timedelta(days=1)
+
+    return leave_dates
+
+
+def get_holiday_dates(holiday_list: str) -> set:
+    """Get the holiday dates of a Holiday List
+
+    Args:
+    holiday_list (str): Holiday List name
+
+    Returns:
+    set: set of dates
+    """
+    return frappe.cache.hget(HOLIDAY_DATES_CACHE_KEY, holiday_list, generator=lambda: build_holiday_dates(holiday_list))
+
+
+def build_holiday_dates(holiday_list: str) -> set:
+    return {
+        getdate(holiday_date)
+        for holiday_date in frappe.get_all(
+            "Holiday",
+            filters={"parent": holiday_list, "parenttype": "Holiday List"},
+            pluck="holiday_date",
+        )
+    }
+
+
+def clear_member_employees() -> None:
+    frappe.cache.delete_value(MEMBER_EMPLOYEE_CACHE_KEY)
+    bump_availability_generation()
+
+
+def clear_employee_leave_dates(employee: str) -> None:
+    frappe.cache.hdel(EMPLOYEE_LEAVE_DATES_CACHE_KEY, employee)
+
+    member = frappe.db.get_value("Employee", employee, "company_email")
+    bump_availability_generation([member] if member else None)
+
+
+def clear_holiday_dates(holiday_list: str) -> None:
+    frappe.cache.hdel(HOLIDAY_DATES_CACHE_KEY, holiday_list)
+    bump_availability_generation()
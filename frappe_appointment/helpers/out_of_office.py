@@ -4,10 +4,11 @@ import frappe
 from frappe import _
 from frappe.integrations.doctype.google_calendar.google_calendar import (
     format_date_according_to_google_calendar,
-    get_google_calendar_object,
 )
 from frappe.utils.data import add_days, get_datetime
 
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
+
 
 def create_out_of_office_google_calander_event(
     leave_id: str, employee: str, start_date: datetime.date, end_date: datetime.date
@@ -91,7 +92,7 @@ def get_employee_google_calendar(employee: str):
     if not google_calendar:
         return
 
-    google_calendar, account = get_google_calendar_object(google_calendar)
+    google_calendar, account = get_google_calendar_service(google_calendar)
 
     if not account.push_to_google_calendar:
         return
@@ -1,7 +1,14 @@
+import hashlib
+import json
 from functools import wraps
 
 import frappe
 
+IDEMPOTENCY_KEY_PREFIX = "frappe_appointment:idempotency"
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+# A request still running holds its idempotency key at most this long (seconds), in case its worker dies
+IDEMPOTENCY_LOCK_TTL = 120
+
 
 def add_response_code(func):
     """Function to add response code to the response"""
@@ -16,3 +23,118 @@ def add_response_code(func):
         return resp
 
     return wrapper
+
+
+def add_etag(get_etag):
+    """Answer conditional GETs of a whitelisted method.
+
+    The response gets the ETag returned by `get_etag`, called with the arguments of the method, and a request
+    whose If-None-Match has it is answered with 304 without running the method.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            etag = get_etag(*args, **kwargs)
+
+            if not etag:
+                return func(*args, **kwargs)
+
+            frappe.flags.response_headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+
+            request = getattr(frappe.local, "request", None)
+
+            if request and request.method in ("GET", "HEAD") and request.if_none_match.contains(etag):
+                frappe.local.response.http_status_code = 304
+                return None
+
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def add_idempotency_key(func):
+    """Replay the first response of a whitelisted method to the retries of a request.
+
+    A successful response to a request with an Idempotency-Key header, or an idempotency_key argument, is stored
+    once the request is committed, for the Idempotency Key TTL of the Appointment Settings. A retry with the same
+    key, from the same user or guest IP, gets it back without running the method again. Use it under
+    add_response_code.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        idempotency_key = kwargs.pop("idempotency_key", None) or frappe.get_request_header(IDEMPOTENCY_KEY_HEADER)
+        ttl = int(frappe.db.get_single_value("Appointment Settings", "idempotency_key_ttl") or 0)
+
+        if not idempotency_key or not ttl:
+            return func(*args, **kwargs)
+
+        key = "{0}:{1}.{2}:{3}".format(
+            IDEMPOTENCY_KEY_PREFIX,
+            func.__module__,
+            func.__qualname__,
+            hashlib.sha256(f"{get_idempotency_scope()}:{idempotency_key}".encode()).hexdigest(),
+        )
+        # A key reused for another request is an error of the client, not a retry
+        fingerprint = hashlib.sha256(
+            json.dumps(
+                sorted((name, str(value)) for name, value in kwargs.items() if name not in ("cmd", "_"))
+            ).encode()
+        ).hexdigest()
+
+        stored = frappe.cache.get_value(key, expires=True)
+
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                return {"error": f"{IDEMPOTENCY_KEY_HEADER} was already used for another request"}, 422
+
+            frappe.flags.response_headers = {"Idempotent-Replayed": "true"}
+            return (stored["response"], stored["status_code"]) if stored["status_code"] else stored["response"]
+
+        lock_key = f"{key}:lock"
+
+        if not frappe.cache.set(frappe.cache.make_key(lock_key), 1, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+            return {"error": f"A request with this {IDEMPOTENCY_KEY_HEADER} is in progress"}, 409
+
+        try:
+            resp = func(*args, **kwargs)
+        except Exception:
+            frappe.cache.delete_value(lock_key)
+            raise
+
+        response, status_code = resp if type(resp) is tuple else (resp, None)
+
+        def store_response():
+            if not status_code or status_code < 400:
+                frappe.cache.set_value(
+                    key,
+                    {"fingerprint": fingerprint, "response": response, "status_code": status_code},
+                    expires_in_sec=ttl,
+                )
+
+            frappe.cache.delete_value(lock_key)
+
+        # Only a committed request is replayed, the retry of a request that is rolled back runs again
+        frappe.db.after_commit.add(store_response)
+        frappe.db.after_rollback.add(lambda: frappe.cache.delete_value(lock_key))
+
+        return resp
+
+    return wrapper
+
+
+def get_idempotency_scope() -> str:
+    """Get who an idempotency key belongs to: the user, or the IP of a guest"""
+    if frappe.session.user != "Guest":
+        return frappe.session.user
+
+    return f"Guest:{frappe.local.request_ip}"
+
+
+def set_response_headers(response=None, request=None):
+    """after_request hook, adds the headers set by add_etag and add_idempotency_key to the response"""
+    if response is not None and frappe.flags.response_headers:
+        response.headers.update(frappe.flags.response_headers)
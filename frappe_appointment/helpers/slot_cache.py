@@ -0,0 +1,177 @@
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+import frappe
+
+SLOT_CACHE_KEY_PREFIX = "frappe_appointment:day_slots"
+AVAILABILITY_GENERATION_KEY_PREFIX = "frappe_appointment:availability_generation"
+
+# Generation of the availability of everyone, bumped for changes that are not tied to some members
+ALL_MEMBERS = "*"
+
+# A computation of day slots holds its lock at most this long (seconds), in case its worker dies
+SINGLE_FLIGHT_LOCK_TTL = 30
+# How long (seconds) a request waits for the slots another request is computing before computing them itself
+SINGLE_FLIGHT_WAIT = 5
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05
+
+
+def get_slot_cache_ttl() -> int:
+    """Get the TTL (seconds) of the cached day slots, 0 disables the cache"""
+    return int(frappe.db.get_single_value("Appointment Settings", "slot_cache_ttl") or 0)
+
+
+def get_availability_generation_key(member: str) -> str:
+    return frappe.cache.make_key(f"{AVAILABILITY_GENERATION_KEY_PREFIX}:{member}")
+
+
+def get_availability_generation(members: list) -> str:
+    """Get the generation of the availability of the members, it changes with every bump of any of them.
+
+    Args:
+    members (list): member emails
+
+    Returns:
+    str: generation
+    """
+    members = sorted(members)
+    generations = frappe.cache.mget([get_availability_generation_key(member) for member in [ALL_MEMBERS, *members]])
+    return ".".join(str(int(generation or 0)) for generation in generations)
+
+
+def bump_availability_generation(members: list = None) -> None:
+    """Mark the availability of the members, or of everyone, as changed: their cached slots are not served anymore
+
+    Args:
+    members (list, optional): member emails, everyone if not given
+    """
+    pipeline = frappe.cache.pipeline()
+
+    for member in members if members is not None else [ALL_MEMBERS]:
+        pipeline.incrby(get_availability_generation_key(member), 1)
+
+    pipeline.execute()
+
+
+def get_slot_cache_key(appointment_group: object, date: datetime) -> str:
+    if appointment_group.get("is_personal_meeting"):
+        # Personal meetings use an unsaved Appointment Group built from the Appointment Slot Duration
+        group_id = f"duration:{appointment_group.duration_id}"
+    else:
+        group_id = f"group:{appointment_group.name}:{appointment_group.modified}"
+
+    generation = get_availability_generation(
+        [member.user for member in appointment_group.members if member.is_mandatory]
+    )
+
+    return f"{SLOT_CACHE_KEY_PREFIX}:{generation}:{group_id}:{date.strftime('%Y-%m-%d')}"
+
+
+def get_cached_day_slots(appointment_group: object, date: datetime) -> object:
+    """Read the slots of a day of the appointment group, see _get_time_slots_for_given_date
+
+    Args:
+    appointment_group (object): Appointment Group
+    date (datetime): date
+
+    Returns:
+    object: day slots, None if they are not cached
+    """
+    if not get_slot_cache_ttl():
+        return None
+
+    # expires=True skips the request local cache, the slots may be set by another worker in the meantime
+    return frappe.cache.get_value(get_slot_cache_key(appointment_group, date), expires=True)
+
+
+def get_day_slots_single_flight(appointment_group: object, date: datetime, compute_day_slots: Callable) -> object:
+    """Get the slots of a day from the cache, or compute and cache them, with one computation at a time per day.
+
+    When a link goes out to many people at once, the first request computes the day slots while the
+    concurrent requests for the same day wait for them to land in the cache instead of calling Google too.
+
+    Args:
+    appointment_group (object): Appointment Group
+    date (datetime): date
+    compute_day_slots (Callable): computes the day slots, see _get_time_slots_for_given_date
+
+    Returns:
+    object: day slots
+    """
+    ttl = get_slot_cache_ttl()
+
+    if not ttl:
+        return compute_day_slots()
+
+    key = get_slot_cache_key(appointment_group, date)
+    data = frappe.cache.get_value(key, expires=True)
+
+    if data is not None:
+        return data
+
+    lock_key = f"{key}:lock"
+
+    if not frappe.cache.set(frappe.cache.make_key(lock_key), 1, nx=True, ex=SINGLE_FLIGHT_LOCK_TTL):
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+
+        while time.monotonic() < deadline:
+            time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+            data = frappe.cache.get_value(key, expires=True)
+
+            if data is not None:
+                return data
+
+            if not frappe.cache.exists(lock_key):
+                # The computation failed, make our own
+                break
+
+        return compute_and_cache_day_slots(key, compute_day_slots, ttl)
+
+    try:
+        return compute_and_cache_day_slots(key, compute_day_slots, ttl)
+    finally:
+        frappe.cache.delete_value(lock_key)
+
+
+def compute_and_cache_day_slots(key: str, compute_day_slots: Callable, ttl: int) -> object:
+    data = compute_day_slots()
+    frappe.cache.set_value(key, data, expires_in_sec=ttl)
+    return data
+
+
+def set_cached_day_slots(appointment_group: object, date: datetime, data: object) -> None:
+    ttl = get_slot_cache_ttl()
+
+    if not ttl:
+        return
+
+    frappe.cache.set_value(get_slot_cache_key(appointment_group, date), data, expires_in_sec=ttl)
+
+
+def get_availability_etag(reference: str, members: list, args: dict, held_slots: set = None) -> str:
+    """Get the ETag of a slot response, see add_etag.
+
+    It changes with the availability generation of the members, the request arguments, the held slots and
+    every minute, as slots that are over drop out of the responses.
+
+    Args:
+    reference (str): the Appointment Group or Appointment Slot Duration and its version
+    members (list): mandatory member emails
+    args (dict): request arguments
+    held_slots (set, optional): slots held for a booking, see get_held_slots
+
+    Returns:
+    str: ETag
+    """
+    payload = [
+        reference,
+        get_availability_generation(members),
+        sorted((key, str(value)) for key, value in args.items() if key not in ("cmd", "_")),
+        int(time.time() // 60),
+        sorted(held_slots or ()),
+    ]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()[:32]
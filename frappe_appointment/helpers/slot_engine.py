@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
+MINUTES_PER_DAY = 24 * 60
+
+# Value of the `format` argument of the get_time_slots APIs that selects get_compact_slots
+COMPACT_FORMAT = "compact"
+
+
+def datetime_to_epoch_minutes(date_time: datetime, round_up: bool = False) -> int:
+    """Convert an aware datetime to minutes since the UNIX epoch.
+
+    Args:
+    date_time (datetime): Timezone aware datetime
+    round_up (bool, optional): Round partial minutes up instead of down. Defaults to False.
+
+    Returns:
+    int: Minutes since epoch
+    """
+    seconds = int(date_time.timestamp())
+
+    if round_up:
+        return -(-seconds // 60)
+
+    return seconds // 60
+
+
+def epoch_minutes_to_datetime(minutes: int) -> datetime:
+    """Convert minutes since the UNIX epoch to a UTC datetime.
+
+    Args:
+    minutes (int): Minutes since epoch
+
+    Returns:
+    datetime: UTC datetime
+    """
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def seconds_to_minutes(seconds: int) -> int:
+    """Convert a Duration field value (seconds) to whole minutes, rounding up.
+
+    Args:
+    seconds (int): Duration in seconds, None is treated as 0
+
+    Returns:
+    int: Duration in minutes
+    """
+    return -(-int(seconds or 0) // 60)
+
+
+def get_window_bitmap(origin: int, start: int, end: int) -> int:
+    """Get the availability bitmap of a window: bit i is set if minute origin + i is inside [start, end).
+
+    Args:
+    origin (int): Epoch minute of bit 0
+    start (int): Start of the window
+    end (int): End of the window
+
+    Returns:
+    int: Bitmap
+    """
+    start = max(start, origin)
+
+    if end <= start:
+        return 0
+
+    return ((1 << (end - start)) - 1) << (start - origin)
+
+
+def get_busy_bitmap(origin: int, end: int, busy_intervals: list, buffer: int = 0) -> int:
+    """Get the bitmap of the minutes of [origin, end) blocked by busy intervals, each widened by `buffer` on both sides.
+
+    Args:
+    origin (int): Epoch minute of bit 0
+    end (int): Epoch minute past which busy time is ignored
+    busy_intervals (list): (start, end) pairs
+    buffer (int, optional): Minimum gap to keep around busy intervals
+
+    Returns:
+    int: Bitmap
+    """
+    bitmap = 0
+
+    for busy_start, busy_end in busy_intervals:
+        bitmap |= get_window_bitmap(origin, busy_start - buffer, min(busy_end + buffer, end))
+
+    return bitmap
+
+
+def get_free_runs(bitmap: int) -> list:
+    """Get the runs of set bits of a bitmap as (first bit, bit after the last) pairs, lowest first."""
+    runs = []
+
+    while bitmap:
+        lowest_bit = bitmap & -bitmap
+        run_start = lowest_bit.bit_length() - 1
+        # Adding the lowest bit carries through the run and sets the first bit after it
+        run_end = ((bitmap + lowest_bit) & ~bitmap).bit_length() - 1
+        runs.append((run_start, run_end))
+        bitmap &= ~((1 << run_end) - 1)
+
+    return runs
+
+
+def get_bitmap_bounds(bitmap: int, origin: int) -> tuple:
+    """Get the first set minute of a bitmap and the minute after its last set one, as epoch minutes.
+
+    Args:
+    bitmap (int): Non-empty bitmap
+    origin (int): Epoch minute of bit 0
+
+    Returns:
+    tuple: (start, end) epoch minutes
+    """
+    return origin + (bitmap & -bitmap).bit_length() - 1, origin + bitmap.bit_length()
+
+
+def get_bitmap_slots(bitmap: int, origin: int, duration: int) -> list:
+    """Enumerate back to back slots of `duration` from the start of every free run of the bitmap.
+
+    Args:
+    bitmap (int): Availability bitmap
+    origin (int): Epoch minute of bit 0
+    duration (int): Slot length
+
+    Returns:
+    list: (start, end) epoch minutes of the slots
+    """
+    if duration <= 0:
+        return []
+
+    slots = []
+
+    for run_start, run_end in get_free_runs(bitmap):
+        slots.extend(
+            (origin + slot_start, origin + slot_start + duration)
+            for slot_start in range(run_start, run_end - duration + 1, duration)
+        )
+
+    return slots
+
+
+def get_compact_slots(slots: list, duration: int) -> dict:
+    """Encode slots for the compact response format: a base UNIX timestamp and the minute offsets of the slot starts.
+
+    Args:
+    slots (list): (start, end) epoch minutes of the slots, sorted
+    duration (int): Slot length in minutes
+
+    Returns:
+    dict: base (seconds), duration (minutes) and offsets (minutes from base) of the slots
+    """
+    base = slots[0][0] if slots else 0
+    return {
+        "base": base * 60,
+        "duration": duration,
+        "offsets": [start - base for start, _end in slots],
+    }
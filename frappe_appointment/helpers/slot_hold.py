@@ -0,0 +1,112 @@
+import datetime
+import time
+from typing import NamedTuple
+
+import frappe
+
+from frappe_appointment.helpers.slot_engine import datetime_to_epoch_minutes
+
+SLOT_HOLD_KEY_PREFIX = "frappe_appointment:slot_hold"
+SLOT_HOLDS_KEY_PREFIX = "frappe_appointment:slot_holds"
+
+# How long a guest keeps a slot while filling the booking form
+SLOT_HOLD_TTL = 300
+# Holds a client (IP) may take or extend per SLOT_HOLD_TTL, which caps the slots it holds at once
+SLOT_HOLD_RATE_LIMIT = 10
+# A slot being booked stays held until its event is committed, this only bounds a booking whose worker dies
+BOOKED_SLOT_HOLD_TTL = 600
+
+# Only the holder of a hold, the one with its token, may extend or release it
+EXTEND_SLOT_HOLD_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SLOT_HOLD_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SlotHold(NamedTuple):
+    """Hold on the slot [start, end) (epoch minutes) of an Appointment Group or Appointment Slot Duration"""
+
+    reference: str
+    start: int
+    end: int
+    token: str
+
+
+def get_slot_hold_reference(appointment_group: object) -> str:
+    if appointment_group.get("is_personal_meeting"):
+        return f"duration:{appointment_group.duration_id}"
+    return f"group:{appointment_group.name}"
+
+
+def get_slot_hold_key(reference: str, start: int, end: int) -> str:
+    return frappe.cache.make_key(f"{SLOT_HOLD_KEY_PREFIX}:{reference}:{start}:{end}")
+
+
+def get_slot_holds_key(reference: str) -> str:
+    # Sorted set of the held slots of the reference, scored by the expiry of their hold
+    return frappe.cache.make_key(f"{SLOT_HOLDS_KEY_PREFIX}:{reference}")
+
+
+def parse_slot(start_time: str, end_time: str) -> tuple:
+    """Get the (start, end) epoch minutes of a slot given as "YYYY-MM-DD HH:MM:SS+ZZZZ", raises ValueError"""
+    return (
+        datetime_to_epoch_minutes(datetime.datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S%z")),
+        datetime_to_epoch_minutes(datetime.datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S%z")),
+    )
+
+
+def hold_slot(reference: str, start: int, end: int, hold_token: str = None, ttl: int = SLOT_HOLD_TTL) -> SlotHold:
+    """Hold a slot, or extend the hold of the token, with a single atomic Redis command.
+
+    Args:
+    reference (str): Appointment Group or Appointment Slot Duration, see get_slot_hold_reference
+    start (int): start of the slot in epoch minutes
+    end (int): end of the slot in epoch minutes
+    hold_token (str, optional): token of a hold taken before, it is extended if it still holds the slot
+    ttl (int, optional): seconds the hold lasts
+
+    Returns:
+    SlotHold: the hold, None if someone else holds the slot
+    """
+    key = get_slot_hold_key(reference, start, end)
+
+    if not hold_token or not frappe.cache.eval(EXTEND_SLOT_HOLD_SCRIPT, 1, key, hold_token, ttl):
+        hold_token = frappe.generate_hash(length=32)
+
+        if not frappe.cache.set(key, hold_token, nx=True, ex=ttl):
+            return None
+
+    frappe.cache.zadd(get_slot_holds_key(reference), {f"{start}:{end}": time.time() + ttl})
+
+    return SlotHold(reference, start, end, hold_token)
+
+
+def release_slot_hold(slot_hold: SlotHold) -> None:
+    if frappe.cache.eval(
+        RELEASE_SLOT_HOLD_SCRIPT,
+        1,
+        get_slot_hold_key(slot_hold.reference, slot_hold.start, slot_hold.end),
+        slot_hold.token,
+    ):
+        frappe.cache.zrem(get_slot_holds_key(slot_hold.reference), f"{slot_hold.start}:{slot_hold.end}")
+
+
+def get_held_slots(reference: str) -> set:
+    """Get the (start, end) epoch minutes of the slots of the reference that are held right now"""
+    key = get_slot_holds_key(reference)
+    now = time.time()
+
+    pipeline = frappe.cache.pipeline()
+    pipeline.zremrangebyscore(key, "-inf", now)
+    pipeline.zrangebyscore(key, now, "+inf")
+    _, held_slots = pipeline.execute()
+
+    return {tuple(int(minutes) for minutes in held_slot.decode().split(":")) for held_slot in held_slots}
@@ -0,0 +1,157 @@
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+import frappe
+from frappe import _
+
+from frappe_appointment.constants import APPOINTMENT_GROUP, APPOINTMENT_SLOT_DURATION
+
+# Policies kept per process, cleared once it holds this many
+SLOT_POLICY_CACHE_SIZE = 1024
+
+_slot_policy_cache = {}
+
+
+@dataclass(slots=True)
+class SlotPolicyMember:
+    user: str
+    is_mandatory: int = 1
+
+
+@dataclass(slots=True)
+class SlotPolicy:
+    """Values of an Appointment Group, or of an Appointment Slot Duration, the slot engine and the booking need.
+
+    It reads like an Appointment Group, so it can be passed wherever one is expected for slots and bookings.
+    """
+
+    name: str | None
+    group_name: str
+    members: tuple = ()
+    duration_for_event: int = 0
+    minimum_buffer_time: int | None = None
+    minimum_notice_before_event: int | None = None
+    event_availability_window: int | None = None
+    limit_booking_frequency: int = -1
+    event_creator: str | None = None
+    event_organizer: str | None = None
+    meet_provider: str | None = None
+    meet_link: str | None = None
+    response_email_template: str | None = None
+    linked_doctype: str | None = None
+    webhook: str | None = None
+    allow_rescheduling: int = 0
+    minimum_notice_for_reschedule: int | None = None
+    schedule_only_once: int = 0
+    use_freebusy: int = 0
+    is_personal_meeting: int = 0
+    duration_id: str | None = None
+    modified: object = None
+
+    def get(self, key: str, default: object = None) -> object:
+        return getattr(self, key, default)
+
+    def as_dict(self) -> dict:
+        return frappe._dict(asdict(self), doctype=APPOINTMENT_GROUP)
+
+    @classmethod
+    def from_appointment_group(cls, appointment_group: object) -> "SlotPolicy":
+        return cls(
+            name=appointment_group.name,
+            group_name=appointment_group.group_name,
+            members=tuple(SlotPolicyMember(member.user, member.is_mandatory) for member in appointment_group.members),
+            duration_for_event=appointment_group.duration_for_event,
+            minimum_buffer_time=appointment_group.minimum_buffer_time,
+            minimum_notice_before_event=appointment_group.minimum_notice_before_event,
+            event_availability_window=appointment_group.event_availability_window,
+            limit_booking_frequency=appointment_group.limit_booking_frequency,
+            event_creator=appointment_group.event_creator,
+            event_organizer=appointment_group.event_organizer,
+            meet_provider=appointment_group.meet_provider,
+            meet_link=appointment_group.meet_link,
+            response_email_template=appointment_group.response_email_template,
+            linked_doctype=appointment_group.linked_doctype,
+            webhook=appointment_group.webhook,
+            allow_rescheduling=appointment_group.allow_rescheduling,
+            minimum_notice_for_reschedule=appointment_group.minimum_notice_for_reschedule,
+            schedule_only_once=appointment_group.schedule_only_once,
+            use_freebusy=appointment_group.get("use_freebusy"),
+            modified=appointment_group.modified,
+        )
+
+    @classmethod
+    def from_slot_duration(cls, duration: object, user_availability: object) -> "SlotPolicy":
+        """Build the policy of a personal meeting of the user for the Appointment Slot Duration"""
+        return cls(
+            name=None,
+            group_name="Personal Meeting",
+            members=(SlotPolicyMember(user_availability.get("name"), 1),),
+            duration_for_event=duration.duration,
+            minimum_buffer_time=duration.minimum_buffer_time if duration.minimum_buffer_time else None,
+            minimum_notice_before_event=duration.minimum_notice_before_event,
+            event_availability_window=duration.availability_window,
+            limit_booking_frequency=duration.limit_booking_frequency,
+            event_creator=user_availability.get("google_calendar"),
+            event_organizer=user_availability.get("user"),
+            meet_provider=user_availability.get("meeting_provider"),
+            meet_link=user_availability.get("meeting_link"),
+            response_email_template=user_availability.get("response_email_template"),
+            linked_doctype=user_availability.get("name"),
+            allow_rescheduling=duration.allow_rescheduling,
+            minimum_notice_for_reschedule=duration.minimum_notice_for_reschedule,
+            is_personal_meeting=1,
+            duration_id=duration.name,
+            modified=duration.modified,
+        )
+
+
+def get_appointment_group_slot_policy(appointment_group_id: str) -> SlotPolicy:
+    """Get the slot policy of an Appointment Group, only its modified timestamp is read when the policy is cached
+
+    Args:
+    appointment_group_id (str): name of the Appointment Group
+
+    Returns:
+    SlotPolicy: slot policy
+    """
+    modified = frappe.db.get_value(APPOINTMENT_GROUP, appointment_group_id, "modified")
+
+    if not modified:
+        frappe.throw(
+            _("{0} {1} not found").format(_(APPOINTMENT_GROUP), appointment_group_id), frappe.DoesNotExistError
+        )
+
+    return get_cached_slot_policy(
+        (APPOINTMENT_GROUP, appointment_group_id, modified),
+        lambda: SlotPolicy.from_appointment_group(frappe.get_cached_doc(APPOINTMENT_GROUP, appointment_group_id)),
+    )
+
+
+def get_slot_duration_slot_policy(duration: object, user_availability: object) -> SlotPolicy:
+    """Get the slot policy of a personal meeting for an Appointment Slot Duration of the user
+
+    Args:
+    duration (object): Appointment Slot Duration
+    user_availability (object): User Appointment Availability the duration belongs to
+
+    Returns:
+    SlotPolicy: slot policy
+    """
+    return get_cached_slot_policy(
+        (APPOINTMENT_SLOT_DURATION, duration.name, duration.modified, user_availability.get("modified")),
+        lambda: SlotPolicy.from_slot_duration(duration, user_availability),
+    )
+
+
+def get_cached_slot_policy(key: tuple, build_policy: Callable) -> SlotPolicy:
+    # Every version of a document gets its own key, so entries never go stale, they are only dropped for room
+    key = (frappe.local.site, *key)
+    policy = _slot_policy_cache.get(key)
+
+    if policy is None:
+        if len(_slot_policy_cache) >= SLOT_POLICY_CACHE_SIZE:
+            _slot_policy_cache.clear()
+
+        policy = _slot_policy_cache[key] = build_policy()
+
+    return policy
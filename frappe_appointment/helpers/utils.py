@@ -49,6 +49,28 @@ def get_utc_datatime_with_time(date: datetime, time: str) -> datetime:
     return local_datetime.astimezone(pytz.utc)
 
 
+def seconds_to_time_str(seconds: int) -> str:
+    """Format seconds since midnight as "HH:MM:SS", 86400 gives "24:00:00"."""
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_aware_datetime(date_time: str) -> datetime:
+    """Parse an ISO 8601 datetime string, a datetime without an offset is taken as UTC.
+
+    Args:
+    date_time (str): Datetime string, e.g. "2025-01-31T10:00:00+05:30"
+
+    Returns:
+    datetime: Timezone aware datetime
+    """
+    parsed_datetime = parser.isoparse(date_time.strip().replace(" ", "T", 1))
+
+    if not parsed_datetime.tzinfo:
+        return parsed_datetime.replace(tzinfo=pytz.utc)
+
+    return parsed_datetime
+
+
 def convert_timezone_to_utc(date_time: str, time_zone: str) -> datetime:
     """Helper function to convert a given datetime string to a datetime object with the specified time zone.
 
@@ -99,31 +121,6 @@ def utc_to_given_time_zone(utc_datetime: datetime, time_zone_offset: str) -> str
     return converted_datetime
 
 
-def compare_end_time_slots(current_slot, next_slot):
-    current_slot, next_slot = get_time_slots_utc(current_slot), get_time_slots_utc(next_slot)
-
-    if current_slot["start_time"] != next_slot["start_time"]:
-        return cmp_items(current_slot["start_time"], next_slot["start_time"])
-
-    return cmp_items(current_slot["end_time"], next_slot["end_time"])
-
-
-def get_time_slots_utc(slot):
-    return {
-        "start_time": get_datetime_str(convert_timezone_to_utc(slot["start"]["dateTime"], slot["start"]["timeZone"])),
-        "end_time": get_datetime_str(convert_timezone_to_utc(slot["end"]["dateTime"], slot["end"]["timeZone"])),
-    }
-
-
-def cmp_items(a, b):
-    if a > b:
-        return 1
-    elif a == b:
-        return 0
-    else:
-        return -1
-
-
 def get_date_start_end_time_for_given_timezone(date_str: str, timezone_offset: str):
     date = datetime.strptime(date_str, "%Y-%m-%d")
     timezone = pytz.FixedOffset(int(timezone_offset))
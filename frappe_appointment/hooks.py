@@ -175,10 +175,19 @@ override_doctype_class = {
 
 doc_events = {
     "Leave Application": {  # Leave Application is a doctype in HR module, which is not a requirement for this app
+        "on_update": "frappe_appointment.overrides.leave_application_override.on_update",
         "on_submit": "frappe_appointment.overrides.leave_application_override.on_submit",
         "on_cancel": "frappe_appointment.overrides.leave_application_override.on_cancel_and_on_trash",
         "on_trash": "frappe_appointment.overrides.leave_application_override.on_cancel_and_on_trash",
     },
+    "Holiday List": {
+        "on_update": "frappe_appointment.overrides.holiday_list_override.on_update_and_on_trash",
+        "on_trash": "frappe_appointment.overrides.holiday_list_override.on_update_and_on_trash",
+    },
+    "Employee": {
+        "on_update": "frappe_appointment.overrides.employee_override.on_update_and_on_trash",
+        "on_trash": "frappe_appointment.overrides.employee_override.on_update_and_on_trash",
+    },
 }
 
 # Scheduled Tasks
@@ -201,6 +210,14 @@ scheduler_events = {
     # "monthly": [
     # 	"frappe_appointment.tasks.monthly"
     # ],
+    "cron": {
+        "*/2 * * * *": [
+            "frappe_appointment.tasks.sync_google_calendar_mirror.sync_google_calendar_mirrors",
+        ],
+        "*/10 * * * *": [
+            "frappe_appointment.tasks.refresh_availability_snapshots.refresh_availability_snapshots",
+        ],
+    },
 }
 
 # Testing
@@ -234,7 +251,7 @@ override_whitelisted_methods = {
 # Request Events
 # ----------------
 # before_request = ["frappe_appointment.utils.before_request"]
-# after_request = ["frappe_appointment.utils.after_request"]
+after_request = ["frappe_appointment.helpers.overrides.set_response_headers"]
 
 # Job Events
 # ----------
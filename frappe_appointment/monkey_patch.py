@@ -4,7 +4,6 @@ from frappe.integrations.doctype.google_calendar.google_calendar import (
     format_date_according_to_google_calendar,
     get_attendees,
     get_conference_data,
-    get_google_calendar_object,
     insert_event_in_google_calendar,
     repeat_on_to_google_calendar_recurrence_rule,
 )
@@ -13,16 +12,20 @@ from frappe.utils import (
 )
 from googleapiclient.errors import HttpError
 
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
+
 
 def update_event_in_google_calendar_override(doc, method=None):
     """
     Updates Events in Google Calendar if any existing event is modified in Frappe Calendar
     """
     # Workaround to avoid triggering updation when Event is being inserted since
-    # creation and modified are same when inserting doc
+    # creation and modified are same when inserting doc, or when its Google Calendar event was
+    # just inserted by Event.confirm_booking
     if (
         not doc.sync_with_google_calendar
         or doc.modified == doc.creation
+        or doc.flags.google_calendar_event_inserted
         or not frappe.db.exists("Google Calendar", {"name": doc.google_calendar})
     ):
         return
@@ -32,7 +35,7 @@ def update_event_in_google_calendar_override(doc, method=None):
         insert_event_in_google_calendar(doc)
         return
 
-    google_calendar, account = get_google_calendar_object(doc.google_calendar)
+    google_calendar, account = get_google_calendar_service(doc.google_calendar)
 
     if not account.push_to_google_calendar:
         return
@@ -0,0 +1,8 @@
+from frappe_appointment.helpers.availability_snapshot import enqueue_availability_snapshot_refresh_for_members
+from frappe_appointment.helpers.leave_holiday_index import clear_member_employees
+
+
+def on_update_and_on_trash(doc, method=None):
+    # The company email of the employee may have changed, so drop the lookup of every member
+    clear_member_employees()
+    enqueue_availability_snapshot_refresh_for_members()
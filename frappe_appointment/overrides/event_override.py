@@ -7,9 +7,6 @@ import frappe.utils
 import requests
 from frappe import _, clear_messages
 from frappe.desk.doctype.event.event import Event
-from frappe.integrations.doctype.google_calendar.google_calendar import (
-    get_google_calendar_object,
-)
 from frappe.twofactor import decrypt, encrypt
 from frappe.utils import get_datetime, now
 
@@ -22,11 +19,35 @@ from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment
     is_valid_time_slots,
     vaild_date,
 )
+from frappe_appointment.helpers.availability_snapshot import (
+    enqueue_availability_snapshot_refresh_for_members,
+    get_dates_around,
+)
+from frappe_appointment.helpers.booking import (
+    BOOKING_CONFIRMED,
+    BOOKING_FAILED,
+    BOOKING_PENDING,
+    enqueue_finalize_booking,
+    get_cached_booking_status,
+    is_async_booking_enabled,
+    set_booking_status,
+)
 from frappe_appointment.helpers.email import send_email_template_mail
 from frappe_appointment.helpers.google_calendar import (
+    delete_event_in_google_calendar_override,
     insert_event_in_google_calendar_override,
 )
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_account
 from frappe_appointment.helpers.ics_file import add_ics_file_in_attachment
+from frappe_appointment.helpers.slot_cache import bump_availability_generation
+from frappe_appointment.helpers.slot_hold import (
+    BOOKED_SLOT_HOLD_TTL,
+    get_slot_hold_reference,
+    hold_slot,
+    parse_slot,
+    release_slot_hold,
+)
+from frappe_appointment.helpers.slot_policy import get_slot_duration_slot_policy
 from frappe_appointment.helpers.utils import utc_to_sys_time
 from frappe_appointment.helpers.zoom import create_meeting, delete_meeting, update_meeting
 
@@ -44,16 +65,12 @@ class EventOverride(Event):
             self.appointment_group = frappe.get_doc(APPOINTMENT_GROUP, self.custom_appointment_group)
             self.custom_meeting_provider = self.appointment_group.meet_provider
             if self.appointment_group.meet_provider == "Zoom":
-                meet_url, meet_data = create_meeting(
-                    self.appointment_group.event_creator,
-                    self.subject,
-                    self.starts_on,
-                    self.appointment_group.duration_for_event // 60,  # convert to minutes
-                    self.description,
-                )
-                self.description = f"{self.description or ''}\nMeet Link: {meet_url}"
-                self.custom_meet_link = meet_url
-                self.custom_meet_data = json.dumps(meet_data, indent=4)
+                # A pending booking gets its meeting once confirmed, see confirm_booking
+                if self.custom_booking_status != BOOKING_PENDING:
+                    self.create_zoom_meeting(
+                        self.appointment_group.event_creator,
+                        self.appointment_group.duration_for_event // 60,  # convert to minutes
+                    )
             elif self.appointment_group.meet_provider == "Google Meet":
                 self.add_video_conferencing = 1
             elif self.appointment_group.meet_provider == "Custom" and self.appointment_group.meet_link:
@@ -73,16 +90,10 @@ class EventOverride(Event):
             )
 
             if self.user_calendar.meeting_provider == "Zoom":
-                meet_url, meet_data = create_meeting(
-                    self.user_calendar.google_calendar,
-                    self.subject,
-                    self.starts_on,
-                    self.appointment_slot_duration.duration // 60,
-                    self.description,
-                )
-                self.description = f"{self.description or ''}\nMeet Link: {meet_url}"
-                self.custom_meet_link = meet_url
-                self.custom_meet_data = json.dumps(meet_data, indent=4)
+                if self.custom_booking_status != BOOKING_PENDING:
+                    self.create_zoom_meeting(
+                        self.user_calendar.google_calendar, self.appointment_slot_duration.duration // 60
+                    )
             elif self.user_calendar.meeting_provider == "Google Meet":
                 self.add_video_conferencing = 1
             elif self.user_calendar.meeting_provider == "Custom" and self.user_calendar.meeting_link:
@@ -91,33 +102,67 @@ class EventOverride(Event):
                 else:
                     self.description = f"Meet Link: {self.user_calendar.meeting_link}"
                 self.custom_meet_link = self.user_calendar.meeting_link
-            self.appointment_group = frappe.get_doc(
-                {
-                    "doctype": "Appointment Group",
-                    "group_name": "Personal Meeting",
-                    "event_creator": self.user_calendar.get("google_calendar"),
-                    "event_organizer": self.user_calendar.get("user"),
-                    "members": [{"user": self.user_calendar.get("name"), "is_mandatory": 1}],
-                    "duration_for_event": self.appointment_slot_duration.duration,
-                    "minimum_buffer_time": (
-                        self.appointment_slot_duration.minimum_buffer_time
-                        if self.appointment_slot_duration.minimum_buffer_time
-                        else None
-                    ),
-                    "minimum_notice_before_event": self.appointment_slot_duration.minimum_notice_before_event,
-                    "event_availability_window": self.appointment_slot_duration.availability_window,
-                    "meet_provider": self.user_calendar.get("meeting_provider"),
-                    "meet_link": self.user_calendar.get("meeting_link"),
-                    "response_email_template": self.user_calendar.get("response_email_template"),
-                    "linked_doctype": self.user_calendar.get("name"),
-                    "limit_booking_frequency": -1,
-                }
-            )
+            self.appointment_group = get_slot_duration_slot_policy(self.appointment_slot_duration, self.user_calendar)
             self.update_attendees_for_appointment_group()
 
     def after_insert(self):
         pass  # This exists to prevent errors in derived classes.
 
+    def create_zoom_meeting(self, google_calendar: str, duration: int):
+        """Create the Zoom meeting of the event
+
+        Args:
+        google_calendar (str): Google Calendar of the Zoom user
+        duration (int): duration in minutes
+        """
+        meet_url, meet_data = create_meeting(google_calendar, self.subject, self.starts_on, duration, self.description)
+        self.description = f"{self.description or ''}\nMeet Link: {meet_url}"
+        self.custom_meet_link = meet_url
+        self.custom_meet_data = json.dumps(meet_data, indent=4)
+
+    def confirm_booking(self, metadata: dict):
+        """Run what a pending booking was inserted without: the webhook, the Zoom meeting, the Google Calendar
+        event and the emails
+
+        Args:
+        metadata (dict): booking arguments
+        """
+        appointment_group = self.get_booking_appointment_group()
+
+        webhook_call = self.handle_webhook(
+            {
+                "event": self.as_dict(),
+                "appointment_group": appointment_group.as_dict(),
+                "metadata": metadata,
+            }
+        )
+        if not webhook_call["status"]:
+            frappe.throw(webhook_call["message"])
+
+        if self.custom_meeting_provider == "Zoom":
+            self.create_zoom_meeting(appointment_group.event_creator, appointment_group.duration_for_event // 60)
+
+        _, updates = insert_event_in_google_calendar_override(self, mute_message=True, update_doc=False)
+        for key, value in updates.items():
+            self.set(key, value)
+
+        self.custom_booking_status = BOOKING_CONFIRMED
+        self.event_info = metadata
+        # The Google Calendar event already has the values of this save
+        self.flags.google_calendar_event_inserted = True
+        self.save(ignore_permissions=True)
+        self.enqueue_meet_email()
+
+    def get_booking_appointment_group(self):
+        """Get the Appointment Group of the event, or the slot policy of its Appointment Slot Duration"""
+        if self.custom_appointment_group:
+            return frappe.get_doc(APPOINTMENT_GROUP, self.custom_appointment_group)
+
+        return get_slot_duration_slot_policy(
+            frappe.get_doc("Appointment Slot Duration", self.custom_appointment_slot_duration),
+            frappe.get_doc(USER_APPOINTMENT_AVAILABILITY, self.custom_user_calendar),
+        )
+
     def as_dict(self, *args, **kwargs):
         """
         Inject the reschedule_url in the event dict
@@ -131,7 +176,11 @@ class EventOverride(Event):
         super().before_save()
         if not hasattr(self, "ics_event_description"):
             self.ics_event_description = None
-        if self.is_new() and (not hasattr(self, "has_event_inserted") or not self.has_event_inserted):
+        if (
+            self.is_new()
+            and (not hasattr(self, "has_event_inserted") or not self.has_event_inserted)
+            and self.custom_booking_status != BOOKING_PENDING
+        ):
             _, updates = insert_event_in_google_calendar_override(self, update_doc=False)
             for key, value in updates.items():
                 self.set(key, value)
@@ -144,7 +193,7 @@ class EventOverride(Event):
                 USER_APPOINTMENT_AVAILABILITY, self.custom_user_calendar
             )
 
-            if self.has_value_changed("starts_on"):
+            if self.has_value_changed("starts_on") and self.custom_booking_status != BOOKING_PENDING:
                 if not self.is_new():
                     if self.custom_meeting_provider == "Zoom":
                         meet_data = json.loads(self.custom_meet_data)
@@ -162,21 +211,25 @@ class EventOverride(Event):
                             duration,
                             self.description,
                         )
-                frappe.enqueue(
-                    send_meet_email,
-                    timeout=600,
-                    enqueue_after_commit=True,
-                    job_name=f"Send appointment time slot book response email: {self.name}",
-                    queue="long",
-                    doc=self,
-                    appointment_group=self.appointment_group,
-                    user_calendar=self.user_calendar,
-                    ics_event_description=self.ics_event_description,
-                    metadata=self.event_info if hasattr(self, "event_info") else {},
-                )
+                self.enqueue_meet_email()
+
+    def enqueue_meet_email(self):
+        frappe.enqueue(
+            send_meet_email,
+            timeout=600,
+            enqueue_after_commit=True,
+            job_name=f"Send appointment time slot book response email: {self.name}",
+            queue="long",
+            doc=self,
+            appointment_group=self.appointment_group,
+            user_calendar=self.user_calendar,
+            ics_event_description=self.ics_event_description,
+            metadata=self.event_info if hasattr(self, "event_info") else {},
+        )
 
     def on_trash(self):
-        if self.custom_meeting_provider == "Zoom":
+        # A pending booking has no Zoom meeting yet
+        if self.custom_meeting_provider == "Zoom" and self.custom_meet_data:
             meet_data = json.loads(self.custom_meet_data)
             meet_id = meet_data.get("id")
             self.appointment_group = None
@@ -189,6 +242,7 @@ class EventOverride(Event):
                 self.appointment_group.event_creator if self.appointment_group else self.user_calendar.google_calendar,
                 meet_id,
             )
+        self.clear_slot_cache()
         super().on_trash()
 
     @property
@@ -218,6 +272,34 @@ class EventOverride(Event):
 
     def on_update(self):
         self.sync_communication()  # Overrided this because we have made reference doctype and name non-mandatory in Event Participants
+        self.clear_slot_cache()
+
+    def clear_slot_cache(self):
+        """Booked appointments are busy time for their members, recompute the cached slots"""
+        if self.custom_appointment_group or self.custom_appointment_slot_duration:
+            members = self.get_appointment_members()
+            bump_availability_generation(members)
+            enqueue_availability_snapshot_refresh_for_members(
+                members, get_dates_around(self.starts_on, self.ends_on or self.starts_on)
+            )
+
+    def get_appointment_members(self):
+        """Get the members whose slots the appointment takes: the participants, and the members of its group or calendar"""
+        members = {participant.email for participant in self.event_participants if participant.email}
+
+        if self.custom_appointment_group:
+            members.update(
+                frappe.get_all(
+                    "Members",
+                    filters={"parent": self.custom_appointment_group, "parenttype": APPOINTMENT_GROUP},
+                    pluck="user",
+                )
+            )
+
+        if self.custom_user_calendar:
+            members.add(self.custom_user_calendar)
+
+        return sorted(members)
 
     def sync_communication(self):
         if self.event_participants:
@@ -289,7 +371,7 @@ class EventOverride(Event):
 
         members = self.appointment_group.members
 
-        google_calendar_api_obj, account = get_google_calendar_object(self.appointment_group.event_creator)
+        account = get_google_calendar_account(self.appointment_group.event_creator)
 
         idx = len(self.event_participants) + 1
 
@@ -513,6 +595,54 @@ def _create_event_for_appointment_group(
     success_message="",
     return_event_id=False,
     **args,
+):
+    """Hold the slot, consuming the hold of the booking form if its hold_token is given, and book it.
+
+    A concurrent booking of the same slot fails right away on the hold instead of racing this one to the insert.
+    """
+    try:
+        slot = parse_slot(start_time, end_time)
+    except ValueError:
+        return frappe.throw(_("This slot is not available, please book another slot."))
+
+    # The hold covers the slot until the event is committed, from then on the slots show the event as busy
+    slot_hold = hold_slot(
+        get_slot_hold_reference(appointment_group), *slot, args.pop("hold_token", None), BOOKED_SLOT_HOLD_TTL
+    )
+
+    if not slot_hold:
+        return frappe.throw(_("This slot is not available, please book another slot."))
+
+    # Registered before booking, as the sync path commits the event itself
+    frappe.db.after_commit.add(lambda: release_slot_hold(slot_hold))
+
+    try:
+        return _create_event_for_held_slot(
+            appointment_group,
+            date,
+            start_time,
+            end_time,
+            user_timezone_offset,
+            event_participants,
+            success_message,
+            return_event_id,
+            **args,
+        )
+    except Exception:
+        release_slot_hold(slot_hold)
+        raise
+
+
+def _create_event_for_held_slot(
+    appointment_group: object,
+    date: str,
+    start_time: str,
+    end_time: str,
+    user_timezone_offset: str,
+    event_participants="[]",
+    success_message="",
+    return_event_id=False,
+    **args,
 ):
     # query parameters
     event_info = args
@@ -539,7 +669,7 @@ def _create_event_for_appointment_group(
     if len(members) <= 0:
         return frappe.throw(_("No Member found"))
 
-    google_calendar_api_obj, account = get_google_calendar_object(appointment_group.event_creator)
+    account = get_google_calendar_account(appointment_group.event_creator)
 
     if reschedule:
         if not appointment_group.allow_rescheduling:
@@ -625,8 +755,16 @@ def _create_event_for_appointment_group(
         calendar_event["custom_user_calendar"] = event_info.get("user_calendar")
         calendar_event["custom_appointment_slot_duration"] = event_info.get("appointment_slot_duration")
 
+    async_booking = is_async_booking_enabled()
+
+    if async_booking:
+        calendar_event["custom_booking_status"] = BOOKING_PENDING
+
     event = frappe.get_doc(calendar_event)
 
+    if async_booking:
+        return _create_pending_booking(event, event_info, success_message, return_event_id)
+
     # skip logging messages
     frappe.flags.mute_messages = True
 
@@ -651,16 +789,111 @@ def _create_event_for_appointment_group(
         return frappe.msgprint(success_message)
 
     if return_event_id:
-        resp = {"message": _("Event has been created"), "event_id": event.name}
-        resp["meeting_provider"] = event.custom_meeting_provider
-        resp["meet_link"] = event.custom_meet_link
-        if appointment_group.allow_rescheduling:
-            event = frappe.get_doc("Event", event.name)
-            resp["reschedule_url"] = event.reschedule_url
-        resp["google_calendar_event_url"] = event.custom_google_calendar_event_url
+        return get_event_created_response(event, appointment_group)
+    return frappe.msgprint(_("Event has been created"))
+
+
+def get_event_created_response(event: object, appointment_group: object) -> dict:
+    resp = {"message": _("Event has been created"), "event_id": event.name}
+    resp["meeting_provider"] = event.custom_meeting_provider
+    resp["meet_link"] = event.custom_meet_link
+    if appointment_group.allow_rescheduling:
+        event = frappe.get_doc("Event", event.name)
+        resp["reschedule_url"] = event.reschedule_url
+    resp["google_calendar_event_url"] = event.custom_google_calendar_event_url
+
+    return resp
+
+
+def _create_pending_booking(event: object, event_info: dict, success_message="", return_event_id=False):
+    """Insert the event of a booking as Pending Confirmation and leave the webhook, Zoom, Google Calendar and
+    emails to finalize_booking, so the booking request returns right away. The job is enqueued once the request
+    transaction, with the event, is committed.
+    """
+    event.insert(ignore_permissions=True)
+    booking_token = enqueue_finalize_booking(event.name, event_info)
+
+    if success_message:
+        return frappe.msgprint(success_message)
 
+    resp = {
+        "message": _("Your booking is being confirmed"),
+        "event_id": event.name,
+        "booking_status": BOOKING_PENDING,
+        "booking_token": booking_token,
+    }
+
+    if return_event_id:
         return resp
-    return frappe.msgprint(_("Event has been created"))
+    return frappe.msgprint(resp["message"])
+
+
+def finalize_booking(event_name: str, booking_token: str, metadata: dict):
+    """Confirm a pending booking, see _create_pending_booking. A booking that fails is deleted, along with its Zoom
+    meeting and Google Calendar event, which frees its slot.
+
+    Args:
+    event_name (str): the pending Event
+    booking_token (str): token the status of the booking is stored and published under
+    metadata (dict): booking arguments
+    """
+    if frappe.db.get_value("Event", event_name, "custom_booking_status") != BOOKING_PENDING:
+        # Deleted, or confirmed by an earlier run of the job
+        return
+
+    event = frappe.get_doc("Event", event_name)
+
+    try:
+        event.confirm_booking(metadata)
+        # nosemgrep
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(title=f"Appointment booking error {event_name}")
+
+        if event.custom_meeting_provider == "Zoom" and event.custom_meet_data:
+            try:
+                delete_meeting(
+                    event.get_booking_appointment_group().event_creator, json.loads(event.custom_meet_data).get("id")
+                )
+            except Exception:
+                frappe.log_error(title=f"Appointment booking Zoom cleanup error {event_name}")
+
+        # The rollback dropped the Google Calendar event id from the saved event, so its on_trash can not delete it
+        try:
+            delete_event_in_google_calendar_override(event)
+        except Exception:
+            frappe.log_error(title=f"Appointment booking Google Calendar cleanup error {event_name}")
+
+        frappe.delete_doc("Event", event_name, ignore_permissions=True)
+        # nosemgrep
+        frappe.db.commit()
+
+        message = str(e) if isinstance(e, frappe.ValidationError) else _("Unable to create an event")
+        set_booking_status(booking_token, {"booking_status": BOOKING_FAILED, "message": message}, publish=True)
+        return
+
+    resp = get_event_created_response(event, event.get_booking_appointment_group())
+    resp["booking_status"] = BOOKING_CONFIRMED
+    set_booking_status(booking_token, resp, publish=True)
+
+
+@frappe.whitelist(allow_guest=True)
+def get_booking_status(booking_token: str):
+    """Get the status of a pending booking, the fallback of the realtime update for clients that missed it
+
+    Args:
+    booking_token (str): token returned with the pending booking
+
+    Returns:
+    res (object): booking_status and, once confirmed, the response of a booking
+    """
+    booking_status = get_cached_booking_status(booking_token)
+
+    if not booking_status:
+        frappe.throw(_("Booking not found"), frappe.DoesNotExistError)
+
+    return booking_status
 
 
 @frappe.whitelist(allow_guest=True)
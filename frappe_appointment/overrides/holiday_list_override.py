@@ -0,0 +1,7 @@
+from frappe_appointment.helpers.availability_snapshot import enqueue_availability_snapshot_refresh_for_members
+from frappe_appointment.helpers.leave_holiday_index import clear_holiday_dates
+
+
+def on_update_and_on_trash(doc, method=None):
+    clear_holiday_dates(doc.name)
+    enqueue_availability_snapshot_refresh_for_members()
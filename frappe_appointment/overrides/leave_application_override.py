@@ -1,18 +1,35 @@
 import frappe
 
+from frappe_appointment.helpers.availability_snapshot import (
+    enqueue_availability_snapshot_refresh_for_members,
+    get_dates_around,
+)
+from frappe_appointment.helpers.leave_holiday_index import clear_employee_leave_dates, is_hrms_installed
 from frappe_appointment.helpers.out_of_office import (
     create_out_of_office_google_calander_event,
     delete_out_of_office_google_calendar_event,
 )
 
 
-def on_submit(doc, method=None):
-    installed_apps = frappe.get_installed_apps()
-    if "erpnext" not in installed_apps:
+def on_update(doc, method=None):
+    if not is_hrms_installed():
         return
-    if "hrms" not in installed_apps:
+
+    # Leaves are approved before they are submitted, the index counts them from then on
+    if not any(doc.has_value_changed(field) for field in ("status", "from_date", "to_date")):
         return
 
+    clear_employee_leave_dates(doc.employee)
+    refresh_availability_snapshot_of_leave(doc)
+
+
+def on_submit(doc, method=None):
+    if not is_hrms_installed():
+        return
+
+    clear_employee_leave_dates(doc.employee)
+    refresh_availability_snapshot_of_leave(doc)
+
     if doc.status == "Approved":
         frappe.enqueue(
             create_out_of_office_google_calander_event,
@@ -25,12 +42,12 @@ def on_submit(doc, method=None):
 
 
 def on_cancel_and_on_trash(doc, method=None):
-    installed_apps = frappe.get_installed_apps()
-    if "erpnext" not in installed_apps:
-        return
-    if "hrms" not in installed_apps:
+    if not is_hrms_installed():
         return
 
+    clear_employee_leave_dates(doc.employee)
+    refresh_availability_snapshot_of_leave(doc)
+
     frappe.enqueue(
         delete_out_of_office_google_calendar_event,
         queue="long",
@@ -38,3 +55,9 @@ def on_cancel_and_on_trash(doc, method=None):
         employee=doc.employee,
         event_id=doc.custom_google_calendar_event_id,
     )
+
+
+def refresh_availability_snapshot_of_leave(doc):
+    member = frappe.db.get_value("Employee", doc.employee, "company_email")
+    if member:
+        enqueue_availability_snapshot_refresh_for_members([member], get_dates_around(doc.from_date, doc.to_date))
@@ -0,0 +1,21 @@
+import frappe
+from frappe.utils import add_days, getdate
+
+from frappe_appointment.constants import APPOINTMENT_AVAILABILITY_SNAPSHOT
+from frappe_appointment.helpers.availability_snapshot import (
+    enqueue_availability_snapshot_refresh,
+    get_availability_snapshot_max_age,
+    get_snapshot_references,
+)
+
+
+def refresh_availability_snapshots():
+    if not get_availability_snapshot_max_age():
+        return
+
+    frappe.db.delete(APPOINTMENT_AVAILABILITY_SNAPSHOT, {"date": ["<", add_days(getdate(), -1)]})
+
+    # Changes of availability refresh their days as they happen, this keeps the other days within the max age
+    # and fills the days the windows move to with the current date
+    for reference_doctype, reference_name in get_snapshot_references():
+        enqueue_availability_snapshot_refresh(reference_doctype, reference_name, stale_only=True)
@@ -0,0 +1,23 @@
+import frappe
+
+from frappe_appointment.helpers.google_calendar_mirror import (
+    get_google_calendar_mirror_max_age,
+    sync_google_calendar_mirror,
+)
+
+
+def sync_google_calendar_mirrors():
+    if not get_google_calendar_mirror_max_age():
+        return
+
+    availabilities = frappe.get_all(
+        "User Appointment Availability",
+        filters={"google_calendar": ["is", "set"]},
+        fields=["name", "google_calendar"],
+    )
+
+    for availability in availabilities:
+        try:
+            sync_google_calendar_mirror(availability.google_calendar, availability.name)
+        except Exception:
+            frappe.log_error(title="sync_google_calendar_mirror_failed", message=frappe.get_traceback())
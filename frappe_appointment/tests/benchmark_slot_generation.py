@@ -0,0 +1,79 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+"""
+Throughput of the slot generation of a day, in days per second.
+
+Every day is a 24h window with 15 min slots, a 5 min buffer and 4 random busy events. "engine" times
+get_avaiable_time_slot_for_day on epoch minutes, "end to end" adds building the UTC datetimes of the response.
+
+Run it from the bench directory:
+    ./env/bin/python -m frappe_appointment.tests.benchmark_slot_generation [days]
+"""
+
+import random
+import sys
+import timeit
+
+import frappe
+
+from frappe_appointment.frappe_appointment.doctype.appointment_group.appointment_group import (
+    get_avaiable_time_slot_for_day,
+)
+from frappe_appointment.helpers.intervals import BusyInterval
+from frappe_appointment.helpers.slot_engine import MINUTES_PER_DAY, epoch_minutes_to_datetime, get_window_bitmap
+
+ORIGIN = 29460000  # 2026-01-05 00:00 UTC in epoch minutes
+BUSY_EVENTS = 4
+APPOINTMENT_GROUP = frappe._dict(duration_for_event=15 * 60, minimum_buffer_time=5 * 60)
+
+
+def get_random_busy_intervals(rng: random.Random) -> list:
+    """Get BUSY_EVENTS sorted busy intervals of 15 to 120 minutes inside the day"""
+    busy_intervals = []
+
+    for _ in range(BUSY_EVENTS):
+        start = ORIGIN + rng.randrange(MINUTES_PER_DAY - 120)
+        end = start + rng.randrange(15, 121)
+        busy_intervals.append(BusyInterval(start * 60, end * 60))
+
+    return sorted(busy_intervals)
+
+
+def get_day_slots(busy_intervals: list, window_bitmap: int) -> list:
+    return get_avaiable_time_slot_for_day(busy_intervals, ORIGIN, window_bitmap, APPOINTMENT_GROUP)
+
+
+def get_day_response(busy_intervals: list, window_bitmap: int) -> list:
+    return [
+        {"start_time": epoch_minutes_to_datetime(start), "end_time": epoch_minutes_to_datetime(end)}
+        for start, end in get_day_slots(busy_intervals, window_bitmap)
+    ]
+
+
+def benchmark(days: int = 10000, seed: int = 0) -> dict:
+    """Time the slot generation of `days` random days, returns days per second of every stage"""
+    rng = random.Random(seed)
+    window_bitmap = get_window_bitmap(ORIGIN, ORIGIN, ORIGIN + MINUTES_PER_DAY)
+    all_busy_intervals = [get_random_busy_intervals(rng) for _ in range(days)]
+
+    results = {}
+
+    for name, func in (("engine", get_day_slots), ("end to end", get_day_response)):
+        seconds = min(
+            timeit.repeat(
+                lambda func=func: [func(busy_intervals, window_bitmap) for busy_intervals in all_busy_intervals],
+                number=1,
+                repeat=3,
+            )
+        )
+        results[name] = days / seconds
+
+    return results
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for name, days_per_second in benchmark(days).items():
+        print(f"{name}: {days_per_second:,.0f} days/s")
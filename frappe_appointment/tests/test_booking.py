@@ -0,0 +1,96 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.helpers.booking import BOOKING_CONFIRMED, BOOKING_FAILED, BOOKING_PENDING
+from frappe_appointment.overrides import event_override
+from frappe_appointment.overrides.event_override import _create_pending_booking, finalize_booking
+from frappe_appointment.tests.utils import start_patches
+
+EVENT_NAME = "_Test Booking Event"
+
+
+class FakeBookingEvent(frappe._dict):
+    """Pending booking event whose confirmation gets as far as creating its Google Calendar event"""
+
+    def confirm_booking(self, metadata):
+        self.google_calendar_event_id = "google-event-id"
+
+        if self.confirm_error:
+            raise self.confirm_error
+
+    def get_booking_appointment_group(self):
+        return frappe._dict(event_creator="Event Creator", allow_rescheduling=0)
+
+
+class TestAsyncBooking(FrappeTestCase):
+    def setUp(self):
+        self.event = FakeBookingEvent(
+            name=EVENT_NAME,
+            google_calendar="Event Creator",
+            google_calendar_id="creator@example.com",
+            google_calendar_event_id=None,
+            custom_meeting_provider="Google Meet",
+            custom_meet_data=None,
+            confirm_error=None,
+        )
+        self.mocks = start_patches(
+            self,
+            patch.object(event_override, "delete_event_in_google_calendar_override"),
+            patch.object(event_override, "set_booking_status"),
+            patch.object(event_override, "enqueue_finalize_booking", return_value="booking-token"),
+            patch.object(event_override, "get_event_created_response", return_value={"event_id": EVENT_NAME}),
+            patch.object(frappe, "get_doc", return_value=self.event),
+            patch.object(frappe, "delete_doc"),
+            patch.object(frappe, "log_error"),
+            patch.object(frappe.db, "get_value", return_value=BOOKING_PENDING),
+            patch.object(frappe.db, "commit"),
+            patch.object(frappe.db, "rollback"),
+        )
+
+    def get_booking_status(self):
+        self.mocks["set_booking_status"].assert_called_once()
+        return self.mocks["set_booking_status"].call_args.args[1]
+
+    def test_pending_booking_is_committed_with_the_request(self):
+        event = MagicMock()
+        event.name = EVENT_NAME
+
+        resp = _create_pending_booking(event, {}, return_event_id=True)
+
+        event.insert.assert_called_once_with(ignore_permissions=True)
+        self.mocks["enqueue_finalize_booking"].assert_called_once_with(EVENT_NAME, {})
+        self.mocks["commit"].assert_not_called()
+        self.assertEqual(resp["booking_status"], BOOKING_PENDING)
+        self.assertEqual(resp["booking_token"], "booking-token")
+
+    def test_confirmed_booking(self):
+        finalize_booking(EVENT_NAME, "booking-token", {})
+
+        self.mocks["commit"].assert_called_once()
+        self.mocks["delete_doc"].assert_not_called()
+        self.mocks["delete_event_in_google_calendar_override"].assert_not_called()
+        self.assertEqual(self.get_booking_status()["booking_status"], BOOKING_CONFIRMED)
+
+    def test_failed_booking_deletes_its_google_calendar_event(self):
+        self.event.confirm_error = frappe.ValidationError("Webhook failed")
+
+        finalize_booking(EVENT_NAME, "booking-token", {})
+
+        self.mocks["rollback"].assert_called_once()
+        self.mocks["delete_event_in_google_calendar_override"].assert_called_once_with(self.event)
+        self.assertEqual(self.event.google_calendar_event_id, "google-event-id")
+        self.mocks["delete_doc"].assert_called_once_with("Event", EVENT_NAME, ignore_permissions=True)
+        self.assertEqual(self.get_booking_status(), {"booking_status": BOOKING_FAILED, "message": "Webhook failed"})
+
+    def test_booking_that_is_not_pending_is_skipped(self):
+        self.mocks["get_value"].return_value = BOOKING_CONFIRMED
+
+        finalize_booking(EVENT_NAME, "booking-token", {})
+
+        self.mocks["get_doc"].assert_not_called()
+        self.mocks["set_booking_status"].assert_not_called()
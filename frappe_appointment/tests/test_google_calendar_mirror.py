@@ -0,0 +1,186 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import frappe
+import httplib2
+from frappe.tests.utils import FrappeTestCase
+from googleapiclient.errors import HttpError
+
+from frappe_appointment.frappe_appointment.doctype.appointment_time_slot import appointment_time_slot
+from frappe_appointment.helpers import google_calendar_mirror
+from frappe_appointment.helpers.google_calendar_mirror import (
+    MIRROR_KEY_PREFIX,
+    get_mirror_state_key,
+    get_mirrored_busy_intervals,
+    sync_google_calendar_mirror,
+)
+from frappe_appointment.helpers.intervals import BusyInterval
+from frappe_appointment.tests.utils import start_patches
+
+CALENDAR_ID = "shared@example.com"
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class FakeGoogleCalendarService:
+    """Local stand-in for the Google Calendar API object, answers events lists from a queue of responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        return FakeRequest(self.responses.pop(0))
+
+
+def get_timed_event(event_id, start, end, creator, attendees=None):
+    return {
+        "id": event_id,
+        "start": {"dateTime": start.strftime("%Y-%m-%dT%H:%M:%S"), "timeZone": "UTC"},
+        "end": {"dateTime": end.strftime("%Y-%m-%dT%H:%M:%S"), "timeZone": "UTC"},
+        "creator": {"email": creator},
+        "attendees": attendees or [],
+    }
+
+
+class TestGoogleCalendarMirror(FrappeTestCase):
+    def setUp(self):
+        self.today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.time_max = int((self.today + timedelta(days=10)).timestamp())
+        self.account = frappe._dict(google_calendar_id=CALENDAR_ID, custom_ignore_all_day_events=0)
+
+        start_patches(
+            self,
+            patch.object(google_calendar_mirror, "get_google_calendar_mirror_max_age", return_value=3600),
+            patch.object(google_calendar_mirror, "get_mirror_time_max", return_value=self.time_max),
+            patch.object(google_calendar_mirror, "bump_availability_generation"),
+            patch.object(google_calendar_mirror, "enqueue_availability_snapshot_refresh_for_members"),
+        )
+
+    def tearDown(self):
+        frappe.cache.delete_keys(MIRROR_KEY_PREFIX)
+
+    def sync(self, service, member):
+        with patch.object(google_calendar_mirror, "get_google_calendar_service", return_value=(service, self.account)):
+            sync_google_calendar_mirror("Shared Calendar", member)
+
+    def get_busy_intervals(self, member):
+        return get_mirrored_busy_intervals(CALENDAR_ID, member, [self.today.replace(tzinfo=None)])
+
+    def test_full_sync_is_bounded_and_parsed_per_member(self):
+        start = self.today + timedelta(hours=10)
+        event = get_timed_event("e1", start, start + timedelta(hours=1), "a@example.com")
+        far_event = get_timed_event(
+            "e2", self.today + timedelta(days=30), self.today + timedelta(days=30, hours=1), "a@example.com"
+        )
+        service = FakeGoogleCalendarService([{"items": [event, far_event], "nextSyncToken": "t1"}] * 2)
+
+        self.sync(service, "a@example.com")
+        self.sync(service, "b@example.com")
+
+        self.assertIn("timeMax", service.calls[0])
+        self.assertNotIn("syncToken", service.calls[0])
+
+        interval = BusyInterval.from_datetimes(start, start + timedelta(hours=1))
+        self.assertEqual(self.get_busy_intervals("a@example.com"), ([interval], []))
+        # b@example.com neither created nor attends the event of the shared calendar
+        self.assertEqual(self.get_busy_intervals("b@example.com"), ([], []))
+
+        # Events past the window are not kept, even if Google lists them
+        state = frappe.cache.get_value(get_mirror_state_key(CALENDAR_ID, "a@example.com"))
+        self.assertEqual(list(state["events"]), ["e1"])
+
+    def test_incremental_sync_and_expired_sync_token(self):
+        start = self.today + timedelta(hours=10)
+        event = get_timed_event("e1", start, start + timedelta(hours=1), "a@example.com")
+        moved_event = get_timed_event("e1", start + timedelta(hours=2), start + timedelta(hours=3), "a@example.com")
+        service = FakeGoogleCalendarService(
+            [
+                {"items": [event], "nextSyncToken": "t1"},
+                {"items": [moved_event], "nextSyncToken": "t2"},
+                HttpError(httplib2.Response({"status": 410}), b""),
+                {"items": [], "nextSyncToken": "t3"},
+            ]
+        )
+
+        self.sync(service, "a@example.com")
+        self.sync(service, "a@example.com")
+
+        self.assertEqual(service.calls[1]["syncToken"], "t1")
+        self.assertEqual(
+            self.get_busy_intervals("a@example.com"),
+            ([BusyInterval.from_datetimes(start + timedelta(hours=2), start + timedelta(hours=3))], []),
+        )
+
+        # 410 Gone drops the mirror and starts over with a full sync
+        self.sync(service, "a@example.com")
+
+        self.assertEqual(service.calls[2]["syncToken"], "t2")
+        self.assertNotIn("syncToken", service.calls[3])
+        self.assertEqual(self.get_busy_intervals("a@example.com"), ([], []))
+
+        state = frappe.cache.get_value(get_mirror_state_key(CALENDAR_ID, "a@example.com"))
+        self.assertEqual(state["sync_token"], "t3")
+
+    def test_unreadable_events_are_pruned(self):
+        past_event = {
+            "id": "e1",
+            "start": {"date": (self.today - timedelta(days=5)).strftime("%Y-%m-%d")},
+            "end": {"date": (self.today - timedelta(days=4)).strftime("%Y-%m-%d")},
+            "creator": {"email": "a@example.com"},
+        }
+        event = dict(
+            past_event,
+            id="e2",
+            start={"date": self.today.strftime("%Y-%m-%d")},
+            end={"date": (self.today + timedelta(days=1)).strftime("%Y-%m-%d")},
+        )
+        service = FakeGoogleCalendarService([{"items": [past_event, event], "nextSyncToken": "t1"}])
+
+        self.sync(service, "a@example.com")
+
+        state = frappe.cache.get_value(get_mirror_state_key(CALENDAR_ID, "a@example.com"))
+        self.assertEqual(list(state["events"]), ["e2"])
+        self.assertEqual(len(self.get_busy_intervals("a@example.com")[1]), 1)
+
+    def test_range_starting_today_is_served_from_the_mirror(self):
+        start = self.today + timedelta(hours=10)
+        event = get_timed_event("e1", start, start + timedelta(hours=1), "a@example.com")
+        service = FakeGoogleCalendarService([{"items": [event], "nextSyncToken": "t1"}])
+
+        self.sync(service, "a@example.com")
+
+        # Slots of today are cut from the UTC days around it, so callers ask for the two days before today as well
+        today = self.today.replace(tzinfo=None)
+        with (
+            patch.object(
+                appointment_time_slot,
+                "get_member_google_calendar",
+                return_value=frappe._dict(google_calendar_id=CALENDAR_ID),
+            ),
+            patch.object(appointment_time_slot, "fetch_google_calendar_slots") as fetch_google_calendar_slots,
+        ):
+            google_calendar_slots = appointment_time_slot.get_google_calendar_slots_for_range(
+                ["a@example.com"], today - timedelta(days=2), today + timedelta(days=7)
+            )
+
+        fetch_google_calendar_slots.assert_not_called()
+        self.assertEqual(
+            google_calendar_slots,
+            {"a@example.com": ([BusyInterval.from_datetimes(start, start + timedelta(hours=1))], [])},
+        )
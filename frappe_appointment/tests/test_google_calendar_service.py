@@ -0,0 +1,65 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from collections import OrderedDict
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.helpers import google_calendar_service
+from frappe_appointment.helpers.google_calendar_service import get_google_calendar_service
+from frappe_appointment.tests.utils import start_patches
+
+
+class TestGoogleCalendarService(FrappeTestCase):
+    def setUp(self):
+        self.accounts = {
+            name: frappe._dict(name=name, google_calendar_id=f"{name}@example.com", modified="2026-01-01 00:00:00")
+            for name in ("a", "b", "c")
+        }
+        self.cache = OrderedDict()
+
+        self.mocks = start_patches(
+            self,
+            patch.object(google_calendar_service, "_google_calendar_service_cache", self.cache),
+            patch.object(google_calendar_service, "GOOGLE_CALENDAR_SERVICE_CACHE_SIZE", 2),
+            patch.object(
+                google_calendar_service, "build_google_calendar_service", side_effect=lambda account: object()
+            ),
+            patch.object(google_calendar_service, "get_google_calendar_object"),
+            patch.object(frappe, "get_cached_doc", side_effect=lambda doctype, name: self.accounts[name]),
+        )
+
+    def test_service_is_cached_per_calendar_version(self):
+        service, account = get_google_calendar_service("a")
+
+        self.assertIs(account, self.accounts["a"])
+        self.assertIs(get_google_calendar_service("a")[0], service)
+        self.mocks["build_google_calendar_service"].assert_called_once_with(self.accounts["a"])
+        self.assertEqual(list(self.cache), [(frappe.local.site, "a", "2026-01-01 00:00:00")])
+
+        # A saved Google Calendar may have a new refresh token, its older service is dropped
+        self.accounts["a"].modified = "2026-01-02 00:00:00"
+
+        self.assertIsNot(get_google_calendar_service("a")[0], service)
+        self.assertEqual(list(self.cache), [(frappe.local.site, "a", "2026-01-02 00:00:00")])
+
+    def test_least_recently_used_service_is_evicted(self):
+        services = {name: get_google_calendar_service(name)[0] for name in ("a", "b")}
+        get_google_calendar_service("a")
+        get_google_calendar_service("c")
+
+        self.assertEqual([key[1] for key in self.cache], ["a", "c"])
+        self.assertIs(get_google_calendar_service("a")[0], services["a"])
+        self.assertIsNot(get_google_calendar_service("b")[0], services["b"])
+        self.assertEqual(self.mocks["build_google_calendar_service"].call_count, 4)
+
+    def test_calendar_without_id_is_left_to_frappe(self):
+        self.accounts["a"].google_calendar_id = None
+
+        get_google_calendar_service("a")
+
+        self.mocks["get_google_calendar_object"].assert_called_once_with("a")
+        self.mocks["build_google_calendar_service"].assert_not_called()
+        self.assertEqual(self.cache, {})
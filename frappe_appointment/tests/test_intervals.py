@@ -0,0 +1,39 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.helpers.intervals import BusyInterval, parse_google_event_for_member
+
+MEMBER = "a@example.com"
+
+
+def get_event(**kwargs):
+    return {
+        "start": {"dateTime": "2026-01-05T10:00:00", "timeZone": "UTC"},
+        "end": {"dateTime": "2026-01-05T11:00:00", "timeZone": "UTC"},
+        "creator": {"email": MEMBER},
+        **kwargs,
+    }
+
+
+class TestIntervals(FrappeTestCase):
+    def test_parse_google_event_for_member(self):
+        self.assertEqual(parse_google_event_for_member(MEMBER, get_event()), BusyInterval(1767607200, 1767610800))
+        self.assertEqual(
+            parse_google_event_for_member(MEMBER, get_event(transparency="opaque", status="confirmed")),
+            BusyInterval(1767607200, 1767610800),
+        )
+
+        # Events shown as free or cancelled do not block the member
+        self.assertIsNone(parse_google_event_for_member(MEMBER, get_event(transparency="transparent")))
+        self.assertIsNone(parse_google_event_for_member(MEMBER, get_event(status="cancelled")))
+
+        # Nor do events of someone else that the member declined or is not invited to
+        self.assertIsNone(parse_google_event_for_member(MEMBER, get_event(creator={"email": "b@example.com"})))
+        self.assertIsNone(
+            parse_google_event_for_member(
+                MEMBER,
+                get_event(creator={"email": "b@example.com"}, attendees=[{"self": True, "responseStatus": "declined"}]),
+            )
+        )
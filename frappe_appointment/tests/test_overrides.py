@@ -0,0 +1,138 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from werkzeug.datastructures import ETags
+
+from frappe_appointment.helpers.overrides import (
+    IDEMPOTENCY_KEY_PREFIX,
+    add_etag,
+    add_idempotency_key,
+    add_response_code,
+)
+from frappe_appointment.tests.utils import start_patches
+
+ETAG = "slots-etag"
+
+
+class FakeCallbacks:
+    """Stand-in for the commit and rollback callbacks of frappe.db, run by the test instead of the transaction"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add(self, func):
+        self.callbacks.append(func)
+
+    def run(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+
+class TestIdempotencyKey(FrappeTestCase):
+    def setUp(self):
+        self.after_commit = FakeCallbacks()
+        self.after_rollback = FakeCallbacks()
+        self.calls = []
+
+        start_patches(
+            self,
+            patch.object(frappe.db, "after_commit", self.after_commit),
+            patch.object(frappe.db, "after_rollback", self.after_rollback),
+            patch.object(frappe.local, "request_ip", "203.0.113.1", create=True),
+            patch.object(frappe.db, "get_single_value", return_value=60),
+            patch.object(frappe, "get_request_header", return_value=None),
+        )
+
+        frappe.set_user("Guest")
+        self.addCleanup(frappe.set_user, "Administrator")
+
+        @add_idempotency_key
+        def book_time_slot(**kwargs):
+            self.calls.append(kwargs)
+            return {"event_id": f"_Test Event {len(self.calls)}"}
+
+        self.book_time_slot = book_time_slot
+
+    def tearDown(self):
+        frappe.cache.delete_keys(IDEMPOTENCY_KEY_PREFIX)
+        frappe.flags.response_headers = None
+
+    def test_retry_is_replayed_once_committed(self):
+        resp = self.book_time_slot(idempotency_key="key", start_time="10:00")
+
+        self.assertEqual(self.book_time_slot(idempotency_key="key", start_time="10:00")[1], 409)
+
+        self.after_commit.run()
+
+        self.assertEqual(self.book_time_slot(idempotency_key="key", start_time="10:00"), resp)
+        self.assertEqual(frappe.flags.response_headers, {"Idempotent-Replayed": "true"})
+        self.assertEqual(self.book_time_slot(idempotency_key="key", start_time="11:00")[1], 422)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_rolled_back_request_runs_again(self):
+        self.book_time_slot(idempotency_key="key", start_time="10:00")
+        self.after_commit.callbacks.clear()
+        self.after_rollback.run()
+
+        self.book_time_slot(idempotency_key="key", start_time="10:00")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_key_is_scoped_by_user_and_guest_ip(self):
+        self.book_time_slot(idempotency_key="key", start_time="10:00")
+        self.after_commit.run()
+
+        with patch.object(frappe.local, "request_ip", "198.51.100.7"):
+            self.book_time_slot(idempotency_key="key", start_time="10:00")
+            self.after_commit.run()
+
+        frappe.set_user("Administrator")
+        self.book_time_slot(idempotency_key="key", start_time="10:00")
+
+        self.assertEqual(len(self.calls), 3)
+
+
+class TestAddEtag(FrappeTestCase):
+    def setUp(self):
+        self.response = frappe._dict()
+        self.request = frappe._dict(method="GET", if_none_match=ETags([ETAG]))
+        self.calls = []
+
+        start_patches(
+            self,
+            patch.object(frappe.local, "response", self.response, create=True),
+            patch.object(frappe.local, "request", self.request, create=True),
+        )
+
+    def tearDown(self):
+        frappe.flags.response_headers = None
+
+    def get_time_slots(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"slots": []}
+
+    def test_matching_request_is_answered_with_304_under_any_decorator(self):
+        with_etag = add_etag(lambda **kwargs: ETAG)
+
+        for get_time_slots in (
+            with_etag(self.get_time_slots),
+            add_response_code(with_etag(self.get_time_slots)),
+            with_etag(add_response_code(self.get_time_slots)),
+        ):
+            self.response.clear()
+
+            self.assertIsNone(get_time_slots(date="2026-01-05"))
+            self.assertEqual(self.response.http_status_code, 304)
+            self.assertEqual(frappe.flags.response_headers["ETag"], f'"{ETAG}"')
+
+        self.assertEqual(self.calls, [])
+
+    def test_changed_response_is_sent(self):
+        get_time_slots = add_etag(lambda **kwargs: "new-etag")(self.get_time_slots)
+
+        self.assertEqual(get_time_slots(date="2026-01-05"), {"slots": []})
+        self.assertNotIn("http_status_code", self.response)
+        self.assertEqual(self.calls, [{"date": "2026-01-05"}])
@@ -0,0 +1,75 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from datetime import datetime
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.helpers import slot_cache
+from frappe_appointment.helpers.slot_cache import (
+    SINGLE_FLIGHT_LOCK_TTL,
+    SLOT_CACHE_KEY_PREFIX,
+    get_day_slots_single_flight,
+    get_slot_cache_key,
+)
+from frappe_appointment.tests.utils import start_patches
+
+
+class TestSlotCache(FrappeTestCase):
+    def setUp(self):
+        self.appointment_group = frappe._dict(
+            name="_Test Appointment Group",
+            modified="2026-01-01 00:00:00",
+            members=[frappe._dict(user="a@example.com", is_mandatory=1)],
+        )
+        self.date = datetime(2026, 1, 5)
+        self.key = get_slot_cache_key(self.appointment_group, self.date)
+        self.lock_key = f"{self.key}:lock"
+        self.computed = []
+
+        start_patches(self, patch.object(slot_cache, "get_slot_cache_ttl", return_value=60))
+
+    def tearDown(self):
+        frappe.cache.delete_keys(SLOT_CACHE_KEY_PREFIX)
+
+    def compute_day_slots(self):
+        self.computed.append(True)
+        return {"total_slots_for_day": 2}
+
+    def hold_lock(self):
+        """Act as the first caller, computing the day slots in another worker"""
+        frappe.cache.set(frappe.cache.make_key(self.lock_key), 1, nx=True, ex=SINGLE_FLIGHT_LOCK_TTL)
+
+    def test_second_caller_waits_for_the_first_result(self):
+        self.hold_lock()
+
+        def first_caller_finishes(seconds):
+            frappe.cache.set_value(self.key, {"total_slots_for_day": 1}, expires_in_sec=60)
+
+        with patch.object(slot_cache.time, "sleep", side_effect=first_caller_finishes) as sleep:
+            data = get_day_slots_single_flight(self.appointment_group, self.date, self.compute_day_slots)
+
+        self.assertEqual(data, {"total_slots_for_day": 1})
+        self.assertEqual(self.computed, [])
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_second_caller_computes_once_the_lock_is_gone(self):
+        self.hold_lock()
+        sleeps = []
+
+        def first_caller_waits_then_fails(seconds):
+            sleeps.append(seconds)
+
+            if len(sleeps) == 2:
+                frappe.cache.delete_value(self.lock_key)
+
+        with patch.object(slot_cache.time, "sleep", side_effect=first_caller_waits_then_fails):
+            data = get_day_slots_single_flight(self.appointment_group, self.date, self.compute_day_slots)
+
+        # The lock is still held after the first poll, so the caller keeps waiting until it is released
+        self.assertEqual(len(sleeps), 2)
+        self.assertEqual(data, {"total_slots_for_day": 2})
+        self.assertEqual(self.computed, [True])
+        self.assertEqual(frappe.cache.get_value(self.key, expires=True), data)
@@ -0,0 +1,60 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.helpers.slot_engine import (
+    get_bitmap_bounds,
+    get_bitmap_slots,
+    get_busy_bitmap,
+    get_compact_slots,
+    get_free_runs,
+    get_window_bitmap,
+)
+
+ORIGIN = 1000
+
+
+class TestSlotEngine(FrappeTestCase):
+    def test_window_bitmap(self):
+        self.assertEqual(get_window_bitmap(ORIGIN, ORIGIN + 2, ORIGIN + 5), 0b11100)
+        # Minutes before the origin are cut off, empty windows have no bits
+        self.assertEqual(get_window_bitmap(ORIGIN, ORIGIN - 3, ORIGIN + 2), 0b11)
+        self.assertEqual(get_window_bitmap(ORIGIN, ORIGIN + 5, ORIGIN + 5), 0)
+
+    def test_busy_bitmap_is_widened_by_the_buffer(self):
+        busy_intervals = [(ORIGIN + 4, ORIGIN + 6), (ORIGIN + 20, ORIGIN + 30)]
+
+        self.assertEqual(get_busy_bitmap(ORIGIN, ORIGIN + 10, busy_intervals), 0b110000)
+        self.assertEqual(get_busy_bitmap(ORIGIN, ORIGIN + 10, busy_intervals, buffer=1), 0b1111000)
+        # Busy time past the end is ignored
+        self.assertEqual(get_busy_bitmap(ORIGIN, ORIGIN + 10, busy_intervals, buffer=3), 0b111111110)
+
+    def test_free_runs_and_bounds(self):
+        bitmap = get_window_bitmap(ORIGIN, ORIGIN + 2, ORIGIN + 5) | get_window_bitmap(ORIGIN, ORIGIN + 8, ORIGIN + 9)
+
+        self.assertEqual(get_free_runs(bitmap), [(2, 5), (8, 9)])
+        self.assertEqual(get_free_runs(0), [])
+        self.assertEqual(get_bitmap_bounds(bitmap, ORIGIN), (ORIGIN + 2, ORIGIN + 9))
+
+    def test_slots_are_cut_from_the_start_of_each_run(self):
+        # Two windows, 09:00-12:00 and 14:00-17:00 in minutes of the day, with a meeting 10:00-11:00
+        bitmap = get_window_bitmap(ORIGIN, ORIGIN + 540, ORIGIN + 720) | get_window_bitmap(
+            ORIGIN, ORIGIN + 840, ORIGIN + 1020
+        )
+        bitmap &= ~get_busy_bitmap(ORIGIN, ORIGIN + 1440, [(ORIGIN + 600, ORIGIN + 660)], buffer=10)
+
+        slots = get_bitmap_slots(bitmap, ORIGIN, 30)
+
+        self.assertEqual(
+            [start - ORIGIN for start, _end in slots],
+            [540, 670, 840, 870, 900, 930, 960, 990],
+        )
+        self.assertTrue(all(end - start == 30 for start, end in slots))
+        self.assertEqual(get_bitmap_slots(bitmap, ORIGIN, 0), [])
+
+    def test_compact_slots(self):
+        slots = [(ORIGIN, ORIGIN + 30), (ORIGIN + 90, ORIGIN + 120)]
+
+        self.assertEqual(get_compact_slots(slots, 30), {"base": ORIGIN * 60, "duration": 30, "offsets": [0, 90]})
+        self.assertEqual(get_compact_slots([], 30), {"base": 0, "duration": 30, "offsets": []})
@@ -0,0 +1,102 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.api import group_meet
+from frappe_appointment.helpers.slot_hold import (
+    SLOT_HOLD_KEY_PREFIX,
+    SLOT_HOLDS_KEY_PREFIX,
+    get_held_slots,
+    hold_slot,
+    release_slot_hold,
+)
+from frappe_appointment.helpers.slot_policy import SlotPolicy, SlotPolicyMember
+from frappe_appointment.overrides import event_override
+from frappe_appointment.overrides.event_override import _create_event_for_appointment_group
+
+TEST_GROUP = "_Test Hold Appointment Group"
+REFERENCE = f"group:{TEST_GROUP}"
+START_TIME = "2026-01-05 10:00:00+0000"
+END_TIME = "2026-01-05 10:30:00+0000"
+SLOT = (29460120, 29460150)
+
+
+class TestSlotHold(FrappeTestCase):
+    def setUp(self):
+        self.appointment_group = SlotPolicy(
+            name=TEST_GROUP,
+            group_name=TEST_GROUP,
+            members=(SlotPolicyMember("a@example.com", 1),),
+            duration_for_event=1800,
+        )
+
+    def tearDown(self):
+        frappe.cache.delete_keys(SLOT_HOLD_KEY_PREFIX)
+        frappe.cache.delete_keys(SLOT_HOLDS_KEY_PREFIX)
+
+    def test_hold_is_kept_by_its_token(self):
+        slot_hold = hold_slot(REFERENCE, *SLOT)
+
+        self.assertIsNone(hold_slot(REFERENCE, *SLOT))
+        self.assertIsNone(hold_slot(REFERENCE, *SLOT, "someone-else"))
+        self.assertEqual(hold_slot(REFERENCE, *SLOT, slot_hold.token), slot_hold)
+        self.assertEqual(get_held_slots(REFERENCE), {SLOT})
+
+        release_slot_hold(slot_hold._replace(token="someone-else"))
+        self.assertEqual(get_held_slots(REFERENCE), {SLOT})
+
+        release_slot_hold(slot_hold)
+        self.assertEqual(get_held_slots(REFERENCE), set())
+
+    def hold_time_slot(self, is_valid_time_slot):
+        with (
+            patch.object(group_meet, "get_appointment_group_slot_policy", return_value=self.appointment_group),
+            patch.object(group_meet, "is_valid_time_slots", return_value=is_valid_time_slot) as is_valid_time_slots,
+        ):
+            resp = group_meet.hold_time_slot(TEST_GROUP, "2026-01-05", START_TIME, END_TIME, "0")
+
+        is_valid_time_slots.assert_called_once_with(self.appointment_group, "2026-01-05", "0", START_TIME, END_TIME)
+        return resp
+
+    def test_only_offered_slots_are_held(self):
+        with self.assertRaises(frappe.ValidationError):
+            self.hold_time_slot(False)
+
+        self.assertEqual(get_held_slots(REFERENCE), set())
+
+        resp = self.hold_time_slot(True)
+
+        self.assertTrue(resp["hold_token"])
+        self.assertEqual(get_held_slots(REFERENCE), {SLOT})
+
+    def create_event(self, after_commit, **kwargs):
+        with (
+            patch.object(event_override, "_create_event_for_held_slot", **kwargs),
+            patch.object(frappe.db, "after_commit", after_commit),
+        ):
+            _create_event_for_appointment_group(self.appointment_group, "2026-01-05", START_TIME, END_TIME, "0")
+
+    def test_booking_releases_the_hold_once_committed(self):
+        after_commit = MagicMock()
+
+        def create_event_for_held_slot(*args, **kwargs):
+            # The sync path commits the event before returning
+            self.assertEqual(get_held_slots(REFERENCE), {SLOT})
+            after_commit.add.assert_called_once()
+            after_commit.add.call_args.args[0]()
+            return {"event_id": "_Test Event"}
+
+        self.create_event(after_commit, side_effect=create_event_for_held_slot)
+
+        # The committed event blocks the slot from then on
+        self.assertEqual(get_held_slots(REFERENCE), set())
+
+    def test_failed_booking_releases_the_hold(self):
+        with self.assertRaises(frappe.ValidationError):
+            self.create_event(MagicMock(), side_effect=frappe.ValidationError)
+
+        self.assertEqual(get_held_slots(REFERENCE), set())
@@ -0,0 +1,120 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_appointment.constants import APPOINTMENT_GROUP, APPOINTMENT_SLOT_DURATION
+from frappe_appointment.helpers import slot_policy
+from frappe_appointment.helpers.slot_policy import (
+    SlotPolicy,
+    get_cached_slot_policy,
+    get_slot_duration_slot_policy,
+)
+
+
+def create_dummy_appointment_group(duration, user_availability):
+    """The unsaved Appointment Group personal meetings were computed with before SlotPolicy"""
+    return frappe.get_doc(
+        {
+            "doctype": APPOINTMENT_GROUP,
+            "group_name": "Personal Meeting",
+            "event_creator": user_availability.get("google_calendar"),
+            "event_organizer": user_availability.get("user"),
+            "members": [{"user": user_availability.get("name"), "is_mandatory": 1}],
+            "duration_for_event": duration.duration,
+            "minimum_buffer_time": duration.minimum_buffer_time if duration.minimum_buffer_time else None,
+            "minimum_notice_before_event": duration.minimum_notice_before_event,
+            "event_availability_window": duration.availability_window,
+            "meet_provider": user_availability.get("meeting_provider"),
+            "meet_link": user_availability.get("meeting_link"),
+            "response_email_template": user_availability.get("response_email_template"),
+            "linked_doctype": user_availability.get("name"),
+            "limit_booking_frequency": duration.limit_booking_frequency,
+            "is_personal_meeting": 1,
+            "duration_id": duration.name,
+            "allow_rescheduling": duration.allow_rescheduling,
+            "minimum_notice_for_reschedule": duration.minimum_notice_for_reschedule,
+        }
+    )
+
+
+class TestSlotPolicy(FrappeTestCase):
+    def setUp(self):
+        self.duration = frappe._dict(
+            name="_Test Slot Duration",
+            duration=1800,
+            minimum_buffer_time=0,
+            minimum_notice_before_event=2,
+            availability_window=30,
+            limit_booking_frequency=3,
+            allow_rescheduling=1,
+            minimum_notice_for_reschedule=3600,
+            modified="2026-01-01 00:00:00",
+        )
+        self.user_availability = frappe._dict(
+            name="a@example.com",
+            user="a@example.com",
+            google_calendar="_Test Google Calendar",
+            meeting_provider="Google Meet",
+            meeting_link=None,
+            response_email_template=None,
+            modified="2026-01-01 00:00:00",
+        )
+
+        patcher = patch.object(slot_policy, "_slot_policy_cache", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_slot_duration_policy_reads_like_the_dummy_appointment_group(self):
+        policy = SlotPolicy.from_slot_duration(self.duration, self.user_availability)
+        appointment_group = create_dummy_appointment_group(self.duration, self.user_availability)
+
+        for field in (
+            "group_name",
+            "event_creator",
+            "event_organizer",
+            "duration_for_event",
+            "minimum_buffer_time",
+            "minimum_notice_before_event",
+            "event_availability_window",
+            "meet_provider",
+            "meet_link",
+            "response_email_template",
+            "linked_doctype",
+            "limit_booking_frequency",
+            "is_personal_meeting",
+            "duration_id",
+            "allow_rescheduling",
+            "minimum_notice_for_reschedule",
+        ):
+            self.assertEqual(policy.get(field), appointment_group.get(field), field)
+            self.assertEqual(getattr(policy, field), getattr(appointment_group, field), field)
+
+        self.assertEqual(
+            [(member.user, member.is_mandatory) for member in policy.members],
+            [(member.user, member.is_mandatory) for member in appointment_group.members],
+        )
+        self.assertEqual(policy.as_dict().doctype, APPOINTMENT_GROUP)
+
+    def test_policy_is_cached_per_document_version(self):
+        policy = get_slot_duration_slot_policy(self.duration, self.user_availability)
+
+        self.assertIs(get_slot_duration_slot_policy(self.duration, self.user_availability), policy)
+
+        # Saving the duration or the availability gives the next call a new policy
+        self.duration.modified = "2026-01-02 00:00:00"
+        self.duration.duration = 3600
+        self.assertEqual(get_slot_duration_slot_policy(self.duration, self.user_availability).duration_for_event, 3600)
+
+        self.user_availability.modified = "2026-01-02 00:00:00"
+        self.assertIsNot(get_slot_duration_slot_policy(self.duration, self.user_availability), policy)
+
+    def test_full_cache_is_cleared(self):
+        with patch.object(slot_policy, "SLOT_POLICY_CACHE_SIZE", 2):
+            for name in ("a", "b", "c"):
+                get_cached_slot_policy((APPOINTMENT_SLOT_DURATION, name), lambda name=name: name)
+
+        self.assertEqual(list(slot_policy._slot_policy_cache.values()), ["c"])
@@ -0,0 +1,23 @@
+# Copyright (c) 2026, rtCamp and Contributors
+# See license.txt
+
+from unittest import TestCase
+
+
+def start_patches(test_case: TestCase, *patchers) -> dict:
+    """Start the given patch.object patchers for the rest of the test, they are stopped on its cleanup.
+
+    Args:
+    test_case (TestCase): the running test
+    patchers: patchers made with unittest.mock.patch.object
+
+    Returns:
+    dict: patched attribute name -> the object it was replaced with
+    """
+    mocks = {}
+
+    for patcher in patchers:
+        mocks[patcher.attribute] = patcher.start()
+        test_case.addCleanup(patcher.stop)
+
+    return mocks
@@ -0,0 +1,71 @@
+/**
+ * External dependencies.
+ */
+import { useCallback, useContext, useState } from "react";
+import { FrappeConfig, FrappeContext } from "frappe-react-sdk";
+
+const BOOKING_PENDING = "Pending Confirmation";
+const BOOKING_FAILED = "Failed";
+const POLL_INTERVAL = 2000;
+const MAX_POLLS = 60;
+
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+type BookingResponse = { message: any };
+
+const wait = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * With async booking enabled in Appointment Settings, book_time_slot answers with a
+ * pending booking and its booking_token. Poll get_booking_status until the booking is
+ * confirmed, which brings the meet link and the reschedule url, or has failed.
+ * Responses of synchronous bookings are passed through as they are.
+ */
+const useBookingConfirmation = () => {
+  const { call } = useContext(FrappeContext) as FrappeConfig;
+  const [confirming, setConfirming] = useState(false);
+
+  const waitForBooking = useCallback(
+    async (data: BookingResponse): Promise<BookingResponse> => {
+      let booking = data.message;
+
+      if (booking?.booking_status !== BOOKING_PENDING) {
+        return data;
+      }
+
+      setConfirming(true);
+      try {
+        for (
+          let polls = 0;
+          booking?.booking_status === BOOKING_PENDING && polls < MAX_POLLS;
+          polls++
+        ) {
+          await wait(POLL_INTERVAL);
+          const response = await call.get(
+            "frappe_appointment.overrides.event_override.get_booking_status",
+            { booking_token: data.message.booking_token }
+          );
+          booking = response.message;
+        }
+      } finally {
+        setConfirming(false);
+      }
+
+      if (booking?.booking_status === BOOKING_FAILED) {
+        throw { message: booking.message };
+      }
+      if (booking?.booking_status === BOOKING_PENDING) {
+        throw {
+          message:
+            "Your booking is still being confirmed, you will get an email once it is.",
+        };
+      }
+
+      return { message: booking };
+    },
+    [call]
+  );
+
+  return { waitForBooking, confirming };
+};
+
+export default useBookingConfirmation;
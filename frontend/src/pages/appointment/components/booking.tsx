@@ -33,6 +33,7 @@ import {
   parseFrappeErrorMsg,
 } from "@/lib/utils";
 import MeetingForm from "./meetingForm";
+import useBookingConfirmation from "@/hooks/useBookingConfirmation";
 import { useAppContext } from "@/context/app";
 import TimeSlotSkeleton from "./timeSlotSkeleton";
 import TimeZoneSelect from "./timeZoneSelectmenu";
@@ -113,8 +114,10 @@ const Booking = ({ type, banner }: BookingProp) => {
       errorRetryCount: 3,
     }
   );
-  const { call: rescheduleMeeting, loading: rescheduleLoading } =
+  const { call: rescheduleMeeting, loading: reschedulePosting } =
     useFrappePostCall("frappe_appointment.api.personal_meet.book_time_slot");
+  const { waitForBooking, confirming } = useBookingConfirmation();
+  const rescheduleLoading = reschedulePosting || confirming;
 
   const onReschedule = () => {
     const extraArgs: Record<string, string> = {};
@@ -141,6 +144,7 @@ const Booking = ({ type, banner }: BookingProp) => {
     };
 
     rescheduleMeeting(meetingData)
+      .then(waitForBooking)
       .then((data) => {
         dispatch({ type: "SET_SHOW_MEETING_FORM", payload: false });
         dispatch({ type: "SET_EXPANDED", payload: false });
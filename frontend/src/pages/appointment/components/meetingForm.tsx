@@ -10,6 +10,7 @@ import { zodResolver } from "@hookform/resolvers/zod";
 import { CalendarPlus, ChevronLeft, CircleAlert, X } from "lucide-react";
 import { formatDate } from "date-fns";
 import { toast } from "sonner";
+import useBookingConfirmation from "@/hooks/useBookingConfirmation";
 import { useSearchParams } from "react-router-dom";
 
 /**
@@ -57,9 +58,11 @@ const MeetingForm = ({
 }: MeetingFormProps) => {
   const [isGuestsOpen, setIsGuestsOpen] = useState(false);
   const [guestInput, setGuestInput] = useState("");
-  const { call: bookMeeting, loading } = useFrappePostCall(
+  const { call: bookMeeting, loading: bookingLoading } = useFrappePostCall(
     `frappe_appointment.api.personal_meet.book_time_slot`
   );
+  const { waitForBooking, confirming } = useBookingConfirmation();
+  const loading = bookingLoading || confirming;
   const [searchParams] = useSearchParams();
 
   const { selectedDate, selectedSlot, timeZone } = useAppContext();
@@ -120,6 +123,7 @@ const MeetingForm = ({
     };
 
     bookMeeting(meetingData)
+      .then(waitForBooking)
       .then((data) => {
         onSuccess(data);
       })
@@ -40,6 +40,7 @@ import SuccessAlert from "@/components/success-alert";
 import MetaTags from "@/components/meta-tags";
 import { CalendarWrapper } from "@/components/calendar-wrapper";
 import { useMeetingReducer } from "./reducer";
+import useBookingConfirmation from "@/hooks/useBookingConfirmation";
 
 const GroupAppointment = () => {
   const { groupId } = useParams();
@@ -78,9 +79,11 @@ const GroupAppointment = () => {
     }
   );
 
-  const { call: bookMeeting, loading } = useFrappePostCall(
+  const { call: bookMeeting, loading: bookingLoading } = useFrappePostCall(
     "frappe_appointment.api.group_meet.book_time_slot"
   );
+  const { waitForBooking, confirming } = useBookingConfirmation();
+  const loading = bookingLoading || confirming;
 
   useEffect(() => {
     if (data) {
@@ -179,6 +182,7 @@ const GroupAppointment = () => {
     };
 
     bookMeeting(meetingData)
+      .then(waitForBooking)
       .then((data) => {
         dispatch({ type: "SET_BOOKING_RESPONSE", payload: data.message });
         dispatch({ type: "SET_APPOINTMENT_SCHEDULED", payload: true });